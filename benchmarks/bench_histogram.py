@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+# benchmarks/bench_histogram.py
+"""
+Shows that timing metrics use constant memory: records 10M exponentially
+distributed latencies into one MetricsCollector timing metric and reports,
+at every checkpoint, the peak process memory, the number of histogram
+buckets, the update throughput, and p50/p90/p99/p999 against the exact
+quantiles of the distribution.
+
+Usage:
+    python benchmarks/bench_histogram.py --samples 10000000 --checkpoints 10
+"""
+import argparse
+import logging
+import math
+import random
+import resource
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.supermanus.histogram import DEFAULT_QUANTILES, quantile_label
+from src.supermanus.logging_config import MetricsCollector
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Timing histogram memory and accuracy benchmark")
+    parser.add_argument("--samples", type=int, default=10_000_000, help="Samples to record")
+    parser.add_argument("--checkpoints", type=int, default=10, help="Number of progress reports")
+    parser.add_argument("--mean_ms", type=float, default=50.0, help="Mean latency of the exponential distribution")
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    rate = 1000.0 / args.mean_ms
+    exact = {quantile_label(q): -math.log(1 - q) / rate for q in DEFAULT_QUANTILES}
+    print("exact: " + "  ".join(f"{name}={value * 1000:.2f}ms" for name, value in exact.items()))
+
+    collector = MetricsCollector()
+    step = args.samples // args.checkpoints
+    recorded = 0
+    print(f"{'samples':>11} {'peak RSS (MB)':>14} {'buckets':>8} {'records/s':>11}  quantiles (ms, error vs exact)")
+    for _ in range(args.checkpoints):
+        start = time.perf_counter()
+        for _ in range(step):
+            collector.record_timing("api_request", random.expovariate(rate), endpoint="/tasks")
+        elapsed = time.perf_counter() - start
+        recorded += step
+
+        # ru_maxrss is in KB on Linux
+        peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        buckets = collector._metrics["api_request#endpoint=/tasks"]["histogram"].bucket_count
+        summary = collector.get_metric_summary()["timings"]["api_request"]
+        quantiles = "  ".join(
+            f"{name}={summary[name] * 1000:.2f} ({(summary[name] / exact[name] - 1) * 100:+.2f}%)" for name in exact
+        )
+        print(f"{recorded:>11,} {peak_rss:>14.1f} {buckets:>8} {step / elapsed:>11,.0f}  {quantiles}")
+
+
+if __name__ == "__main__":
+    main()
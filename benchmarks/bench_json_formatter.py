@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+# benchmarks/bench_json_formatter.py
+"""
+Measures JsonFormatter throughput in records per second, comparing the
+original formatting path (fast=False) with the optimized one (fast=True).
+
+Each record shape is formatted in a tight loop: a plain message, a message
+with primitive structured extras, and one whose extras need sanitizing.
+The optimized path uses orjson when it is installed; run with --no-orjson
+to measure the standard library encoder alone.
+
+Usage:
+    python benchmarks/bench_json_formatter.py --records 200000
+"""
+import argparse
+import logging
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.supermanus import logging_config
+from src.supermanus.logging_config import JsonFormatter
+
+
+def make_record(shape: str) -> logging.LogRecord:
+    record = logging.LogRecord("supermanus.task_enforcer", logging.INFO, __file__, 42,
+                               "Task %s updated to %s", ("T123", "completed"), None, "update_task_status")
+    if shape == "primitive_extra":
+        record.extra = {"task_id": "T123", "agent_type": "coding", "duration_ms": 12.5, "retries": 0,
+                        "files": ["src/app.py", "tests/test_app.py"]}
+        record.task_id = "T123"
+    elif shape == "object_extra":
+        record.extra = {"task_id": "T123", "path": Path("src/app.py"), 7: {"nested": object()}}
+    return record
+
+
+def records_per_second(formatter: JsonFormatter, record: logging.LogRecord, count: int) -> float:
+    start = time.perf_counter()
+    for _ in range(count):
+        formatter.format(record)
+    return count / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="JsonFormatter throughput benchmark")
+    parser.add_argument("--records", type=int, default=200000, help="Records formatted per measurement")
+    parser.add_argument("--no-orjson", action="store_true", help="Use the standard library encoder in the fast path")
+    args = parser.parse_args()
+
+    if args.no_orjson:
+        logging_config.orjson = None
+    encoder = "orjson" if logging_config.orjson is not None else "json"
+    print(f"fast path encoder: {encoder}")
+    print(f"{'record':<16} {'original (rec/s)':>17} {'fast (rec/s)':>13} {'speedup':>8}")
+    for shape in ("plain", "primitive_extra", "object_extra"):
+        record = make_record(shape)
+        original = records_per_second(JsonFormatter(fast=False), record, args.records)
+        fast = records_per_second(JsonFormatter(fast=True), record, args.records)
+        print(f"{shape:<16} {original:>17,.0f} {fast:>13,.0f} {fast / original:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# benchmarks/bench_state_serializers.py
+"""
+Compares session state snapshot formats on plans of increasing size.
+
+For each serializer and plan size this measures the encoded size, the time
+to encode and decode a snapshot, and the time of a full JsonFileStorage.save
+(atomic rename, with and without fsync).
+
+Usage:
+    python benchmarks/bench_state_serializers.py --sizes 1000 10000 100000
+"""
+import argparse
+import logging
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.supermanus.state_storage import SERIALIZERS, JsonFileStorage, get_serializer
+
+
+def make_state(size: int) -> dict:
+    return {
+        "project_tasks": [
+            {"id": f"T{i}", "description": f"Task {i}", "status": "pending", "phase": f"P{i % 10}",
+             "depends_on": [f"T{i - 1}"] if i else []}
+            for i in range(size)
+        ],
+        "project_phases": [],
+    }
+
+
+def timed(func, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat
+
+
+def bench_serializer(name: str, state: dict, repeat: int) -> dict:
+    serializer = get_serializer(name)
+    data = serializer.dumps(state)
+    with tempfile.TemporaryDirectory() as tmp:
+        state_file = Path(tmp) / "session_state.json"
+        durable = JsonFileStorage(state_file, serializer=name, fsync=True)
+        fast = JsonFileStorage(state_file, serializer=name, fsync=False)
+        return {
+            "bytes": len(data),
+            "encode": timed(lambda: serializer.dumps(state), repeat),
+            "decode": timed(lambda: serializer.loads(data), repeat),
+            "save": timed(lambda: fast.save(state), repeat),
+            "save_fsync": timed(lambda: durable.save(state), repeat),
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Session state serializer benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000], help="Plan sizes")
+    parser.add_argument("--repeat", type=int, default=5, help="Repetitions per measurement")
+    parser.add_argument("--formats", nargs="+", default=sorted(SERIALIZERS), help="Serializers to compare")
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    print(f"{'format':<13} {'tasks':>8} {'size (KB)':>10} {'encode (ms)':>12} {'decode (ms)':>12} "
+          f"{'save (ms)':>10} {'save+fsync (ms)':>16}")
+    for size in args.sizes:
+        state = make_state(size)
+        for name in args.formats:
+            try:
+                result = bench_serializer(name, state, args.repeat)
+            except ImportError as e:
+                print(f"{name:<13} {size:>8} skipped: {e}")
+                continue
+            print(f"{name:<13} {size:>8} {result['bytes'] / 1024:>10.1f} {result['encode'] * 1000:>12.2f} "
+                  f"{result['decode'] * 1000:>12.2f} {result['save'] * 1000:>10.2f} {result['save_fsync'] * 1000:>16.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+# benchmarks/bench_state_storage.py
+"""
+Compares SessionManager storage engines on plans of increasing size.
+
+For each backend and plan size this measures the initial plan load, the
+average cost of a single task status update (TaskEnforcer.mark_task_completed)
+and the cost of TaskEnforcer.get_status.
+
+Usage:
+    python benchmarks/bench_state_storage.py --sizes 1000 10000 100000 --updates 50
+"""
+import argparse
+import logging
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.supermanus.session_manager import SessionManager
+from src.supermanus.state_storage import create_storage
+from src.supermanus.task_enforcer import TaskEnforcer
+
+
+def make_plan(size: int) -> dict:
+    return {
+        "tasks": [
+            {"id": f"T{i}", "description": f"Task {i}", "status": "pending", "phase": f"P{i % 10}"}
+            for i in range(size)
+        ]
+    }
+
+
+def bench_backend(backend: str, size: int, updates: int) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        state_file = Path(tmp) / "session_state.json"
+        manager = SessionManager(str(state_file), storage=create_storage(backend, state_file))
+        enforcer = TaskEnforcer(manager)
+
+        start = time.perf_counter()
+        enforcer.load_project_plan(make_plan(size))
+        load_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for i in range(updates):
+            enforcer.mark_task_completed(f"T{i * (size // updates)}")
+        update_seconds = (time.perf_counter() - start) / updates
+
+        start = time.perf_counter()
+        enforcer.get_status()
+        status_seconds = time.perf_counter() - start
+
+        manager.close()
+        return {"load": load_seconds, "update": update_seconds, "status": status_seconds}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SessionManager storage benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000], help="Plan sizes")
+    parser.add_argument("--updates", type=int, default=50, help="Status updates per run")
+    parser.add_argument("--backends", nargs="+", default=["json", "wal", "sqlite"], help="Backends to compare")
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    print(f"{'backend':<8} {'tasks':>8} {'load (s)':>10} {'update (ms)':>12} {'get_status (ms)':>16}")
+    for size in args.sizes:
+        for backend in args.backends:
+            result = bench_backend(backend, size, min(args.updates, size))
+            print(f"{backend:<8} {size:>8} {result['load']:>10.3f} "
+                  f"{result['update'] * 1000:>12.3f} {result['status'] * 1000:>16.3f}")
+
+
+if __name__ == "__main__":
+    main()
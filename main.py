@@ -3,29 +3,65 @@
 import argparse
 import json
 import logging
+import time
 from pathlib import Path
 from src.supermanus.gatekeeper_agent import GatekeeperAgent
 from src.supermanus.coding_agent import CodingAgent
+from src.supermanus.log_index import SegmentedLogIndex
 from src.supermanus.logging_config import setup_logging
+from src.supermanus.state_storage import SERIALIZERS, STORAGE_BACKENDS, create_storage, migrate_state
 
 
 def main():
     parser = argparse.ArgumentParser(description="Miss_TaskMaster CLI")
-    parser.add_argument("command", choices=["load_plan", "run", "status", "execute_task"], help="Command to run")
+    parser.add_argument("command", choices=["load_plan", "run", "status", "execute_task", "migrate_state", "query_logs"], help="Command to run")
     parser.add_argument("--plan_file", help="Path to project plan JSON file")
     parser.add_argument("--task_id", help="Task ID for execution")
     parser.add_argument("--log_file", default="miss_taskmaster.log", help="Log file path")
     parser.add_argument("--log_level", default="INFO", choices=["DEBUG", "INFO", "WARNING", "ERROR"], help="Log level")
+    parser.add_argument("--log_max_mb", type=float, default=0.0, help="Rotate and gzip the log file when it reaches this size (0 disables rotation)")
+    parser.add_argument("--log_backup_count", type=int, default=10, help="Rotated log segments to keep")
+    parser.add_argument("--storage_backend", default="json", choices=sorted(STORAGE_BACKENDS), help="Session state storage engine")
+    parser.add_argument("--parallel", action="store_true", help="Dispatch every ready task in the run command")
+    parser.add_argument("--workers", type=int, default=0, help="Execute the plan in the run command with this many Coding Agent workers")
+    parser.add_argument("--executor", default="thread", choices=["thread", "process"], help="Worker pool type for --workers")
+    parser.add_argument("--flush_interval", type=float, default=0.0, help="Seconds session state writes may be coalesced (0 writes every change)")
+    parser.add_argument("--state_format", choices=sorted(SERIALIZERS), help="Snapshot format for the json and wal storage engines")
+    parser.add_argument("--counts_only", action="store_true", help="Print only task counts in the status command")
+    parser.add_argument("--level", help="Minimum log level for query_logs")
+    parser.add_argument("--logger", help="Logger name for query_logs (child loggers included)")
+    parser.add_argument("--since_minutes", type=float, help="Only logs from the last N minutes for query_logs")
+    parser.add_argument("--limit", type=int, help="Maximum number of records for query_logs")
+    parser.add_argument("--source_backend", default="json", choices=sorted(STORAGE_BACKENDS), help="Storage engine to migrate state from")
 
     args = parser.parse_args()
+    if args.state_format and args.storage_backend == "sqlite":
+        parser.error("--state_format applies to the json and wal backends only")
+
+    if args.command == "query_logs":
+        # Read-only: answered from the sidecar index without touching the session state
+        log_index = SegmentedLogIndex(Path(args.log_file))
+        log_index.update()
+        since = time.time() - args.since_minutes * 60 if args.since_minutes else None
+        for record in log_index.query(task_id=args.task_id, level=args.level, logger=args.logger,
+                                      since=since, limit=args.limit):
+            print(json.dumps(record))
+        log_index.close()
+        return
 
     # Setup logging
-    setup_logging(args.log_file, getattr(logging, args.log_level))
+    setup_logging(args.log_file, getattr(logging, args.log_level),
+                  max_bytes=int(args.log_max_mb * 1024 * 1024), backup_count=args.log_backup_count)
 
     # Initialize components
     project_root = Path(".")
-    gatekeeper = GatekeeperAgent(project_root)
+    storage_options = {"serializer": args.state_format} if args.state_format else None
+    gatekeeper = GatekeeperAgent(project_root, storage_backend=args.storage_backend,
+                                 flush_interval=args.flush_interval, storage_options=storage_options)
     coding_agent = CodingAgent(gatekeeper.receive_coding_agent_report)
+    if args.command in ("run", "status", "execute_task"):
+        # Continue from the plan and statuses persisted by earlier commands
+        gatekeeper.load_state()
 
     if args.command == "load_plan":
         if not args.plan_file:
@@ -37,23 +73,41 @@ def main():
         print("Project plan loaded.")
 
     elif args.command == "run":
-        gatekeeper.run_orchestration_loop()
-        print("Orchestration loop run.")
+        if args.workers > 0:
+            executed = gatekeeper.run_worker_pool(args.workers, args.executor)
+            print(f"Worker pool executed {executed} tasks.")
+        else:
+            gatekeeper.run_orchestration_loop(parallel=args.parallel)
+            print("Orchestration loop run.")
 
     elif args.command == "status":
-        status = gatekeeper.get_status()
+        status = gatekeeper.get_status_counts() if args.counts_only else gatekeeper.get_status()
         print(json.dumps(status, indent=2))
 
     elif args.command == "execute_task":
         if not args.task_id:
             print("Error: --task_id required for execute_task")
             return
-        # For simplicity, assign a dummy task
-        task = {"id": args.task_id, "description": f"Execute task {args.task_id}"}
+        task = gatekeeper.task_enforcer.get_task(args.task_id)
+        if task is None:
+            print(f"Error: task {args.task_id} is not in the loaded plan")
+            gatekeeper.close()
+            return
         coding_agent.assign_task(task)
         coding_agent.execute_task()
         print(f"Task {args.task_id} executed.")
 
+    elif args.command == "migrate_state":
+        if args.source_backend == args.storage_backend:
+            print("Error: --source_backend and --storage_backend must differ for migrate_state")
+            return
+        source = create_storage(args.source_backend, project_root / "session_state.json")
+        state = migrate_state(source, gatekeeper.session_manager.storage)
+        print(f"Migrated {len(state.get('project_tasks', []))} tasks from {args.source_backend} to {args.storage_backend}.")
+
+    # Write any coalesced state changes before exiting
+    gatekeeper.close()
+
 
 if __name__ == "__main__":
     main()
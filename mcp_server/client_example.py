@@ -9,7 +9,7 @@ the Miss_TaskMaster MCP Server using its REST APIs.
 import requests
 import json
 import time
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 import logging
 
 # Configure logging
@@ -62,12 +62,41 @@ class MCPServerClient:
         response.raise_for_status()
         return response.json()
 
-    def get_logs(self) -> str:
-        """Get MCP server logs"""
-        response = requests.get(f"{self.base_url}/logs")
+    def report_tasks(self, reports: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Report many task completions or failures in one request"""
+        response = requests.post(f"{self.base_url}/task/report/batch", json={"reports": reports})
+        response.raise_for_status()
+        return response.json()
+
+    def get_logs(self, tail: Optional[int] = None, **filters) -> str:
+        """Get MCP server logs, optionally only the last lines and filtered by level, logger or task_id"""
+        params = dict(filters)
+        if tail:
+            params["tail"] = tail
+        response = requests.get(f"{self.base_url}/logs", params=params)
         response.raise_for_status()
         return response.text
 
+    def stream_events(self):
+        """Yield task change events from the server-sent event stream"""
+        with requests.get(f"{self.base_url}/events", stream=True) as response:
+            response.raise_for_status()
+            for line in response.iter_lines(decode_unicode=True):
+                if line and line.startswith("data: "):
+                    yield json.loads(line[len("data: "):])
+
+    def get_task_changes(self, since: int) -> Dict[str, Any]:
+        """Get the tasks changed after a version; 'full' is true when the whole list was returned instead"""
+        response = requests.get(f"{self.base_url}/tasks", params={"since": since})
+        response.raise_for_status()
+        return response.json()
+
+    def query_tasks(self, **params) -> Dict[str, Any]:
+        """Get one page of tasks; params: status, phase, id_prefix, cursor, limit, fields (comma-separated)"""
+        response = requests.get(f"{self.base_url}/tasks", params=params)
+        response.raise_for_status()
+        return response.json()
+
     def get_task_list(self) -> Dict[str, Any]:
         """Get list of all project tasks"""
         response = requests.get(f"{self.base_url}/tasks")
@@ -87,22 +116,22 @@ def main():
         # 1. Health check
         logger.info("1. Checking MCP server health...")
         health = client.health_check()
-        logger.info(f"Health status: {health}")
+        logger.info("Health status: %s", health)
 
         # 2. Initialize project
         logger.info("\n2. Initializing project...")
         init_response = client.init_project("project_plan_template.json")
-        logger.info(f"Init response: {init_response}")
+        logger.info("Init response: %s", init_response)
 
         # 3. Get initial status
         logger.info("\n3. Getting project status...")
         status = client.get_project_status()
-        logger.info(f"Project has {status.get('active_tasks_available', 0)} active tasks")
+        logger.info("Project has %s active tasks", status.get('active_tasks_available', 0))
 
         # 4. Run orchestration (this will dispatch the first task)
         logger.info("\n4. Starting orchestration...")
         orch_response = client.run_orchestration()
-        logger.info(f"Orchestration: {orch_response}")
+        logger.info("Orchestration: %s", orch_response)
 
         # 5. Wait a moment for processing
         time.sleep(2)
@@ -112,31 +141,30 @@ def main():
         updated_status = client.get_project_status()
         current_task = updated_status.get('current_task', {})
         if current_task:
-            logger.info(f"Current active task: {current_task.get('id')} - {current_task.get('title')}")
+            logger.info("Current active task: %s - %s", current_task.get('id'), current_task.get('title'))
         else:
             logger.info("No active tasks currently")
 
         # 7. Get task list
         logger.info("\n6. Getting task list...")
         tasks = client.get_task_list()
-        logger.info(f"Total tasks in project: {tasks.get('total_count', 0)}")
+        logger.info("Total tasks in project: %s", tasks.get('total_count', 0))
 
         # 8. Get logs (last 200 characters to avoid spam)
         logger.info("\n7. Getting recent logs...")
-        logs = client.get_logs()
-        recent_logs = logs[-200:] if len(logs) > 200 else logs
-        logger.info(f"Recent logs: {recent_logs}")
+        recent_logs = client.get_logs(tail=5)
+        logger.info("Recent logs: %s", recent_logs)
 
         # Example: Simulate task completion (if a task was dispatched)
         if current_task:
             task_id = current_task.get('id')
-            logger.info(f"\n8. Simulating completion of task {task_id}...")
+            logger.info("\n8. Simulating completion of task %s...", task_id)
             report_response = client.report_task(
                 task_id=task_id,
                 status="completed",
                 output=f"Successfully completed {task_id} via client integration"
             )
-            logger.info(f"Task completion report: {report_response}")
+            logger.info("Task completion report: %s", report_response)
 
         logger.info("\n" + "=" * 50)
         logger.info("MCP Client example completed successfully!")
@@ -145,10 +173,10 @@ def main():
         logger.error("❌ Could not connect to MCP server. Make sure it's running on http://localhost:8000")
         logger.info("Run: cd mcp_server && python main.py")
     except requests.exceptions.HTTPError as e:
-        logger.error(f"❌ HTTP error: {e}")
-        logger.error(f"Response: {e.response.text if hasattr(e.response, 'text') else 'No response'}")
+        logger.error("❌ HTTP error: %s", e)
+        logger.error("Response: %s", e.response.text if hasattr(e.response, 'text') else 'No response')
     except Exception as e:
-        logger.error(f"❌ Unexpected error: {e}")
+        logger.error("❌ Unexpected error: %s", e)
 
 
 if __name__ == "__main__":
@@ -1,25 +1,46 @@
 # mcp_server/main.py
+import asyncio
+import os
 import sys
 from pathlib import Path
 import logging
 import json
-from typing import Dict, Any, List, Optional
+import time
+import zlib
+from typing import Callable, Dict, Any, List, Optional, Tuple
 
 # Adjust path for development to access supermanus core
 current_dir = Path(__file__).resolve().parent
 project_root = current_dir.parent
 sys.path.insert(0, str(project_root))
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from starlette.concurrency import iterate_in_threadpool
 from pydantic import BaseModel
 
-from src.supermanus.gatekeeper_agent import GatekeeperAgent
+from mcp_server.metrics_middleware import MetricsMiddleware
+from src.supermanus.async_agents import AsyncGatekeeperAgent, AsyncReportBatcher
+from src.supermanus.log_index import SegmentedLogIndex
+from src.supermanus.log_reader import LogFilter, LogReader
 from src.supermanus.logging_config import setup_logging
+from src.supermanus import prometheus_exporter
 
-# Setup logging with JSON format for server logs
-mcp_log_file = project_root / "mcp_server.log"
-setup_logging(log_file=mcp_log_file, level=logging.INFO, json_format=True)
+# Setup logging with JSON format for server logs (a relative LOG_FILE is resolved against the project root)
+mcp_log_file = project_root / os.environ.get("LOG_FILE", "mcp_server.log")
+setup_logging(
+    log_file=mcp_log_file,
+    level=logging.INFO,
+    json_format=True,
+    queue_size=int(os.environ.get("LOG_QUEUE_SIZE", "10000")),
+    overflow_policy=os.environ.get("LOG_OVERFLOW_POLICY", "drop_debug"),
+    max_bytes=int(float(os.environ.get("LOG_ROTATE_MAX_MB", "100")) * 1024 * 1024),
+    rotate_interval=float(os.environ.get("LOG_ROTATE_INTERVAL_MINUTES", "0")) * 60,
+    compression=os.environ.get("LOG_COMPRESSION", "gzip") or None,
+    backup_count=int(os.environ.get("LOG_BACKUP_COUNT", "20")),
+    max_age_days=float(os.environ.get("LOG_MAX_AGE_DAYS", "0"))
+)
 logger = logging.getLogger(__name__)
 
 app = FastAPI(
@@ -28,6 +49,13 @@ app = FastAPI(
     version="0.1.0"
 )
 
+# Per-route latency, status and in-flight metrics for /metrics
+app.add_middleware(
+    MetricsMiddleware,
+    slow_request_seconds=float(os.environ.get("SLOW_REQUEST_MS", "1000")) / 1000,
+    exclude_paths=("/metrics", "/health/metrics")
+)
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -37,9 +65,119 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize Gatekeeper Agent
-gatekeeper_project_root = project_root
-gatekeeper = GatekeeperAgent(project_root=gatekeeper_project_root)
+# Initialize Gatekeeper Agent; session_state.json lives in SESSION_STATE_DIR (the project root by default)
+gatekeeper_project_root = project_root / os.environ.get("SESSION_STATE_DIR", "")
+gatekeeper_project_root.mkdir(parents=True, exist_ok=True)
+storage_backend = os.environ.get("SESSION_STORAGE_BACKEND", "json")
+state_format = os.environ.get("SESSION_STATE_FORMAT")
+if state_format and storage_backend == "sqlite":
+    logger.warning("SESSION_STATE_FORMAT applies to the json and wal backends only; ignored for sqlite")
+    state_format = None
+gatekeeper = AsyncGatekeeperAgent(
+    project_root=gatekeeper_project_root,
+    storage_backend=storage_backend,
+    flush_interval=float(os.environ.get("STATE_FLUSH_INTERVAL_MS", "0")) / 1000,
+    max_pending_changes=int(os.environ.get("STATE_MAX_PENDING_CHANGES", "0")),
+    storage_options={"serializer": state_format} if state_format else None
+)
+
+# Coalesces bursts of single /task/report calls into group commits
+report_batcher = AsyncReportBatcher(
+    gatekeeper,
+    flush_window=float(os.environ.get("REPORT_FLUSH_WINDOW_MS", "0")) / 1000,
+    max_batch_size=int(os.environ.get("REPORT_MAX_BATCH_SIZE", "500"))
+)
+
+# Background scheduler runs started through /orchestration/run?execute=true
+_scheduler_tasks = set()
+
+# Streams /logs in bounded chunks
+log_reader = LogReader(mcp_log_file)
+MAX_LOG_TAIL_LINES = int(os.environ.get("MAX_LOG_TAIL_LINES", "10000"))
+# Sidecar indexes (one per rotated segment) for /logs/query, created on first use
+_log_index: Optional[SegmentedLogIndex] = None
+
+# Prometheus exposition: everything on /metrics, the API health collector alone on /health/metrics
+try:
+    metrics_registry = prometheus_exporter.create_registry()
+    health_metrics_registry = prometheus_exporter.create_registry(sections=("health",), include_process_metrics=False)
+except ImportError as e:
+    logger.warning("Prometheus endpoints disabled: %s", e)
+    metrics_registry = health_metrics_registry = None
+
+# Largest page /tasks returns when paginating
+MAX_TASK_PAGE_SIZE = int(os.environ.get("MAX_TASK_PAGE_SIZE", "1000"))
+
+# Per-client buffer of the /events stream and the keepalive interval for idle streams
+EVENT_BUFFER_SIZE = int(os.environ.get("EVENT_BUFFER_SIZE", "1000"))
+EVENT_KEEPALIVE_SECONDS = float(os.environ.get("EVENT_KEEPALIVE_SECONDS", "15"))
+
+# Task versions restart at 0 with the process, so ETags also carry the server start time
+_etag_epoch = f"{time.time_ns():x}"
+# Last serialized body per endpoint, reused while its ETag is current
+_response_cache: Dict[str, Tuple[str, bytes]] = {}
+
+def _read_json_file(path: Path) -> Dict[str, Any]:
+    with open(path, 'r') as f:
+        return json.load(f)
+
+class RangeNotSatisfiable(ValueError):
+    """A well-formed byte range that lies outside the file, answered with 416"""
+
+    def __init__(self, header: str, size: int):
+        super().__init__(f"Range not satisfiable: {header}")
+        self.size = size
+
+def _parse_byte_range(header: str, size: int) -> Tuple[int, int]:
+    """Parses a single 'bytes=start-end' range into (offset, length)"""
+    unit, _, spec = header.partition("=")
+    start, _, stop = spec.strip().partition("-")
+    if unit.strip() != "bytes" or "," in spec or not (start or stop):
+        raise ValueError(f"Unsupported range: {header}")
+    if not start:
+        offset = max(0, size - int(stop))
+        end = size
+    else:
+        offset = int(start)
+        end = min(size, int(stop) + 1) if stop else size
+    if offset >= end:
+        raise RangeNotSatisfiable(header, size)
+    return offset, end - offset
+
+def _state_etag() -> str:
+    """ETag of the current task state: changes whenever the enforcer version or overall status does"""
+    overall_status = str(gatekeeper.session_manager.get_state().get("overall_status", "not_started"))
+    return f'W/"{_etag_epoch}-{gatekeeper.task_enforcer.version}-{zlib.crc32(overall_status.encode()):x}"'
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    """Weak If-None-Match comparison"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = {candidate.strip().removeprefix("W/") for candidate in header.split(",")}
+    return "*" in candidates or etag.removeprefix("W/") in candidates
+
+def _conditional_json(request: Request, build: Callable[[], bytes], cache_key: Optional[str] = None) -> Response:
+    """Answers 304 when the client's ETag is current, otherwise the JSON body (reused per cache_key while current)"""
+    etag = _state_etag()
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if _etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    if cache_key is None:
+        return Response(content=build(), media_type="application/json", headers=headers)
+    cached = _response_cache.get(cache_key)
+    if cached is None or cached[0] != etag:
+        cached = (etag, build())
+        _response_cache[cache_key] = cached
+    return Response(content=cached[1], media_type="application/json", headers=headers)
+
+@app.on_event("shutdown")
+async def shutdown():
+    """Flush pending reports and session state before the server exits"""
+    await report_batcher.close()
+    await gatekeeper.close()
+    if _log_index is not None:
+        _log_index.close()
 
 # Pydantic models for request/response
 class InitProjectRequest(BaseModel):
@@ -51,7 +189,13 @@ class TaskReportRequest(BaseModel):
     output: Optional[str] = None
     error: Optional[str] = None
 
+class TaskReportBatchRequest(BaseModel):
+    reports: List[TaskReportRequest]
+
 class ProjectStatusResponse(BaseModel):
+    version: int = 0
+    overall_status: str = "not_started"
+    task_counts: Dict[str, int] = {}
     current_task: Optional[Dict[str, Any]] = None
     work_log_active: bool = False
     active_tasks_available: int = 0
@@ -67,6 +211,22 @@ async def health_check():
         "gatekeeper_status": "initialized"
     }
 
+def _prometheus_response(registry) -> Response:
+    if registry is None:
+        raise HTTPException(status_code=503, detail="prometheus-client is not installed")
+    # Set as a header: media_type would append a second charset
+    return Response(content=prometheus_exporter.render(registry), headers={"Content-Type": prometheus_exporter.CONTENT_TYPE_LATEST})
+
+@app.get("/metrics")
+async def metrics():
+    """Prometheus metrics: task, API health and application collectors plus process metrics"""
+    return await asyncio.to_thread(_prometheus_response, metrics_registry)
+
+@app.get("/health/metrics")
+async def health_metrics():
+    """Prometheus metrics of the API health collector only"""
+    return await asyncio.to_thread(_prometheus_response, health_metrics_registry)
+
 @app.post("/project/init")
 async def init_project(request: InitProjectRequest):
     """Initialize a new project with a plan file"""
@@ -75,82 +235,251 @@ async def init_project(request: InitProjectRequest):
         if not plan_file_path.exists():
             raise HTTPException(status_code=404, detail=f"Plan file not found: {request.plan_file}")
 
-        with open(plan_file_path, 'r') as f:
-            plan_data = json.load(f)
+        plan_data = await asyncio.to_thread(_read_json_file, plan_file_path)
 
-        gatekeeper.load_project_plan(plan_data)
+        await gatekeeper.load_project_plan(plan_data)
 
-        logger.info(f"Project initialized with plan file: {request.plan_file}")
+        logger.info("Project initialized with plan file: %s", request.plan_file)
         return {"message": "Project initialized successfully."}
 
     except HTTPException:
         raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid project plan: {str(e)}")
     except Exception as e:
-        logger.error(f"Error initializing project: {e}", exc_info=True)
+        logger.error("Error initializing project: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail=f"Error initializing project: {str(e)}")
 
 @app.get("/project/status", response_model=ProjectStatusResponse)
-async def get_project_status():
-    """Get current project status including tasks and active work"""
+async def get_project_status(request: Request):
+    """Get current project status including tasks and active work. Supports If-None-Match."""
     try:
-        status = gatekeeper.enforcer.get_status()
-        # Include project tasks for comprehensive status
-        status["project_tasks"] = gatekeeper.enforcer.project_tasks
-        return ProjectStatusResponse(**status)
+        # The snapshot is cached by the task enforcer and includes the project tasks
+        return _conditional_json(
+            request,
+            lambda: ProjectStatusResponse(**gatekeeper.get_status()).model_dump_json().encode("utf-8"),
+            cache_key="project_status"
+        )
     except Exception as e:
-        logger.error(f"Error getting project status: {e}", exc_info=True)
+        logger.error("Error getting project status: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail=f"Error getting project status: {str(e)}")
 
+@app.get("/project/status/counts")
+async def get_project_status_counts():
+    """Get task counts per status without the task lists, for frequent dashboard polling"""
+    try:
+        return gatekeeper.get_status_counts()
+    except Exception as e:
+        logger.error("Error getting project status counts: %s", e, exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Error getting project status counts: {str(e)}")
+
 @app.post("/orchestration/run")
-async def run_orchestration():
-    """Trigger the Gatekeeper Agent's orchestration loop"""
+async def run_orchestration(parallel: bool = False, execute: bool = False, max_concurrency: Optional[int] = None):
+    """Trigger the Gatekeeper Agent's orchestration loop, or start the scheduler to execute the whole plan"""
     try:
-        gatekeeper.run_orchestration_loop()
+        if execute:
+            if _scheduler_tasks:
+                return {"message": "Scheduler is already running."}
+            scheduler = asyncio.create_task(gatekeeper.run_scheduler(max_concurrency))
+            _scheduler_tasks.add(scheduler)
+            scheduler.add_done_callback(_scheduler_tasks.discard)
+            logger.info("Scheduler started")
+            return {"message": "Scheduler started. Check status or logs for progress."}
+
+        await gatekeeper.run_orchestration_loop(parallel=parallel)
         logger.info("Orchestration loop initiated")
         return {"message": "Orchestration loop initiated. Check logs for details."}
     except Exception as e:
-        logger.error(f"Error running orchestration: {e}", exc_info=True)
+        logger.error("Error running orchestration: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail=f"Error running orchestration: {str(e)}")
 
 @app.post("/task/report")
 async def report_task_status(request: TaskReportRequest):
     """Receive task completion/failure reports from Coding Agent"""
     try:
-        gatekeeper.receive_coding_agent_report(
+        await report_batcher.submit(
             request.task_id,
             request.status,
             output=request.output,
             error=request.error
         )
 
-        logger.info(f"Task report received for {request.task_id} with status: {request.status}")
+        logger.info("Task report received for %s with status: %s", request.task_id, request.status)
         return {"message": f"Report received for task {request.task_id} with status {request.status}."}
 
     except Exception as e:
-        logger.error(f"Error processing task report: {e}", exc_info=True)
+        logger.error("Error processing task report: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail=f"Error processing task report: {str(e)}")
 
+@app.post("/task/report/batch")
+async def report_task_status_batch(request: TaskReportBatchRequest):
+    """Receive many task reports and persist them with a single group commit"""
+    try:
+        count = await gatekeeper.receive_coding_agent_reports([report.model_dump() for report in request.reports])
+        logger.info("Batch of %s task reports received", count)
+        return {"message": f"Batch of {count} reports received.", "count": count}
+
+    except Exception as e:
+        logger.error("Error processing task report batch: %s", e, exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Error processing task report batch: {str(e)}")
+
+@app.get("/events")
+async def stream_events(request: Request):
+    """Server-sent event stream of task changes. A 'resync' event means events were dropped and /tasks should be reloaded."""
+    subscription = gatekeeper.event_bus.subscribe(max_buffer=EVENT_BUFFER_SIZE)
+
+    async def event_stream():
+        try:
+            hello = {"version": gatekeeper.task_enforcer.version}
+            yield f"event: hello\ndata: {json.dumps(hello)}\n\n"
+            while not await request.is_disconnected():
+                events = await subscription.aget(timeout=EVENT_KEEPALIVE_SECONDS)
+                if not events:
+                    yield ": keepalive\n\n"
+                    continue
+                yield "".join(
+                    (f"id: {event['id']}\n" if "id" in event else "")
+                    + f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+                    for event in events
+                )
+        finally:
+            subscription.close()
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
 @app.get("/logs")
-async def get_logs():
-    """Get server logs for debugging and monitoring"""
+async def get_logs(
+    request: Request,
+    offset: Optional[int] = Query(None, ge=0),
+    length: Optional[int] = Query(None, ge=1),
+    tail: Optional[int] = Query(None, ge=1, le=MAX_LOG_TAIL_LINES),
+    follow: bool = False,
+    level: Optional[str] = None,
+    logger_name: Optional[str] = Query(None, alias="logger"),
+    task_id: Optional[str] = None,
+    include_rotated: bool = False
+):
+    """
+    Stream server logs for debugging and monitoring, without loading the file into memory.
+
+    - offset, length (or a 'Range: bytes=a-b' header): byte range; X-Log-End-Offset is where to continue
+    - tail=N: only the last N (matching) lines
+    - follow=true: keep the connection open and stream new lines as they are written (after the tail or offset, if given)
+    - level (minimum), logger (including child loggers), task_id: server-side line filters
+    - include_rotated=true: also read the rotated (compressed) segments, oldest first; offsets still refer to the active file
+    """
     try:
-        log_file_path = project_root / "mcp_server.log"
-        if log_file_path.exists():
-            with open(log_file_path, 'r') as f:
-                return f.read()
-        return "No logs yet."
+        if not mcp_log_file.exists():
+            return PlainTextResponse("No logs yet.")
+        log_filter = LogFilter(level=level, logger=logger_name, task_id=task_id)
+        size = log_reader.size()
+        replay = offset is not None
+        offset = offset or 0
+        status_code = 200
+        headers = {"Cache-Control": "no-cache", "Accept-Ranges": "bytes"}
+        range_header = request.headers.get("range")
+        if range_header and tail is None and not follow:
+            offset, length = _parse_byte_range(range_header, size)
+            status_code = 206
+            headers["Content-Range"] = f"bytes {offset}-{offset + length - 1}/{size}"
+        offset = min(offset, size)
+        end = size if length is None else min(size, offset + length)
+        headers["X-Log-End-Offset"] = str(end)
+
+        if follow:
+            async def follow_stream():
+                if tail is not None or replay:
+                    async for chunk in iterate_in_threadpool(log_reader.read(offset, end, tail=tail, log_filter=log_filter,
+                                                                             include_rotated=include_rotated)):
+                        yield chunk
+                async for chunk in log_reader.follow(end, log_filter):
+                    if await request.is_disconnected():
+                        break
+                    yield chunk
+            return StreamingResponse(follow_stream(), media_type="text/plain", headers=headers)
+
+        return StreamingResponse(
+            log_reader.read(offset, end, tail=tail, log_filter=log_filter, include_rotated=include_rotated),
+            status_code=status_code, media_type="text/plain", headers=headers
+        )
+    except RangeNotSatisfiable as e:
+        raise HTTPException(status_code=416, detail=str(e), headers={"Content-Range": f"bytes */{e.size}"})
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        logger.error(f"Error reading logs: {e}", exc_info=True)
+        logger.error("Error reading logs: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail=f"Error reading logs: {str(e)}")
 
+@app.get("/logs/query")
+async def query_logs(
+    task_id: Optional[str] = None,
+    level: Optional[str] = None,
+    logger_name: Optional[str] = Query(None, alias="logger"),
+    since_minutes: Optional[float] = Query(None, gt=0),
+    limit: int = Query(1000, ge=1, le=MAX_LOG_TAIL_LINES)
+):
+    """Find log records by task_id, minimum level, logger and age through the sidecar log indexes, across rotated segments"""
+    global _log_index
+    try:
+        if _log_index is None:
+            _log_index = SegmentedLogIndex(mcp_log_file)
+        since = time.time() - since_minutes * 60 if since_minutes else None
+
+        def run_query() -> List[Dict[str, Any]]:
+            _log_index.update()
+            return list(_log_index.query(task_id=task_id, level=level, logger=logger_name, since=since, limit=limit))
+
+        records = await asyncio.to_thread(run_query)
+        return {"records": records, "count": len(records)}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error("Error querying logs: %s", e, exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Error querying logs: {str(e)}")
+
 @app.get("/tasks")
-async def get_task_list():
-    """Get list of all project tasks"""
+async def get_task_list(
+    request: Request,
+    since: Optional[int] = None,
+    status: Optional[str] = None,
+    phase: Optional[str] = None,
+    id_prefix: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_TASK_PAGE_SIZE),
+    fields: Optional[str] = None
+):
+    """
+    Get project tasks in plan order. Supports If-None-Match.
+
+    - since=<version>: only the tasks changed after that version ('full' is true if the whole list was returned instead);
+      cannot be combined with the filters or pagination, since a filtered delta would miss tasks that left the filter
+    - status, phase, id_prefix: filters served from the task enforcer's indexes
+    - limit, cursor: pagination; pass the returned next_cursor to get the next page
+    - fields: comma-separated fields to return (the id is always included)
+    """
     try:
-        tasks = gatekeeper.enforcer.project_tasks
-        return {"tasks": tasks, "total_count": len(tasks)}
+        enforcer = gatekeeper.task_enforcer
+        field_list = [field for field in fields.split(",") if field] if fields else None
+        if since is not None and any((status, phase, id_prefix, cursor, limit)):
+            raise ValueError("since cannot be combined with status, phase, id_prefix, cursor or limit")
+        changed = enforcer.get_tasks_changed_since(since, field_list) if since is not None else None
+        if changed is not None:
+            return _conditional_json(request, lambda: json.dumps(
+                {"tasks": changed, "total_count": len(enforcer.project_tasks), "version": enforcer.version, "full": False}
+            ).encode("utf-8"))
+        if not any((status, phase, id_prefix, cursor, limit, field_list)):
+            tasks = enforcer.project_tasks
+            return _conditional_json(request, lambda: json.dumps(
+                {"tasks": tasks, "total_count": len(tasks), "version": enforcer.version, "full": True}
+            ).encode("utf-8"), cache_key="tasks")
+        return _conditional_json(request, lambda: json.dumps(
+            {**enforcer.query_tasks(status, phase, id_prefix, cursor, limit, field_list), "full": True}
+        ).encode("utf-8"))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        logger.error(f"Error getting task list: {e}", exc_info=True)
+        logger.error("Error getting task list: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail=f"Error getting task list: {str(e)}")
 
 if __name__ == "__main__":
@@ -0,0 +1,102 @@
+# mcp_server/metrics_middleware.py
+import logging
+import time
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from src.supermanus.metrics_collector import RequestMetrics, get_request_metrics
+
+# Label for requests no route matched, so unknown paths cannot create new series
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware that times every HTTP request with perf_counter_ns
+    and records it per route template, method and status code.
+
+    Latency runs until the response starts (``http.response.start``), so a
+    streaming response such as /events or /logs?follow=true counts the time
+    to its headers rather than the lifetime of the connection. Everything
+    is recorded in RequestMetrics under per-route locks; the API health
+    metrics are aggregated from it when they are scraped.
+
+    The route template (e.g. '/tasks/{task_id}') is resolved after the app
+    has routed the request, from the endpoint the router stored in the
+    scope, so there is no extra route matching per request. Requests
+    slower than ``slow_request_seconds`` are logged as warnings.
+    """
+
+    def __init__(self, app: Callable, metrics: Optional[RequestMetrics] = None,
+                 slow_request_seconds: float = 1.0, exclude_paths: Iterable[str] = ()):
+        """
+        Initializes the MetricsMiddleware.
+
+        Args:
+            app (Callable): The wrapped ASGI app.
+            metrics (Optional[RequestMetrics]): Where to record requests. Defaults to the global request metrics.
+            slow_request_seconds (float): Log requests that take at least this long. 0 disables slow-request logging.
+            exclude_paths (Iterable[str]): Paths that are not recorded, e.g. the metrics endpoints themselves.
+        """
+        self.app = app
+        self.metrics = metrics or get_request_metrics()
+        self.slow_request_ns = int(slow_request_seconds * 1_000_000_000)
+        self.exclude_paths = frozenset(exclude_paths)
+        self.logger = logging.getLogger(__name__)
+        # Endpoint -> route template, built from the app's routes on first use
+        self._route_templates: Optional[Dict[Any, str]] = None
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http" or scope["path"] in self.exclude_paths:
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+        elapsed_ns: Optional[int] = None
+
+        async def send_with_status(message: Dict[str, Any]) -> None:
+            nonlocal status_code, elapsed_ns
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                elapsed_ns = time.perf_counter_ns() - start
+            await send(message)
+
+        start = time.perf_counter_ns()
+        self.metrics.request_started(method)
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            if elapsed_ns is None:
+                # The app failed before starting a response
+                elapsed_ns = time.perf_counter_ns() - start
+            self.metrics.request_finished(method)
+            route = self._route_template(scope)
+            self.metrics.record(route, method, elapsed_ns / 1_000_000_000, status_code)
+            if self.slow_request_ns and elapsed_ns >= self.slow_request_ns:
+                self.logger.warning("Slow request: %s %s (route %s) took %.1f ms with status %s",
+                                    method, scope["path"], route, elapsed_ns / 1_000_000, status_code)
+
+    def _route_template(self, scope: Dict[str, Any]) -> str:
+        """
+        Finds the template of the route that handled a request.
+
+        Args:
+            scope (Dict[str, Any]): The request scope, after routing.
+
+        Returns:
+            str: The route template, or UNMATCHED_ROUTE.
+        """
+        route = scope.get("route")
+        if route is not None and hasattr(route, "path_format"):
+            return route.path_format
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            return UNMATCHED_ROUTE
+        if self._route_templates is None:
+            app = scope.get("app")
+            self._route_templates = {
+                route.endpoint: route.path_format
+                for route in getattr(app, "routes", ())
+                if hasattr(route, "endpoint") and hasattr(route, "path_format")
+            }
+        return self._route_templates.get(endpoint, UNMATCHED_ROUTE)
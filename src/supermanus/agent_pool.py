@@ -0,0 +1,88 @@
+# src/supermanus/agent_pool.py
+import logging
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import TYPE_CHECKING, Dict, Any, Optional, Tuple
+from .coding_agent import CodingAgent
+
+if TYPE_CHECKING:
+    from concurrent.futures import Future
+
+# (task_id, status, output, error), the arguments of GatekeeperAgent.receive_coding_agent_report
+Report = Tuple[str, str, Optional[str], Optional[str]]
+
+
+def run_coding_agent(task: Dict[str, Any]) -> Report:
+    """
+    Executes a task with a fresh CodingAgent and returns its report.
+    Defined at module level so that it can run in a process pool.
+
+    Args:
+        task (Dict[str, Any]): The task.
+
+    Returns:
+        Report: The agent's report.
+    """
+    reports = []
+    agent = CodingAgent(lambda *report: reports.append(report))
+    agent.assign_task(task)
+    agent.execute_task()
+    if reports:
+        return reports[-1]
+    return task["id"], "failed", None, "Coding agent finished without reporting"
+
+
+class CodingAgentPool:
+    """
+    Runs CodingAgents concurrently on a thread or process pool.
+    Workers return their reports instead of calling back into the Gatekeeper,
+    so the caller decides where reports are applied.
+    """
+
+    EXECUTORS = {
+        "thread": ThreadPoolExecutor,
+        "process": ProcessPoolExecutor,
+    }
+
+    def __init__(self, max_workers: Optional[int] = None, executor: str = "thread"):
+        """
+        Initializes the CodingAgentPool.
+
+        Args:
+            max_workers (Optional[int]): Number of workers. Defaults to the number of CPUs.
+            executor (str): 'thread' or 'process'.
+        """
+        if executor not in self.EXECUTORS:
+            raise ValueError(f"Unknown executor '{executor}'. Available: {', '.join(sorted(self.EXECUTORS))}")
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.executor_type = executor
+        self._executor: Executor = self.EXECUTORS[executor](max_workers=self.max_workers)
+        self.logger = logging.getLogger(__name__)
+
+    def submit(self, task: Dict[str, Any]) -> "Future[Report]":
+        """
+        Submits a task to a worker.
+
+        Args:
+            task (Dict[str, Any]): The task.
+
+        Returns:
+            Future[Report]: Resolves to the agent's report.
+        """
+        self.logger.info("Submitting task %s to %s pool", task['id'], self.executor_type)
+        return self._executor.submit(run_coding_agent, dict(task))
+
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        Shuts the pool down.
+
+        Args:
+            wait (bool): Whether to wait for running tasks.
+        """
+        self._executor.shutdown(wait=wait)
+
+    def __enter__(self) -> "CodingAgentPool":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.shutdown(wait=True)
@@ -0,0 +1,594 @@
+# src/supermanus/async_agents.py
+import asyncio
+import inspect
+import logging
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Dict, Any, AsyncIterator, List, Optional, Tuple
+from .coding_agent import CodingAgent
+from .event_bus import EventBus
+from .llm_guard import LLMGuard
+from .logging_config import log_context
+from .session_manager import SessionManager
+from .state_storage import StateStorage, create_storage
+from .task_enforcer import TaskEnforcer
+
+
+class AsyncSessionManager(SessionManager):
+    """
+    SessionManager for asyncio applications.
+
+    State changes are applied in memory immediately, but storage I/O only
+    happens when ``commit`` or ``aflush`` is awaited, and then runs in a
+    worker thread so the event loop is never blocked by disk writes. With a
+    ``flush_interval``, ``commit`` leaves the write to a background asyncio
+    task that flushes at most that many seconds later.
+    """
+
+    def __init__(self, state_file: str = "session_state.json", storage: Optional[StateStorage] = None,
+                 flush_interval: float = 0.0, max_pending_changes: int = 0):
+        """
+        Initializes the AsyncSessionManager.
+
+        Args:
+            state_file (str): Path to the state file.
+            storage (Optional[StateStorage]): The storage engine. Defaults to a JSON file at ``state_file``.
+            flush_interval (float): Maximum seconds a change may stay unwritten. 0 writes on every commit.
+            max_pending_changes (int): Number of unwritten changes that forces a flush. 0 disables the limit.
+        """
+        super().__init__(state_file, storage, flush_interval, max_pending_changes)
+        # Held by everything that mutates the state, so a flush never sees a half-applied update
+        self.mutation_lock = asyncio.Lock()
+        self._loaded = False
+        self._io_lock = asyncio.Lock()
+        self._flusher_task: Optional[asyncio.Task] = None
+
+    async def load(self) -> Dict[str, Any]:
+        """
+        Loads the state from the storage engine without blocking the event loop.
+
+        Returns:
+            Dict[str, Any]: The loaded state.
+        """
+        async with self._io_lock:
+            await asyncio.to_thread(SessionManager.load_state, self)
+            self._loaded = True
+        return self.state
+
+    def load_state(self) -> Dict[str, Any]:
+        """
+        Returns the state loaded by ``load``. Falls back to a blocking load
+        if ``load`` has not been awaited yet.
+
+        Returns:
+            Dict[str, Any]: The state.
+        """
+        if not self._loaded:
+            super().load_state()
+            self._loaded = True
+        return self.state
+
+    def _schedule_flush(self) -> None:
+        # Writes are only performed when commit() or aflush() is awaited
+        pass
+
+    async def commit(self) -> None:
+        """
+        Persists pending writes according to the flush policy.
+        """
+        if self.flush_interval <= 0 or (
+                self.max_pending_changes and len(self._pending_changes) >= self.max_pending_changes):
+            await self.aflush()
+        elif self._flusher_task is None:
+            self._flusher_task = asyncio.create_task(self._flush_periodically_async())
+
+    async def _flush_periodically_async(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            if self.dirty:
+                async with self.mutation_lock:
+                    await self.aflush()
+
+    async def aflush(self) -> bool:
+        """
+        Writes the pending snapshot or changes to the storage engine in a worker thread.
+
+        Returns:
+            bool: True if something was written.
+        """
+        async with self._io_lock:
+            return await asyncio.to_thread(self.flush)
+
+    async def aclose(self) -> None:
+        """
+        Stops the background flusher, writes pending state and closes the storage engine.
+        """
+        if self._flusher_task is not None:
+            self._flusher_task.cancel()
+            try:
+                await self._flusher_task
+            except asyncio.CancelledError:
+                pass
+            self._flusher_task = None
+        async with self.mutation_lock:
+            await self.aflush()
+        await asyncio.to_thread(self.storage.close)
+
+
+class AsyncTaskEnforcer:
+    """
+    Awaitable front-end for TaskEnforcer.
+
+    Mutations run in memory on the event loop and are then persisted through
+    ``AsyncSessionManager.commit``. They are serialized by the session
+    manager's mutation lock, so the state is never mutated while a flush is
+    writing it. Reads such as ``get_status`` need no lock and return immediately.
+    """
+
+    def __init__(self, session_manager: AsyncSessionManager, event_bus: Optional[EventBus] = None):
+        """
+        Initializes the AsyncTaskEnforcer.
+
+        Args:
+            session_manager (AsyncSessionManager): The session manager instance.
+            event_bus (Optional[EventBus]): Bus that receives task change events.
+        """
+        self.session_manager = session_manager
+        self.enforcer = TaskEnforcer(session_manager, event_bus)
+        self._lock = session_manager.mutation_lock
+
+    @property
+    def project_tasks(self) -> List[Dict[str, Any]]:
+        return self.enforcer.project_tasks
+
+    @property
+    def current_task(self) -> Optional[Dict[str, Any]]:
+        return self.enforcer.current_task
+
+    @property
+    def version(self) -> int:
+        return self.enforcer.version
+
+    async def load_project_plan(self, plan: Dict[str, Any]) -> None:
+        """
+        Loads the project plan.
+
+        Args:
+            plan (Dict[str, Any]): The project plan.
+
+        Raises:
+            ValueError: If a task depends on an unknown task or the dependencies contain a cycle.
+        """
+        async with self._lock:
+            await self.session_manager.load()
+            self.enforcer.load_project_plan(plan)
+            await self.session_manager.commit()
+
+    async def assign_next_task(self) -> Optional[Dict[str, Any]]:
+        """
+        Assigns the first ready task in plan order.
+
+        Returns:
+            Optional[Dict[str, Any]]: The next task.
+        """
+        async with self._lock:
+            task = self.enforcer.assign_next_task()
+            await self.session_manager.commit()
+        return task
+
+    async def assign_ready_tasks(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Marks every ready task (up to ``limit``) as in progress.
+
+        Args:
+            limit (Optional[int]): Maximum number of tasks to assign.
+
+        Returns:
+            List[Dict[str, Any]]: The assigned tasks in plan order.
+        """
+        async with self._lock:
+            tasks = self.enforcer.assign_ready_tasks(limit)
+            await self.session_manager.commit()
+        return tasks
+
+    async def mark_task_completed(self, task_id: str) -> None:
+        """
+        Marks a task as completed.
+
+        Args:
+            task_id (str): The task ID.
+        """
+        async with self._lock:
+            self.enforcer.mark_task_completed(task_id)
+            await self.session_manager.commit()
+
+    async def mark_task_failed(self, task_id: str, error: str) -> None:
+        """
+        Marks a task as failed.
+
+        Args:
+            task_id (str): The task ID.
+            error (str): The error message.
+        """
+        async with self._lock:
+            self.enforcer.mark_task_failed(task_id, error)
+            await self.session_manager.commit()
+
+    @asynccontextmanager
+    async def batch(self) -> AsyncIterator[TaskEnforcer]:
+        """
+        Holds the mutation lock for a group of synchronous TaskEnforcer calls
+        and persists all of their changes with one commit when the block exits.
+
+        Yields:
+            TaskEnforcer: The wrapped enforcer.
+        """
+        async with self._lock:
+            yield self.enforcer
+            await self.session_manager.commit()
+
+    def get_status(self) -> Dict[str, Any]:
+        """
+        Gets the current status of the project.
+
+        Returns:
+            Dict[str, Any]: The status.
+        """
+        return self.enforcer.get_status()
+
+    def get_status_counts(self) -> Dict[str, Any]:
+        """
+        Gets the task counts per status without the task lists.
+
+        Returns:
+            Dict[str, Any]: The counts.
+        """
+        return self.enforcer.get_status_counts()
+
+    def get_tasks_changed_since(self, since: int, fields: Optional[List[str]] = None) -> Optional[List[Dict[str, Any]]]:
+        """
+        Gets the tasks changed after a version.
+
+        Args:
+            since (int): A version previously returned by this enforcer.
+            fields (Optional[List[str]]): Task fields to return.
+
+        Returns:
+            Optional[List[Dict[str, Any]]]: The changed tasks, or None if a full reload is needed.
+        """
+        return self.enforcer.get_tasks_changed_since(since, fields)
+
+    def query_tasks(self, status: Optional[str] = None, phase: Optional[str] = None,
+                    id_prefix: Optional[str] = None, cursor: Optional[str] = None,
+                    limit: Optional[int] = None, fields: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Gets one page of tasks in plan order (see ``TaskEnforcer.query_tasks``).
+
+        Returns:
+            Dict[str, Any]: The tasks, next cursor, total count and version.
+
+        Raises:
+            ValueError: If the cursor is invalid.
+        """
+        return self.enforcer.query_tasks(status, phase, id_prefix, cursor, limit, fields)
+
+
+class AsyncCodingAgent(CodingAgent):
+    """
+    Coding Agent whose execution and reporting are awaitable.
+    The report callback may be a plain function or a coroutine function.
+    """
+
+    async def execute_task(self) -> None:
+        """
+        Executes the current task.
+        """
+        if not self.current_task:
+            self.logger.warning("No task assigned.")
+            return
+
+        task_id = self.current_task["id"]
+        # Tags everything logged while executing and reporting, including the Gatekeeper's callback
+        with log_context(task_id=task_id):
+            self.logger.info("Executing task %s", task_id)
+
+            try:
+                # Simulate task execution
+                # In a real implementation, this would await actual coding actions
+                await asyncio.sleep(0)
+                result = f"Task {task_id} executed successfully."
+            except Exception as e:
+                await self.report_failure(str(e))
+                return
+            await self.report_completion(result)
+
+    async def report_completion(self, output: str) -> None:
+        """
+        Reports task completion.
+
+        Args:
+            output (str): The output.
+        """
+        if self.report_callback and self.current_task:
+            await self._report(self.current_task["id"], "completed", output, None)
+            self.logger.info("Reported completion for task %s", self.current_task['id'], extra={"task_id": self.current_task['id']})
+
+    async def report_failure(self, error: str) -> None:
+        """
+        Reports task failure.
+
+        Args:
+            error (str): The error message.
+        """
+        if self.report_callback and self.current_task:
+            await self._report(self.current_task["id"], "failed", None, error)
+            self.logger.error("Reported failure for task %s: %s", self.current_task['id'], error, extra={"task_id": self.current_task['id']})
+
+    async def _report(self, task_id: str, status: str, output: Optional[str], error: Optional[str]) -> None:
+        result = self.report_callback(task_id, status, output, error)
+        if inspect.isawaitable(result):
+            await result
+
+
+class AsyncGatekeeperAgent:
+    """
+    asyncio variant of the GatekeeperAgent for use inside an event loop,
+    such as the MCP server.
+    """
+
+    def __init__(self, project_root: Path, storage_backend: str = "json",
+                 flush_interval: float = 0.0, max_pending_changes: int = 0,
+                 storage_options: Optional[Dict[str, Any]] = None):
+        """
+        Initializes the AsyncGatekeeperAgent.
+
+        Args:
+            project_root (Path): The project root directory.
+            storage_backend (str): The session state storage engine ('json', 'wal' or 'sqlite').
+            flush_interval (float): Maximum seconds a state change may stay unwritten. 0 writes every change.
+            max_pending_changes (int): Number of unwritten changes that forces a write. 0 disables the limit.
+            storage_options (Optional[Dict[str, Any]]): Extra options for the storage engine, e.g. ``{"serializer": "msgpack"}``.
+        """
+        self.project_root = project_root
+        state_file = project_root / "session_state.json"
+        self.session_manager = AsyncSessionManager(
+            str(state_file),
+            storage=create_storage(storage_backend, state_file, **(storage_options or {})),
+            flush_interval=flush_interval,
+            max_pending_changes=max_pending_changes
+        )
+        self.event_bus = EventBus()
+        self.task_enforcer = AsyncTaskEnforcer(self.session_manager, self.event_bus)
+        self.llm_guard = LLMGuard()
+        self.logger = logging.getLogger(__name__)
+
+    async def load_project_plan(self, plan: Dict[str, Any]) -> None:
+        """
+        Loads the project plan.
+
+        Args:
+            plan (Dict[str, Any]): The project plan.
+        """
+        await self.task_enforcer.load_project_plan(plan)
+        self.logger.info("Project plan loaded by Gatekeeper.")
+
+    async def run_orchestration_loop(self, parallel: bool = False) -> None:
+        """
+        Runs the orchestration loop to assign tasks.
+
+        Args:
+            parallel (bool): Dispatch every ready task at once instead of only the next one.
+        """
+        if parallel:
+            tasks = await self.dispatch_ready_tasks()
+            if not tasks:
+                self.logger.info("Orchestration: No tasks to assign.")
+            return
+
+        task = await self.task_enforcer.assign_next_task()
+        if task:
+            self.logger.info("Orchestration: Assigned task %s", task['id'], extra={"task_id": task['id']})
+        else:
+            self.logger.info("Orchestration: No tasks to assign.")
+
+    async def dispatch_ready_tasks(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Assigns every task whose dependencies are completed.
+
+        Args:
+            limit (Optional[int]): Maximum number of tasks to assign.
+
+        Returns:
+            List[Dict[str, Any]]: The assigned tasks.
+        """
+        tasks = await self.task_enforcer.assign_ready_tasks(limit)
+        for task in tasks:
+            self.logger.info("Orchestration: Assigned task %s", task['id'], extra={"task_id": task['id']})
+        return tasks
+
+    async def receive_coding_agent_report(self, task_id: str, status: str, output: Optional[str] = None, error: Optional[str] = None) -> None:
+        """
+        Receives a report from the Coding Agent.
+
+        Args:
+            task_id (str): The task ID.
+            status (str): The status ('completed' or 'failed').
+            output (Optional[str]): The output.
+            error (Optional[str]): The error message.
+        """
+        async with self.task_enforcer.batch() as enforcer:
+            self._apply_report(enforcer, task_id, status, error)
+
+    async def receive_coding_agent_reports(self, reports: List[Dict[str, Any]]) -> int:
+        """
+        Receives a batch of Coding Agent reports. All status changes are
+        applied in memory and persisted with a single flush.
+
+        Args:
+            reports (List[Dict[str, Any]]): Reports with 'task_id', 'status' and optional 'output'/'error'.
+
+        Returns:
+            int: The number of reports applied.
+        """
+        async with self.task_enforcer.batch() as enforcer:
+            for report in reports:
+                self._apply_report(enforcer, report["task_id"], report["status"], report.get("error"))
+        self.logger.info("Applied batch of %s task reports.", len(reports))
+        return len(reports)
+
+    def _apply_report(self, enforcer: TaskEnforcer, task_id: str, status: str, error: Optional[str]) -> None:
+        """
+        Applies one report to the task enforcer.
+
+        Args:
+            enforcer (TaskEnforcer): The enforcer yielded by ``AsyncTaskEnforcer.batch``.
+            task_id (str): The task ID.
+            status (str): The status ('completed' or 'failed').
+            error (Optional[str]): The error message.
+        """
+        if status == "completed":
+            enforcer.mark_task_completed(task_id)
+            self.logger.info("Task %s completed.", task_id, extra={"task_id": task_id})
+        elif status == "failed":
+            enforcer.mark_task_failed(task_id, error or "Unknown error")
+            self.logger.error("Task %s failed: %s", task_id, error, extra={"task_id": task_id})
+        else:
+            self.logger.warning("Unknown status for task %s: %s", task_id, status, extra={"task_id": task_id})
+
+    async def run_scheduler(self, max_concurrency: Optional[int] = None) -> int:
+        """
+        Executes the plan with AsyncCodingAgents, starting each task as soon
+        as its dependencies are completed.
+
+        Args:
+            max_concurrency (Optional[int]): Maximum number of tasks running at once. Unlimited if None.
+
+        Returns:
+            int: The number of tasks executed.
+        """
+        executed = 0
+        running: Dict[asyncio.Task, str] = {}
+        while True:
+            free_slots = None if max_concurrency is None else max_concurrency - len(running)
+            if free_slots is None or free_slots > 0:
+                for task in await self.dispatch_ready_tasks(limit=free_slots):
+                    agent = AsyncCodingAgent(self.receive_coding_agent_report)
+                    agent.assign_task(task)
+                    running[asyncio.create_task(agent.execute_task())] = task["id"]
+            if not running:
+                break
+            done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            for finished in done:
+                task_id = running.pop(finished)
+                executed += 1
+                if finished.exception() is not None:
+                    self.logger.error("Coding agent crashed while executing task %s: %s", task_id, finished.exception(), extra={"task_id": task_id})
+                    await self.receive_coding_agent_report(task_id, "failed", error=str(finished.exception()))
+        self.logger.info("Scheduler finished after executing %s tasks.", executed)
+        return executed
+
+    def get_status(self) -> Dict[str, Any]:
+        """
+        Gets the project status.
+
+        Returns:
+            Dict[str, Any]: The status.
+        """
+        return self.task_enforcer.get_status()
+
+    def get_status_counts(self) -> Dict[str, Any]:
+        """
+        Gets the task counts per status without the task lists.
+
+        Returns:
+            Dict[str, Any]: The counts.
+        """
+        return self.task_enforcer.get_status_counts()
+
+    async def close(self) -> None:
+        """
+        Flushes pending state and closes the storage engine.
+        """
+        await self.session_manager.aclose()
+
+
+class AsyncReportBatcher:
+    """
+    Coalesces individual task reports into group commits.
+
+    Reports submitted within ``flush_window`` seconds of the first pending
+    report (or until ``max_batch_size`` reports are pending) are applied with
+    one ``receive_coding_agent_reports`` call. Each ``submit`` returns once
+    its report has been persisted.
+    """
+
+    def __init__(self, gatekeeper: AsyncGatekeeperAgent, flush_window: float = 0.0, max_batch_size: int = 500):
+        """
+        Initializes the AsyncReportBatcher.
+
+        Args:
+            gatekeeper (AsyncGatekeeperAgent): The gatekeeper receiving the reports.
+            flush_window (float): Seconds to wait for more reports. 0 applies every report immediately.
+            max_batch_size (int): Number of pending reports that triggers an immediate flush.
+        """
+        self.gatekeeper = gatekeeper
+        self.flush_window = flush_window
+        self.max_batch_size = max_batch_size
+        self.logger = logging.getLogger(__name__)
+        self._pending: List[Tuple[Dict[str, Any], asyncio.Future]] = []
+        self._timer: Optional[asyncio.Task] = None
+
+    async def submit(self, task_id: str, status: str, output: Optional[str] = None, error: Optional[str] = None) -> None:
+        """
+        Submits a report and waits until it has been applied and persisted.
+
+        Args:
+            task_id (str): The task ID.
+            status (str): The status ('completed' or 'failed').
+            output (Optional[str]): The output.
+            error (Optional[str]): The error message.
+        """
+        if self.flush_window <= 0:
+            await self.gatekeeper.receive_coding_agent_report(task_id, status, output=output, error=error)
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append(({"task_id": task_id, "status": status, "output": output, "error": error}, future))
+        if len(self._pending) >= self.max_batch_size:
+            await self.flush()
+        elif self._timer is None:
+            self._timer = asyncio.create_task(self._flush_after_window())
+        await future
+
+    async def _flush_after_window(self) -> None:
+        await asyncio.sleep(self.flush_window)
+        self._timer = None
+        await self.flush()
+
+    async def flush(self) -> None:
+        """
+        Applies every pending report with one group commit.
+        """
+        if self._timer is not None and self._timer is not asyncio.current_task():
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        try:
+            await self.gatekeeper.receive_coding_agent_reports([report for report, _ in batch])
+        except Exception as e:
+            self.logger.error("Error applying batch of %s task reports: %s", len(batch), e, exc_info=True)
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for _, future in batch:
+            if not future.done():
+                future.set_result(None)
+
+    async def close(self) -> None:
+        """
+        Flushes any pending reports.
+        """
+        await self.flush()
@@ -1,6 +1,7 @@
 # src/supermanus/coding_agent.py
 import logging
 from typing import Dict, Any, Optional, Callable
+from .logging_config import log_context
 
 
 class CodingAgent:
@@ -27,7 +28,7 @@ class CodingAgent:
             task (Dict[str, Any]): The task.
         """
         self.current_task = task
-        self.logger.info(f"Task assigned: {task['id']}")
+        self.logger.info("Task assigned: %s", task['id'], extra={"task_id": task['id']})
 
     def execute_task(self) -> None:
         """
@@ -38,15 +39,17 @@ class CodingAgent:
             return
 
         task_id = self.current_task["id"]
-        self.logger.info(f"Executing task {task_id}")
-
-        try:
-            # Simulate task execution
-            # In a real implementation, this would perform actual coding actions
-            result = f"Task {task_id} executed successfully."
-            self.report_completion(result)
-        except Exception as e:
-            self.report_failure(str(e))
+        # Tags everything logged while executing and reporting, including the Gatekeeper's callback
+        with log_context(task_id=task_id):
+            self.logger.info("Executing task %s", task_id)
+
+            try:
+                # Simulate task execution
+                # In a real implementation, this would perform actual coding actions
+                result = f"Task {task_id} executed successfully."
+                self.report_completion(result)
+            except Exception as e:
+                self.report_failure(str(e))
 
     def report_completion(self, output: str) -> None:
         """
@@ -57,7 +60,7 @@ class CodingAgent:
         """
         if self.report_callback and self.current_task:
             self.report_callback(self.current_task["id"], "completed", output, None)
-            self.logger.info(f"Reported completion for task {self.current_task['id']}")
+            self.logger.info("Reported completion for task %s", self.current_task['id'], extra={"task_id": self.current_task['id']})
 
     def report_failure(self, error: str) -> None:
         """
@@ -68,7 +71,7 @@ class CodingAgent:
         """
         if self.report_callback and self.current_task:
             self.report_callback(self.current_task["id"], "failed", None, error)
-            self.logger.error(f"Reported failure for task {self.current_task['id']}: {error}")
+            self.logger.error("Reported failure for task %s: %s", self.current_task['id'], error, extra={"task_id": self.current_task['id']})
 
 
 if __name__ == "__main__":
@@ -0,0 +1,205 @@
+# src/supermanus/event_bus.py
+import asyncio
+import logging
+import threading
+from collections import deque
+from typing import Dict, Any, List, Optional, Tuple
+
+
+class Subscription:
+    """
+    A subscriber's bounded event buffer.
+
+    When the buffer is full the oldest event is dropped, so a slow consumer
+    never blocks the publisher. The next read then starts with a ``resync``
+    event that tells the consumer to reload the full state.
+    """
+
+    def __init__(self, bus: "EventBus", max_buffer: int):
+        """
+        Initializes the Subscription.
+
+        Args:
+            bus (EventBus): The bus this subscription belongs to.
+            max_buffer (int): Maximum number of buffered events.
+        """
+        self.bus = bus
+        self.max_buffer = max_buffer
+        self.dropped = 0
+        self._buffer: deque = deque()
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        # Async consumers are woken on the loop they subscribed from
+        try:
+            self._loop: Optional[asyncio.AbstractEventLoop] = asyncio.get_running_loop()
+            self._async_ready: Optional[asyncio.Event] = asyncio.Event()
+        except RuntimeError:
+            self._loop = None
+            self._async_ready = None
+
+    def push(self, event: Dict[str, Any]) -> None:
+        """
+        Buffers an event without blocking. Called by the bus.
+
+        Args:
+            event (Dict[str, Any]): The event.
+        """
+        with self._lock:
+            if len(self._buffer) >= self.max_buffer:
+                self._buffer.popleft()
+                self.dropped += 1
+            self._buffer.append(event)
+        self._ready.set()
+        if self._loop is not None:
+            try:
+                running_loop = asyncio.get_running_loop()
+            except RuntimeError:
+                running_loop = None
+            if running_loop is self._loop:
+                self._async_ready.set()
+            elif not self._loop.is_closed():
+                self._loop.call_soon_threadsafe(self._async_ready.set)
+
+    def drain(self) -> List[Dict[str, Any]]:
+        """
+        Takes every buffered event.
+
+        Returns:
+            List[Dict[str, Any]]: The events, preceded by a ``resync`` event if any were dropped.
+        """
+        with self._lock:
+            events = list(self._buffer)
+            self._buffer.clear()
+            dropped, self.dropped = self.dropped, 0
+            self._ready.clear()
+            if self._async_ready is not None:
+                self._async_ready.clear()
+        if dropped:
+            events.insert(0, {"type": "resync", "dropped": dropped})
+        return events
+
+    def get(self, timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        Waits for events from a thread.
+
+        Args:
+            timeout (Optional[float]): Maximum seconds to wait.
+
+        Returns:
+            List[Dict[str, Any]]: The events, or an empty list on timeout.
+        """
+        self._ready.wait(timeout)
+        return self.drain()
+
+    async def aget(self, timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        Waits for events on the event loop the subscription was created on.
+
+        Args:
+            timeout (Optional[float]): Maximum seconds to wait.
+
+        Returns:
+            List[Dict[str, Any]]: The events, or an empty list on timeout.
+        """
+        if self._async_ready is None:
+            raise RuntimeError("Subscription was not created inside an event loop")
+        deadline = None if timeout is None else self._loop.time() + timeout
+        while True:
+            events = self.drain()
+            if events:
+                return events
+            remaining = None if deadline is None else deadline - self._loop.time()
+            if remaining is not None and remaining <= 0:
+                return []
+            try:
+                await asyncio.wait_for(self._async_ready.wait(), remaining)
+            except asyncio.TimeoutError:
+                return self.drain()
+
+    def close(self) -> None:
+        """
+        Unsubscribes from the bus.
+        """
+        self.bus.unsubscribe(self)
+
+
+class EventBus:
+    """
+    In-process publish/subscribe bus for task state changes.
+
+    ``publish`` is non-blocking and costs O(subscribers), or nothing when
+    nobody is subscribed. It is safe to call from any thread.
+    """
+
+    def __init__(self, max_buffer: int = 1000):
+        """
+        Initializes the EventBus.
+
+        Args:
+            max_buffer (int): Default per-subscriber buffer size.
+        """
+        self.max_buffer = max_buffer
+        self.logger = logging.getLogger(__name__)
+        # Replaced (copy-on-write) on subscribe/unsubscribe so publishers iterate without locking
+        self._subscribers: Tuple[Subscription, ...] = ()
+        self._lock = threading.Lock()
+        self._sequence = 0
+
+    @property
+    def has_subscribers(self) -> bool:
+        return bool(self._subscribers)
+
+    def subscribe(self, max_buffer: Optional[int] = None) -> Subscription:
+        """
+        Creates a subscription. Call it from the event loop for async consumers.
+
+        Args:
+            max_buffer (Optional[int]): Buffer size. Defaults to the bus default.
+
+        Returns:
+            Subscription: The subscription.
+        """
+        subscription = Subscription(self, max_buffer or self.max_buffer)
+        with self._lock:
+            self._subscribers = self._subscribers + (subscription,)
+        self.logger.info("Event subscriber added (%s active)", len(self._subscribers))
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        """
+        Removes a subscription.
+
+        Args:
+            subscription (Subscription): The subscription.
+        """
+        with self._lock:
+            self._subscribers = tuple(s for s in self._subscribers if s is not subscription)
+        self.logger.info("Event subscriber removed (%s active)", len(self._subscribers))
+
+    def publish(self, event_type: str, **data: Any) -> None:
+        """
+        Delivers an event to every subscriber.
+
+        Args:
+            event_type (str): The event type.
+            **data: The event payload.
+        """
+        if not self._subscribers:
+            return
+        with self._lock:
+            self._sequence += 1
+            event = {"id": self._sequence, "type": event_type, **data}
+            subscribers = self._subscribers
+        for subscription in subscribers:
+            subscription.push(event)
+
+
+if __name__ == "__main__":
+    # Simple test
+    logging.basicConfig(level=logging.INFO)
+    bus = EventBus(max_buffer=2)
+    subscription = bus.subscribe()
+    for i in range(3):
+        bus.publish("task_updated", task_id=str(i), status="completed")
+    print("Events:", subscription.get(timeout=1))
+    subscription.close()
@@ -1,9 +1,13 @@
 # src/supermanus/gatekeeper_agent.py
 import json
 import logging
+from concurrent.futures import FIRST_COMPLETED, Future, wait
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
+from .agent_pool import CodingAgentPool
 from .session_manager import SessionManager
+from .event_bus import EventBus
+from .state_storage import create_storage
 from .task_enforcer import TaskEnforcer
 from .llm_guard import LLMGuard
 
@@ -13,18 +17,34 @@ class GatekeeperAgent:
     The Gatekeeper Agent manages the overall project orchestration.
     """
 
-    def __init__(self, project_root: Path):
+    def __init__(self, project_root: Path, storage_backend: str = "json",
+                 flush_interval: float = 0.0, max_pending_changes: int = 0,
+                 storage_options: Optional[Dict[str, Any]] = None):
         """
         Initializes the GatekeeperAgent.
 
         Args:
             project_root (Path): The project root directory.
+            storage_backend (str): The session state storage engine ('json', 'wal' or 'sqlite').
+            flush_interval (float): Maximum seconds a state change may stay unwritten. 0 writes every change.
+            max_pending_changes (int): Number of unwritten changes that forces a write. 0 disables the limit.
+            storage_options (Optional[Dict[str, Any]]): Extra options for the storage engine, e.g. ``{"serializer": "msgpack"}``.
         """
         self.project_root = project_root
-        self.session_manager = SessionManager(str(project_root / "session_state.json"))
-        self.task_enforcer = TaskEnforcer(self.session_manager)
+        state_file = project_root / "session_state.json"
+        self.session_manager = SessionManager(
+            str(state_file),
+            storage=create_storage(storage_backend, state_file, **(storage_options or {})),
+            flush_interval=flush_interval,
+            max_pending_changes=max_pending_changes
+        )
+        self.event_bus = EventBus()
+        self.task_enforcer = TaskEnforcer(self.session_manager, self.event_bus)
         self.llm_guard = LLMGuard()
         self.logger = logging.getLogger(__name__)
+        # Serializes plan and status mutations coming from concurrent workers and API calls.
+        # Shared with the session manager so background flushes never see a half-applied update.
+        self._lock = self.session_manager.lock
 
     def load_project_plan(self, plan: Dict[str, Any]) -> None:
         """
@@ -33,20 +53,56 @@ class GatekeeperAgent:
         Args:
             plan (Dict[str, Any]): The project plan.
         """
-        self.task_enforcer.load_project_plan(plan)
+        with self._lock:
+            self.task_enforcer.load_project_plan(plan)
         self.logger.info("Project plan loaded by Gatekeeper.")
 
-    def run_orchestration_loop(self) -> None:
+    def load_state(self) -> None:
+        """
+        Restores the plan and task statuses persisted by an earlier run.
+        """
+        with self._lock:
+            self.task_enforcer.load_state()
+        self.logger.info("Restored %s tasks from the session state.", len(self.task_enforcer.project_tasks))
+
+    def run_orchestration_loop(self, parallel: bool = False) -> None:
         """
         Runs the orchestration loop to assign tasks.
+
+        Args:
+            parallel (bool): Dispatch every ready task at once instead of only the next one.
         """
-        task = self.task_enforcer.assign_next_task()
+        if parallel:
+            tasks = self.dispatch_ready_tasks()
+            if not tasks:
+                self.logger.info("Orchestration: No tasks to assign.")
+            return
+
+        with self._lock:
+            task = self.task_enforcer.assign_next_task()
         if task:
-            self.logger.info(f"Orchestration: Assigned task {task['id']}")
+            self.logger.info("Orchestration: Assigned task %s", task['id'], extra={"task_id": task['id']})
             # In a real system, this would dispatch to Coding Agent
         else:
             self.logger.info("Orchestration: No tasks to assign.")
 
+    def dispatch_ready_tasks(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Assigns every task whose dependencies are completed.
+
+        Args:
+            limit (Optional[int]): Maximum number of tasks to assign.
+
+        Returns:
+            List[Dict[str, Any]]: The assigned tasks.
+        """
+        with self._lock:
+            tasks = self.task_enforcer.assign_ready_tasks(limit)
+        for task in tasks:
+            self.logger.info("Orchestration: Assigned task %s", task['id'], extra={"task_id": task['id']})
+            # In a real system, this would dispatch to Coding Agents
+        return tasks
+
     def receive_coding_agent_report(self, task_id: str, status: str, output: Optional[str] = None, error: Optional[str] = None) -> None:
         """
         Receives a report from the Coding Agent.
@@ -57,14 +113,81 @@ class GatekeeperAgent:
             output (Optional[str]): The output.
             error (Optional[str]): The error message.
         """
+        with self._lock:
+            self._apply_report(task_id, status, error)
+
+    def receive_coding_agent_reports(self, reports: List[Dict[str, Any]]) -> int:
+        """
+        Receives a batch of Coding Agent reports. All status changes are
+        applied in memory and persisted with a single group commit.
+
+        Args:
+            reports (List[Dict[str, Any]]): Reports with 'task_id', 'status' and optional 'output'/'error'.
+
+        Returns:
+            int: The number of reports applied.
+        """
+        with self._lock, self.session_manager.group_commit():
+            for report in reports:
+                self._apply_report(report["task_id"], report["status"], report.get("error"))
+        self.logger.info("Applied batch of %s task reports.", len(reports))
+        return len(reports)
+
+    def _apply_report(self, task_id: str, status: str, error: Optional[str]) -> None:
+        """
+        Applies one report to the task enforcer. Callers hold the lock.
+
+        Args:
+            task_id (str): The task ID.
+            status (str): The status ('completed' or 'failed').
+            error (Optional[str]): The error message.
+        """
         if status == "completed":
             self.task_enforcer.mark_task_completed(task_id)
-            self.logger.info(f"Task {task_id} completed.")
+            self.logger.info("Task %s completed.", task_id, extra={"task_id": task_id})
         elif status == "failed":
             self.task_enforcer.mark_task_failed(task_id, error or "Unknown error")
-            self.logger.error(f"Task {task_id} failed: {error}")
+            self.logger.error("Task %s failed: %s", task_id, error, extra={"task_id": task_id})
         else:
-            self.logger.warning(f"Unknown status for task {task_id}: {status}")
+            self.logger.warning("Unknown status for task %s: %s", task_id, status, extra={"task_id": task_id})
+
+    def run_worker_pool(self, max_workers: Optional[int] = None, executor: str = "thread") -> int:
+        """
+        Executes the plan with a pool of Coding Agents. Ready tasks are leased
+        to free workers as soon as their dependencies complete, and every
+        batch of finished reports is applied through ``receive_coding_agent_reports``.
+
+        Args:
+            max_workers (Optional[int]): Number of workers. Defaults to the number of CPUs.
+            executor (str): 'thread' or 'process'.
+
+        Returns:
+            int: The number of tasks executed.
+        """
+        executed = 0
+        with CodingAgentPool(max_workers, executor) as pool:
+            in_flight: Dict[Future, str] = {}
+            while True:
+                free_workers = pool.max_workers - len(in_flight)
+                if free_workers > 0:
+                    for task in self.dispatch_ready_tasks(limit=free_workers):
+                        in_flight[pool.submit(task)] = task["id"]
+                if not in_flight:
+                    break
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                reports = []
+                for future in done:
+                    task_id = in_flight.pop(future)
+                    try:
+                        report = future.result()
+                    except Exception as e:
+                        self.logger.error("Worker crashed while executing task %s: %s", task_id, e, exc_info=True, extra={"task_id": task_id})
+                        report = (task_id, "failed", None, str(e))
+                    reports.append(dict(zip(("task_id", "status", "output", "error"), report)))
+                self.receive_coding_agent_reports(reports)
+                executed += len(reports)
+        self.logger.info("Worker pool finished after executing %s tasks.", executed)
+        return executed
 
     def get_status(self) -> Dict[str, Any]:
         """
@@ -73,7 +196,45 @@ class GatekeeperAgent:
         Returns:
             Dict[str, Any]: The status.
         """
-        return self.task_enforcer.get_status()
+        with self._lock:
+            return self.task_enforcer.get_status()
+
+    def get_status_counts(self) -> Dict[str, Any]:
+        """
+        Gets the task counts per status without the task lists.
+
+        Returns:
+            Dict[str, Any]: The counts.
+        """
+        with self._lock:
+            return self.task_enforcer.get_status_counts()
+
+    def query_tasks(self, status: Optional[str] = None, phase: Optional[str] = None,
+                    id_prefix: Optional[str] = None, cursor: Optional[str] = None,
+                    limit: Optional[int] = None, fields: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Gets one page of tasks in plan order (see ``TaskEnforcer.query_tasks``).
+
+        Returns:
+            Dict[str, Any]: The tasks, next cursor, total count and version.
+
+        Raises:
+            ValueError: If the cursor is invalid.
+        """
+        with self._lock:
+            return self.task_enforcer.query_tasks(status, phase, id_prefix, cursor, limit, fields)
+
+    def checkpoint(self) -> None:
+        """
+        Forces a durable snapshot of the session state.
+        """
+        self.session_manager.checkpoint()
+
+    def close(self) -> None:
+        """
+        Writes pending session state and releases the storage engine.
+        """
+        self.session_manager.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,442 @@
+# src/supermanus/histogram.py
+import math
+import time
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+
+# Percentiles reported by ``Histogram.summary``
+DEFAULT_QUANTILES: Tuple[float, ...] = (0.5, 0.9, 0.99, 0.999)
+
+# Sliding windows reported by ``WindowedStats``, in seconds
+DEFAULT_WINDOWS: Dict[str, float] = {"1m": 60, "5m": 300, "1h": 3600}
+
+
+class Histogram:
+    """
+    Streaming histogram with logarithmic buckets and a bounded relative error.
+
+    Each positive value lands in the bucket ``ceil(log(value) / log(gamma))``
+    with ``gamma = (1 + error) / (1 - error)``, so any quantile is reported
+    within ``relative_error`` of the true sample. Updates are O(1) and memory
+    is bounded by the number of distinct buckets between the smallest and
+    largest value (about 1,300 for 1 µs to 1 day at 1% error), regardless of
+    how many samples are recorded. Values at or below ``min_value`` are
+    counted in a single zero bucket.
+    """
+
+    def __init__(self, relative_error: float = 0.01, min_value: float = 1e-9):
+        """
+        Initializes the Histogram.
+
+        Args:
+            relative_error (float): Maximum relative error of reported quantiles.
+            min_value (float): Values at or below this are treated as zero.
+
+        Raises:
+            ValueError: If relative_error is not between 0 and 1.
+        """
+        if not 0 < relative_error < 1:
+            raise ValueError(f"relative_error must be between 0 and 1, got {relative_error}")
+        self.relative_error = relative_error
+        self.min_value = min_value
+        self._gamma = (1 + relative_error) / (1 - relative_error)
+        self._log_gamma = math.log(self._gamma)
+        self._buckets: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def record(self, value: float, count: int = 1) -> None:
+        """
+        Adds a value.
+
+        Args:
+            value (float): The value (negative values count as zero).
+            count (int): How many times it was observed.
+        """
+        self.count += count
+        self.sum += value * count
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        if value <= self.min_value:
+            self.zero_count += count
+            return
+        index = math.ceil(math.log(value) / self._log_gamma)
+        self._buckets[index] = self._buckets.get(index, 0) + count
+
+    def merge(self, other: "Histogram") -> None:
+        """
+        Adds another histogram's samples to this one. Both must use the same relative error.
+
+        Args:
+            other (Histogram): The histogram to merge.
+
+        Raises:
+            ValueError: If the bucket layouts differ.
+        """
+        if other._gamma != self._gamma:
+            raise ValueError("Cannot merge histograms with different relative errors")
+        if not other.count:
+            return
+        for index, bucket_count in other._buckets.items():
+            self._buckets[index] = self._buckets.get(index, 0) + bucket_count
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.sum += other.sum
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def copy(self) -> "Histogram":
+        """
+        Copies the histogram in O(buckets), e.g. to read it outside a lock.
+
+        Returns:
+            Histogram: The copy.
+        """
+        duplicate = Histogram(self.relative_error, self.min_value)
+        duplicate.merge(self)
+        return duplicate
+
+    def reset(self) -> None:
+        """
+        Removes all samples.
+        """
+        self._buckets.clear()
+        self.zero_count = 0
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    @property
+    def mean(self) -> float:
+        return self.sum / self.count if self.count else 0.0
+
+    @property
+    def bucket_count(self) -> int:
+        return len(self._buckets) + (1 if self.zero_count else 0)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Estimates a quantile.
+
+        Args:
+            q (float): The quantile, between 0 and 1.
+
+        Returns:
+            Optional[float]: The estimate, or None if the histogram is empty.
+        """
+        return self.quantiles([q])[0]
+
+    def quantiles(self, qs: Iterable[float]) -> List[Optional[float]]:
+        """
+        Estimates several quantiles in one pass over the buckets.
+
+        Args:
+            qs (Iterable[float]): The quantiles, between 0 and 1.
+
+        Returns:
+            List[Optional[float]]: The estimates in the same order, None if the histogram is empty.
+        """
+        qs = list(qs)
+        if not self.count:
+            return [None] * len(qs)
+        ranks = sorted((max(0, min(self.count - 1, math.ceil(q * self.count) - 1)), i) for i, q in enumerate(qs))
+        results: List[Optional[float]] = [None] * len(qs)
+        position = 0
+        seen = self.zero_count
+        while position < len(ranks) and ranks[position][0] < seen:
+            results[ranks[position][1]] = max(self.min, 0.0)
+            position += 1
+        for index in sorted(self._buckets):
+            seen += self._buckets[index]
+            # Midpoint of the bucket (gamma^(i-1), gamma^i] in relative terms
+            estimate = 2 * self._gamma ** index / (self._gamma + 1)
+            while position < len(ranks) and ranks[position][0] < seen:
+                results[ranks[position][1]] = min(max(estimate, self.min), self.max)
+                position += 1
+            if position == len(ranks):
+                break
+        return results
+
+    def cumulative_counts(self, bounds: Iterable[float]) -> List[int]:
+        """
+        Counts the samples at or below each bound, as in a Prometheus histogram.
+        Samples are placed at their bucket's representative value (clamped to
+        the observed min and max, like ``quantiles``), so counts are exact up
+        to the relative error and a bound at or above the max counts every sample.
+
+        Args:
+            bounds (Iterable[float]): Ascending upper bounds.
+
+        Returns:
+            List[int]: One cumulative count per bound.
+        """
+        counts: List[int] = []
+        seen = self.zero_count
+        buckets = sorted(self._buckets.items())
+        position = 0
+        for bound in bounds:
+            while position < len(buckets):
+                index, bucket_count = buckets[position]
+                if min(max(2 * self._gamma ** index / (self._gamma + 1), self.min), self.max) > bound:
+                    break
+                seen += bucket_count
+                position += 1
+            counts.append(seen)
+        return counts
+
+    def summary(self, quantiles: Iterable[float] = DEFAULT_QUANTILES) -> Dict[str, Any]:
+        """
+        Summarizes the samples.
+
+        Args:
+            quantiles (Iterable[float]): Percentiles to report, e.g. 0.99 as ``p99``.
+
+        Returns:
+            Dict[str, Any]: count, sum, avg, min, max and one ``p<N>`` entry per quantile.
+        """
+        quantiles = list(quantiles)
+        summary = {
+            "count": self.count,
+            "sum": self.sum,
+            "avg": self.mean,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+        }
+        for q, value in zip(quantiles, self.quantiles(quantiles)):
+            summary[quantile_label(q)] = value
+        return summary
+
+
+class WindowedHistogram:
+    """
+    Histogram over a sliding time window, kept as a ring of per-interval
+    histograms. Recording is O(1); reading merges the live intervals, so
+    it costs O(slots x buckets) no matter how many samples were recorded.
+    The window advances one interval at a time, so it covers between
+    ``window_seconds - interval`` and ``window_seconds`` of history.
+    """
+
+    def __init__(self, window_seconds: float, slots: int = 12, relative_error: float = 0.01):
+        """
+        Initializes the WindowedHistogram.
+
+        Args:
+            window_seconds (float): Length of the window.
+            slots (int): Number of intervals the window is divided into.
+            relative_error (float): Relative error of each interval histogram.
+        """
+        self.window_seconds = window_seconds
+        self.slot_seconds = window_seconds / slots
+        self._slots = [Histogram(relative_error) for _ in range(slots)]
+        # Interval number each slot currently holds
+        self._epochs = [-1] * slots
+
+    def record(self, value: float, now: Optional[float] = None) -> None:
+        """
+        Adds a value.
+
+        Args:
+            value (float): The value.
+            now (Optional[float]): Epoch time of the sample. Defaults to the current time.
+        """
+        epoch = int((time.time() if now is None else now) // self.slot_seconds)
+        index = epoch % len(self._slots)
+        if self._epochs[index] != epoch:
+            self._slots[index].reset()
+            self._epochs[index] = epoch
+        self._slots[index].record(value)
+
+    def snapshot(self, now: Optional[float] = None) -> Histogram:
+        """
+        Merges the intervals inside the window.
+
+        Args:
+            now (Optional[float]): Epoch time the window ends at. Defaults to the current time.
+
+        Returns:
+            Histogram: A new histogram with the window's samples.
+        """
+        epoch = int((time.time() if now is None else now) // self.slot_seconds)
+        merged = Histogram(self._slots[0].relative_error)
+        for slot, slot_epoch in zip(self._slots, self._epochs):
+            if epoch - len(self._slots) < slot_epoch <= epoch:
+                merged.merge(slot)
+        return merged
+
+
+class WindowedStats:
+    """
+    All-time histogram plus sliding-window histograms (by default the
+    last 1 minute, 5 minutes and 1 hour) for one latency series.
+    """
+
+    def __init__(self, windows: Optional[Dict[str, float]] = None, relative_error: float = 0.01):
+        """
+        Initializes the WindowedStats.
+
+        Args:
+            windows (Optional[Dict[str, float]]): Window names and lengths in seconds. Defaults to DEFAULT_WINDOWS.
+            relative_error (float): Relative error of the histograms.
+        """
+        self.total = Histogram(relative_error)
+        self.windows = {name: WindowedHistogram(seconds, relative_error=relative_error)
+                        for name, seconds in (windows or DEFAULT_WINDOWS).items()}
+
+    def record(self, value: float, now: Optional[float] = None) -> None:
+        """
+        Adds a value to the all-time and every windowed histogram.
+
+        Args:
+            value (float): The value.
+            now (Optional[float]): Epoch time of the sample. Defaults to the current time.
+        """
+        now = time.time() if now is None else now
+        self.total.record(value)
+        for window in self.windows.values():
+            window.record(value, now)
+
+    def summary(self, now: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Summarizes the all-time samples and each window.
+
+        Args:
+            now (Optional[float]): Epoch time the windows end at. Defaults to the current time.
+
+        Returns:
+            Dict[str, Any]: ``Histogram.summary`` of all samples, with a ``windows`` entry per window.
+        """
+        summary = self.total.summary()
+        summary["windows"] = {name: window.snapshot(now).summary() for name, window in self.windows.items()}
+        return summary
+
+
+class WindowedCounter:
+    """
+    Event counter over a sliding time window, kept as a ring of per-interval
+    counts. Both updates and reads are O(slots).
+    """
+
+    def __init__(self, window_seconds: float, slots: int = 12):
+        """
+        Initializes the WindowedCounter.
+
+        Args:
+            window_seconds (float): Length of the window.
+            slots (int): Number of intervals the window is divided into.
+        """
+        self.window_seconds = window_seconds
+        self.slot_seconds = window_seconds / slots
+        self._counts = [0] * slots
+        self._epochs = [-1] * slots
+
+    def add(self, amount: int = 1, now: Optional[float] = None) -> None:
+        """
+        Counts events.
+
+        Args:
+            amount (int): Number of events.
+            now (Optional[float]): Epoch time of the events. Defaults to the current time.
+        """
+        epoch = int((time.time() if now is None else now) // self.slot_seconds)
+        index = epoch % len(self._counts)
+        if self._epochs[index] != epoch:
+            self._counts[index] = 0
+            self._epochs[index] = epoch
+        self._counts[index] += amount
+
+    def total(self, now: Optional[float] = None) -> int:
+        """
+        Counts the events inside the window.
+
+        Args:
+            now (Optional[float]): Epoch time the window ends at. Defaults to the current time.
+
+        Returns:
+            int: The number of events.
+        """
+        epoch = int((time.time() if now is None else now) // self.slot_seconds)
+        return sum(count for count, slot_epoch in zip(self._counts, self._epochs)
+                   if epoch - len(self._counts) < slot_epoch <= epoch)
+
+    def rate(self, now: Optional[float] = None) -> float:
+        """
+        Gets the average events per second over the window.
+
+        Args:
+            now (Optional[float]): Epoch time the window ends at. Defaults to the current time.
+
+        Returns:
+            float: Events per second.
+        """
+        return self.total(now) / self.window_seconds
+
+
+class Ewma:
+    """
+    Exponentially weighted moving average: each new value gets weight
+    ``alpha`` and the history ``1 - alpha``. The first value initializes it.
+    """
+
+    def __init__(self, alpha: float = 0.1):
+        """
+        Initializes the Ewma.
+
+        Args:
+            alpha (float): Weight of the newest value, between 0 and 1.
+
+        Raises:
+            ValueError: If alpha is not in (0, 1].
+        """
+        if not 0 < alpha <= 1:
+            raise ValueError(f"alpha must be in (0, 1], got {alpha}")
+        self.alpha = alpha
+        self.value: Optional[float] = None
+
+    def update(self, value: float) -> float:
+        """
+        Adds a value.
+
+        Args:
+            value (float): The value.
+
+        Returns:
+            float: The new average.
+        """
+        if self.value is None:
+            self.value = value
+        else:
+            self.value += self.alpha * (value - self.value)
+        return self.value
+
+
+def quantile_label(q: float) -> str:
+    """
+    Names a quantile the way summaries report it: 0.5 -> 'p50', 0.999 -> 'p999'.
+
+    Args:
+        q (float): The quantile.
+
+    Returns:
+        str: The label.
+    """
+    digits = f"{q * 100:.10g}".replace(".", "")
+    return f"p{digits}"
+
+
+if __name__ == "__main__":
+    # Simple test
+    import random
+    histogram = Histogram()
+    samples = [random.expovariate(10) for _ in range(100000)]
+    for sample in samples:
+        histogram.record(sample)
+    samples.sort()
+    for q in DEFAULT_QUANTILES:
+        exact = samples[math.ceil(q * len(samples)) - 1]
+        print(f"{quantile_label(q)}: {histogram.quantile(q):.5f} (exact {exact:.5f})")
+    print("Buckets:", histogram.bucket_count)
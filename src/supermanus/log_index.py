@@ -0,0 +1,492 @@
+# src/supermanus/log_index.py
+import json
+import logging
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Any, Iterator, List, Optional, Set, Tuple
+from .log_segments import list_segments, open_rotated_segment, segment_index_path
+
+
+def parse_timestamp(value: Any) -> Optional[float]:
+    """
+    Converts a JsonFormatter timestamp (ISO 8601, UTC) to epoch seconds.
+
+    Args:
+        value (Any): The timestamp.
+
+    Returns:
+        Optional[float]: Epoch seconds, or None if it cannot be parsed.
+    """
+    if not isinstance(value, str):
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+class LogIndex:
+    """
+    Sparse sidecar index over a JsonFormatter log file.
+
+    The log is indexed in blocks of consecutive lines (about ``block_bytes``
+    each). Per block a SQLite file next to the log stores the offset range,
+    the time bucket range, the highest level and the loggers, plus one row
+    per task ID seen in the block. Queries select candidate blocks through
+    the index, seek to each one and filter its lines exactly, so the index
+    stays a small fraction of the log while a query reads only the blocks
+    that can match. ``update`` indexes only what was appended since the
+    last call (re-reading the last, partly filled block) and rebuilds from
+    scratch if the log was truncated or replaced.
+
+    A sealed index covers a rotated segment: it is built once, over the
+    decompressed content, and stays valid when the segment is compressed.
+    """
+
+    # Bumped whenever the index layout changes; older index files are rebuilt
+    SCHEMA_VERSION = "blocks-1"
+    # Candidate blocks fetched per index lookup while a query is consumed
+    QUERY_PAGE_BLOCKS = 64
+
+    def __init__(self, log_file: Path, index_file: Optional[Path] = None, bucket_seconds: int = 60,
+                 sealed: bool = False, block_bytes: int = 64 * 1024):
+        """
+        Initializes the LogIndex.
+
+        Args:
+            log_file (Path): The log file or rotated segment.
+            index_file (Optional[Path]): The index database. Defaults to ``<log_file>.idx``
+                (without any compression suffix).
+            bucket_seconds (int): Width of a time bucket.
+            sealed (bool): True for a rotated segment that no longer grows.
+            block_bytes (int): Approximate size of an indexed block. Larger blocks
+                make the index smaller and queries read more lines per match.
+        """
+        self.log_file = Path(log_file)
+        self.index_file = Path(index_file) if index_file else segment_index_path(self.log_file)
+        self.bucket_seconds = bucket_seconds
+        self.sealed = sealed
+        self.block_bytes = block_bytes
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.index_file), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        schema = self._conn.execute("SELECT value FROM meta WHERE key = 'schema'").fetchone()
+        if schema is None or schema[0] != self.SCHEMA_VERSION:
+            with self._conn:
+                self._conn.executescript("""
+                    DROP TABLE IF EXISTS lines;
+                    DROP TABLE IF EXISTS blocks;
+                    DROP TABLE IF EXISTS block_tasks;
+                    DELETE FROM meta;
+                """)
+                self._conn.execute("INSERT INTO meta (key, value) VALUES ('schema', ?)", (self.SCHEMA_VERSION,))
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS blocks (
+                offset INTEGER PRIMARY KEY,
+                end_offset INTEGER NOT NULL,
+                min_bucket INTEGER,
+                max_bucket INTEGER,
+                max_level INTEGER,
+                loggers TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS block_tasks (
+                task_id TEXT NOT NULL,
+                offset INTEGER NOT NULL,
+                PRIMARY KEY (task_id, offset)
+            ) WITHOUT ROWID;
+        """)
+
+    def update(self, batch_size: int = 256) -> int:
+        """
+        Indexes the lines appended since the last update.
+
+        Args:
+            batch_size (int): Blocks inserted per transaction.
+
+        Returns:
+            int: The number of new lines indexed.
+        """
+        with self._lock:
+            indexed_to, file_id = self._get_position()
+            if self.sealed:
+                # Compressing a segment changes its inode and size but not its content
+                if file_id == "sealed":
+                    return 0
+                current_id = "sealed"
+                if indexed_to:
+                    self._clear()
+                    indexed_to = 0
+            else:
+                try:
+                    stat = self.log_file.stat()
+                except FileNotFoundError:
+                    return 0
+                current_id = f"{stat.st_dev}:{stat.st_ino}"
+                if file_id != current_id or stat.st_size < indexed_to:
+                    self.logger.info("Rebuilding log index for %s", self.log_file)
+                    self._clear()
+                    indexed_to = 0
+
+            # Re-read a last block that is not full yet, so frequent updates do not leave tiny blocks
+            new_from = indexed_to
+            replace_from = None
+            last_block = self._conn.execute(
+                "SELECT offset, end_offset FROM blocks ORDER BY offset DESC LIMIT 1"
+            ).fetchone()
+            if last_block is not None and last_block[1] == indexed_to and last_block[1] - last_block[0] < self.block_bytes:
+                indexed_to = replace_from = last_block[0]
+
+            f = open_rotated_segment(self.log_file)
+            if f is None:
+                return 0
+            indexed = 0
+            blocks: List[_Block] = []
+            with f:
+                f.seek(indexed_to)
+                offset = indexed_to
+                block = _Block(offset)
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        # A line still being written; index it next time
+                        break
+                    block.add(self._line_columns(line))
+                    if offset >= new_from:
+                        indexed += 1
+                    offset += len(line)
+                    if offset - block.offset >= self.block_bytes:
+                        block.end_offset = offset
+                        blocks.append(block)
+                        block = _Block(offset)
+                        if len(blocks) >= batch_size:
+                            # A sealed index is only marked complete by the final insert
+                            self._insert(blocks, offset, "partial" if self.sealed else current_id, replace_from)
+                            blocks, replace_from = [], None
+                if offset > block.offset:
+                    block.end_offset = offset
+                    blocks.append(block)
+            self._insert(blocks, offset, current_id, replace_from)
+            return indexed
+
+    def query(self, task_id: Optional[str] = None, level: Optional[str] = None,
+              logger: Optional[str] = None, since: Optional[float] = None,
+              until: Optional[float] = None, limit: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Finds log records through the index. Call ``update`` first to include recent lines.
+
+        Args:
+            task_id (Optional[str]): Only records for this task.
+            level (Optional[str]): Minimum level name.
+            logger (Optional[str]): Logger name; child loggers match too.
+            since (Optional[float]): Only records at or after this epoch time.
+            until (Optional[float]): Only records before this epoch time.
+            limit (Optional[int]): Maximum number of records.
+
+        Yields:
+            Dict[str, Any]: The decoded records in file order.
+
+        Raises:
+            ValueError: If the level name is unknown.
+        """
+        conditions, params = [], []
+        level_number = None
+        if task_id is not None:
+            conditions.append("offset IN (SELECT offset FROM block_tasks WHERE task_id = ?)")
+            params.append(task_id)
+        if level:
+            level_number = logging.getLevelName(level.upper())
+            if not isinstance(level_number, int):
+                raise ValueError(f"Unknown log level: {level}")
+            conditions.append("max_level >= ?")
+            params.append(level_number)
+        if logger:
+            # loggers is newline-delimited with a leading and trailing newline
+            conditions.append("(instr(loggers, ?) > 0 OR instr(loggers, ?) > 0)")
+            params.extend([f"\n{logger}\n", f"\n{logger}."])
+        if since is not None:
+            conditions.append("max_bucket >= ?")
+            params.append(int(since // self.bucket_seconds))
+        if until is not None:
+            conditions.append("min_bucket <= ?")
+            params.append(int(until // self.bucket_seconds))
+        conditions.append("offset > ?")
+        sql = (f"SELECT offset, end_offset FROM blocks WHERE {' AND '.join(conditions)} "
+               f"ORDER BY offset LIMIT {self.QUERY_PAGE_BLOCKS}")
+
+        if limit is not None and limit <= 0:
+            return
+        returned = 0
+        f = None
+        last_offset = -1
+        try:
+            while True:
+                # Candidate blocks are fetched a page at a time, so a small limit reads few of them
+                with self._lock:
+                    blocks = self._conn.execute(sql, params + [last_offset]).fetchall()
+                if not blocks:
+                    return
+                if f is None:
+                    f = open_rotated_segment(self.log_file)
+                    if f is None:
+                        return
+                # Offsets ascend, so compressed segments only ever seek forward
+                for offset, end_offset in blocks:
+                    f.seek(offset)
+                    while offset < end_offset:
+                        line = f.readline()
+                        if not line:
+                            break
+                        offset += len(line)
+                        try:
+                            record = json.loads(line)
+                        except ValueError:
+                            continue
+                        if not isinstance(record, dict):
+                            continue
+                        if task_id is not None and _record_task_id(record) != task_id:
+                            continue
+                        if level_number is not None:
+                            record_level = logging.getLevelName(record.get("level", ""))
+                            if not isinstance(record_level, int) or record_level < level_number:
+                                continue
+                        if logger:
+                            record_logger = record.get("logger") or ""
+                            if record_logger != logger and not record_logger.startswith(logger + "."):
+                                continue
+                        if since is not None or until is not None:
+                            timestamp = parse_timestamp(record.get("timestamp"))
+                            if since is not None and (timestamp is None or timestamp < since):
+                                continue
+                            if until is not None and (timestamp is None or timestamp >= until):
+                                continue
+                        yield record
+                        returned += 1
+                        if limit is not None and returned >= limit:
+                            return
+                last_offset = blocks[-1][0]
+        finally:
+            if f is not None:
+                f.close()
+
+    def close(self) -> None:
+        """
+        Closes the index database.
+        """
+        with self._lock:
+            self._conn.close()
+
+    def _line_columns(self, line: bytes) -> Tuple[Optional[int], Optional[int], Optional[str], Optional[str]]:
+        """
+        Extracts the indexed columns of one line.
+
+        Args:
+            line (bytes): The raw line.
+
+        Returns:
+            Tuple: (bucket, level, logger, task_id); unknown columns are None.
+        """
+        try:
+            record = json.loads(line)
+        except ValueError:
+            return None, None, None, None
+        if not isinstance(record, dict):
+            return None, None, None, None
+        timestamp = parse_timestamp(record.get("timestamp"))
+        level = logging.getLevelName(record.get("level", ""))
+        logger = record.get("logger")
+        return (
+            int(timestamp // self.bucket_seconds) if timestamp is not None else None,
+            level if isinstance(level, int) else None,
+            logger if isinstance(logger, str) else None,
+            _record_task_id(record)
+        )
+
+    def _clear(self) -> None:
+        """
+        Drops every indexed block.
+        """
+        with self._conn:
+            self._conn.execute("DELETE FROM blocks")
+            self._conn.execute("DELETE FROM block_tasks")
+            self._conn.execute("DELETE FROM meta WHERE key != 'schema'")
+
+    def _insert(self, blocks: List["_Block"], indexed_to: int, file_id: str,
+                replace_from: Optional[int] = None) -> None:
+        """
+        Stores blocks and the new indexed position in one transaction.
+
+        Args:
+            blocks (List[_Block]): The blocks.
+            indexed_to (int): Offset after the last indexed line.
+            file_id (str): Identity of the indexed file.
+            replace_from (Optional[int]): Offset of a re-read block whose old rows are replaced.
+        """
+        with self._conn:
+            if replace_from is not None:
+                self._conn.execute("DELETE FROM blocks WHERE offset >= ?", (replace_from,))
+                self._conn.execute("DELETE FROM block_tasks WHERE offset >= ?", (replace_from,))
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO blocks VALUES (?, ?, ?, ?, ?, ?)",
+                [block.row() for block in blocks]
+            )
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO block_tasks (task_id, offset) VALUES (?, ?)",
+                [(task_id, block.offset) for block in blocks for task_id in block.task_ids]
+            )
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                [("indexed_to", str(indexed_to)), ("file_id", file_id)]
+            )
+
+    def _get_position(self) -> Tuple[int, Optional[str]]:
+        """
+        Gets how far the log has been indexed and the identity of the indexed file.
+
+        Returns:
+            Tuple[int, Optional[str]]: The offset and the file identity.
+        """
+        meta = dict(self._conn.execute("SELECT key, value FROM meta"))
+        return int(meta.get("indexed_to", 0)), meta.get("file_id")
+
+
+class _Block:
+    """Summary of one indexed block of lines while it is being built"""
+
+    def __init__(self, offset: int):
+        self.offset = offset
+        self.end_offset = offset
+        self.min_bucket: Optional[int] = None
+        self.max_bucket: Optional[int] = None
+        self.max_level: Optional[int] = None
+        self.loggers: Set[str] = set()
+        self.task_ids: Set[str] = set()
+
+    def add(self, columns: Tuple[Optional[int], Optional[int], Optional[str], Optional[str]]) -> None:
+        bucket, level, logger, task_id = columns
+        if bucket is not None:
+            self.min_bucket = bucket if self.min_bucket is None else min(self.min_bucket, bucket)
+            self.max_bucket = bucket if self.max_bucket is None else max(self.max_bucket, bucket)
+        if level is not None and (self.max_level is None or level > self.max_level):
+            self.max_level = level
+        if logger is not None:
+            self.loggers.add(logger)
+        if task_id is not None:
+            self.task_ids.add(task_id)
+
+    def row(self) -> Tuple[int, int, Optional[int], Optional[int], Optional[int], str]:
+        loggers = "\n" + "".join(logger + "\n" for logger in sorted(self.loggers))
+        return self.offset, self.end_offset, self.min_bucket, self.max_bucket, self.max_level, loggers
+
+
+def _record_task_id(record: Dict[str, Any]) -> Optional[str]:
+    """The task ID of a decoded record, top-level or in its structured extras"""
+    task_id = record.get("task_id")
+    extra = record.get("extra")
+    if task_id is None and isinstance(extra, dict):
+        task_id = extra.get("task_id")
+    return str(task_id) if task_id is not None else None
+
+
+class SegmentedLogIndex:
+    """
+    Indexes a rotated log: one sealed LogIndex per rotated segment plus one
+    for the active file, queried oldest first. Indexes of segments removed
+    by retention are dropped on the next ``update``.
+    """
+
+    def __init__(self, log_file: Path, bucket_seconds: int = 60):
+        """
+        Initializes the SegmentedLogIndex.
+
+        Args:
+            log_file (Path): The active log file.
+            bucket_seconds (int): Width of a time bucket.
+        """
+        self.log_file = Path(log_file)
+        self.bucket_seconds = bucket_seconds
+        self._lock = threading.Lock()
+        self._indexes: Dict[Path, LogIndex] = {}
+
+    def update(self) -> int:
+        """
+        Picks up new segments and indexes everything appended since the last update.
+
+        Returns:
+            int: The number of lines indexed.
+        """
+        return sum(index.update() for index in self._refresh())
+
+    def query(self, task_id: Optional[str] = None, level: Optional[str] = None,
+              logger: Optional[str] = None, since: Optional[float] = None,
+              until: Optional[float] = None, limit: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Finds log records across all segments. Takes the same arguments as ``LogIndex.query``.
+
+        Yields:
+            Dict[str, Any]: The decoded records, oldest first.
+        """
+        with self._lock:
+            indexes = list(self._indexes.values())
+        for index in indexes:
+            for record in index.query(task_id=task_id, level=level, logger=logger,
+                                      since=since, until=until, limit=limit):
+                yield record
+                if limit is not None:
+                    limit -= 1
+                    if limit <= 0:
+                        return
+
+    def close(self) -> None:
+        """
+        Closes every index database.
+        """
+        with self._lock:
+            for index in self._indexes.values():
+                index.close()
+            self._indexes = {}
+
+    def _refresh(self) -> List[LogIndex]:
+        """
+        Matches the per-segment indexes to the segments currently on disk.
+
+        Returns:
+            List[LogIndex]: The indexes, oldest segment first.
+        """
+        with self._lock:
+            current: Dict[Path, LogIndex] = {}
+            for path in list_segments(self.log_file) + [self.log_file]:
+                key = segment_index_path(path)
+                index = self._indexes.pop(key, None)
+                if index is None:
+                    index = LogIndex(path, bucket_seconds=self.bucket_seconds, sealed=path != self.log_file)
+                else:
+                    # The segment may have been compressed since the last update
+                    index.log_file = path
+                current[key] = index
+            for stale in self._indexes.values():
+                stale.close()
+            self._indexes = current
+            return list(current.values())
+
+
+if __name__ == "__main__":
+    # Simple test
+    import tempfile
+    log_file = Path(tempfile.mkdtemp()) / "test.log"
+    now = time.time()
+    with open(log_file, 'w') as f:
+        for i in range(6):
+            timestamp = datetime.fromtimestamp(now - (5 - i) * 900, timezone.utc).isoformat()
+            f.write(json.dumps({"timestamp": timestamp, "level": "INFO", "logger": "supermanus.test",
+                                "message": f"line {i}", "task_id": f"T{i % 2}"}) + "\n")
+    index = LogIndex(log_file)
+    print("Indexed lines:", index.update())
+    print("T1 in the last hour:", [record["message"] for record in index.query(task_id="T1", since=now - 3600)])
+    index.close()
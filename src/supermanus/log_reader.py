@@ -0,0 +1,411 @@
+# src/supermanus/log_reader.py
+import asyncio
+import json
+import logging
+import os
+from collections import deque
+from pathlib import Path
+from typing import BinaryIO, Dict, Any, AsyncIterator, Iterator, List, Optional, Tuple
+from .log_segments import list_segments, open_rotated_segment
+
+
+class LogFilter:
+    """
+    Selects JsonFormatter log lines by minimum level, logger and task ID.
+
+    Lines are only decoded when a cheap substring check cannot rule them
+    out. Lines that are not JSON never match an active filter.
+    """
+
+    def __init__(self, level: Optional[str] = None, logger: Optional[str] = None, task_id: Optional[str] = None):
+        """
+        Initializes the LogFilter.
+
+        Args:
+            level (Optional[str]): Minimum level name, e.g. 'WARNING'.
+            logger (Optional[str]): Logger name; child loggers match too.
+            task_id (Optional[str]): Task ID, matched against ``task_id`` and ``extra.task_id``.
+
+        Raises:
+            ValueError: If the level name is unknown.
+        """
+        self.min_level = None
+        if level:
+            self.min_level = logging.getLevelName(level.upper())
+            if not isinstance(self.min_level, int):
+                raise ValueError(f"Unknown log level: {level}")
+        self.logger = logger
+        self.task_id = task_id
+        self._needle = task_id.encode("utf-8") if task_id else None
+
+    @property
+    def active(self) -> bool:
+        return self.min_level is not None or bool(self.logger) or bool(self.task_id)
+
+    def matches(self, line: bytes) -> bool:
+        """
+        Checks a log line against the filter.
+
+        Args:
+            line (bytes): The raw line.
+
+        Returns:
+            bool: True if the line is selected.
+        """
+        if not self.active:
+            return True
+        if self._needle is not None and self._needle not in line:
+            return False
+        try:
+            record = json.loads(line)
+        except ValueError:
+            return False
+        if not isinstance(record, dict):
+            return False
+        return self.matches_record(record)
+
+    def matches_record(self, record: Dict[str, Any]) -> bool:
+        """
+        Checks a decoded log record against the filter.
+
+        Args:
+            record (Dict[str, Any]): The record.
+
+        Returns:
+            bool: True if the record is selected.
+        """
+        if self.min_level is not None:
+            level = logging.getLevelName(record.get("level", ""))
+            if not isinstance(level, int) or level < self.min_level:
+                return False
+        if self.logger:
+            name = record.get("logger", "")
+            if name != self.logger and not name.startswith(self.logger + "."):
+                return False
+        if self.task_id:
+            extra = record.get("extra")
+            extra_task_id = extra.get("task_id") if isinstance(extra, dict) else None
+            if record.get("task_id") != self.task_id and extra_task_id != self.task_id:
+                return False
+        return True
+
+
+class LogReader:
+    """
+    Reads a log file in bounded chunks: byte ranges, the last N lines and
+    follow mode, without ever loading the whole file.
+
+    Offsets refer to the active file. With ``include_rotated`` the rotated
+    (possibly compressed) segments are read too, oldest first, before it.
+    """
+
+    def __init__(self, log_file: Path, chunk_size: int = 64 * 1024):
+        """
+        Initializes the LogReader.
+
+        Args:
+            log_file (Path): The log file.
+            chunk_size (int): Bytes read per I/O call.
+        """
+        self.log_file = Path(log_file)
+        self.chunk_size = chunk_size
+
+    def size(self) -> int:
+        """
+        Gets the current file size.
+
+        Returns:
+            int: The size in bytes, 0 if the file does not exist.
+        """
+        try:
+            return self.log_file.stat().st_size
+        except FileNotFoundError:
+            return 0
+
+    def read_range(self, offset: int = 0, end: Optional[int] = None) -> Iterator[bytes]:
+        """
+        Streams the raw bytes of a range.
+
+        Args:
+            offset (int): First byte.
+            end (Optional[int]): Byte after the last one. Defaults to the current end of file.
+
+        Yields:
+            bytes: Chunks of at most ``chunk_size`` bytes.
+        """
+        with open(self.log_file, 'rb') as f:
+            f.seek(offset)
+            remaining = None if end is None else max(0, end - offset)
+            while remaining is None or remaining > 0:
+                chunk = f.read(self.chunk_size if remaining is None else min(self.chunk_size, remaining))
+                if not chunk:
+                    break
+                if remaining is not None:
+                    remaining -= len(chunk)
+                yield chunk
+
+    def iter_lines(self, offset: int = 0, end: Optional[int] = None) -> Iterator[bytes]:
+        """
+        Streams the complete lines of a range. A line cut by ``offset`` is
+        skipped; a line that starts before ``end`` is returned whole.
+
+        Args:
+            offset (int): First byte.
+            end (Optional[int]): Lines starting at or after this byte are not returned.
+
+        Yields:
+            bytes: Lines including their newline.
+        """
+        with open(self.log_file, 'rb') as f:
+            if offset > 0:
+                f.seek(offset - 1)
+                if f.read(1) != b"\n":
+                    f.readline()
+            while end is None or f.tell() < end:
+                line = f.readline()
+                if not line:
+                    break
+                yield line
+
+    def iter_lines_reversed(self, end: Optional[int] = None) -> Iterator[bytes]:
+        """
+        Streams lines from the end of the file backwards, one chunk at a time.
+
+        Args:
+            end (Optional[int]): Byte after the last line. Defaults to the end of file.
+
+        Yields:
+            bytes: Lines including their newline, last line first.
+        """
+        with open(self.log_file, 'rb') as f:
+            position = f.seek(0, os.SEEK_END) if end is None else end
+            remainder = b""
+            while position > 0:
+                read_size = min(self.chunk_size, position)
+                position -= read_size
+                f.seek(position)
+                block = f.read(read_size) + remainder
+                lines = block.split(b"\n")
+                # The first piece may continue in the previous block
+                remainder = lines.pop(0)
+                for line in reversed(lines):
+                    if line:
+                        yield line + b"\n"
+            if remainder:
+                yield remainder + b"\n"
+
+    def iter_segment_lines(self, segment: Path) -> Iterator[bytes]:
+        """
+        Streams the lines of a rotated segment, decompressing transparently.
+
+        Args:
+            segment (Path): The segment.
+
+        Yields:
+            bytes: Lines including their newline; nothing if the segment was removed.
+        """
+        f = open_rotated_segment(segment)
+        if f is None:
+            return
+        with f:
+            yield from f
+
+    def tail(self, lines: int, log_filter: Optional[LogFilter] = None, end: Optional[int] = None,
+             include_rotated: bool = False) -> List[bytes]:
+        """
+        Gets the last matching lines.
+
+        Args:
+            lines (int): Number of lines.
+            log_filter (Optional[LogFilter]): Only count lines that match.
+            end (Optional[int]): Byte after the last line. Defaults to the end of file.
+            include_rotated (bool): Continue into rotated segments if the active file has too few lines.
+
+        Returns:
+            List[bytes]: The lines in file order.
+        """
+        selected: List[bytes] = []
+        if lines <= 0:
+            return selected
+        for line in self.iter_lines_reversed(end):
+            if log_filter is None or log_filter.matches(line):
+                selected.append(line)
+                if len(selected) == lines:
+                    break
+        selected.reverse()
+        if include_rotated:
+            for segment in reversed(list_segments(self.log_file)):
+                if len(selected) >= lines:
+                    break
+                # Compressed streams cannot be read backwards; keep a window while scanning forward
+                window: deque = deque(maxlen=lines - len(selected))
+                for line in self.iter_segment_lines(segment):
+                    if log_filter is None or log_filter.matches(line):
+                        window.append(line)
+                selected = list(window) + selected
+        return selected
+
+    def read(self, offset: int = 0, end: Optional[int] = None, tail: Optional[int] = None,
+             log_filter: Optional[LogFilter] = None, include_rotated: bool = False) -> Iterator[bytes]:
+        """
+        Streams log content. Without a filter or tail the exact bytes of the
+        range are returned; otherwise whole matching lines.
+
+        Args:
+            offset (int): First byte.
+            end (Optional[int]): Byte after the last one. Defaults to the current end of file.
+            tail (Optional[int]): Only the last N (matching) lines before ``end``.
+            log_filter (Optional[LogFilter]): Line filter.
+            include_rotated (bool): Stream the rotated segments before the active file.
+
+        Yields:
+            bytes: Chunks of log content.
+        """
+        if tail is not None:
+            yield b"".join(self.tail(tail, log_filter, end, include_rotated))
+            return
+        if include_rotated:
+            for segment in list_segments(self.log_file):
+                yield from self._batch_lines(self.iter_segment_lines(segment), log_filter)
+        if log_filter is None or not log_filter.active:
+            yield from self.read_range(offset, end)
+            return
+        yield from self._batch_lines(self.iter_lines(offset, end), log_filter)
+
+    def _batch_lines(self, lines: Iterator[bytes], log_filter: Optional[LogFilter]) -> Iterator[bytes]:
+        """
+        Groups matching lines into chunks of about ``chunk_size`` bytes.
+
+        Args:
+            lines (Iterator[bytes]): The lines.
+            log_filter (Optional[LogFilter]): Line filter.
+
+        Yields:
+            bytes: Chunks of whole lines.
+        """
+        batch: List[bytes] = []
+        batch_size = 0
+        for line in lines:
+            if log_filter is None or log_filter.matches(line):
+                batch.append(line)
+                batch_size += len(line)
+                if batch_size >= self.chunk_size:
+                    yield b"".join(batch)
+                    batch, batch_size = [], 0
+        if batch:
+            yield b"".join(batch)
+
+    async def follow(self, offset: Optional[int] = None, log_filter: Optional[LogFilter] = None,
+                     poll_interval: float = 0.5) -> AsyncIterator[bytes]:
+        """
+        Streams lines appended to the file until the consumer stops iterating.
+        Starts over from the beginning if the file is truncated. When the file
+        is rotated, the old file is read to its end before switching to the new one.
+
+        Args:
+            offset (Optional[int]): Where to start. Defaults to the current end of file.
+            log_filter (Optional[LogFilter]): Line filter.
+            poll_interval (float): Seconds between checks for new data.
+
+        Yields:
+            bytes: Batches of complete, matching lines.
+        """
+        position = self.size() if offset is None else offset
+        f: Optional[BinaryIO] = None
+        try:
+            while True:
+                f, position, data, progressed = await asyncio.to_thread(self._poll, f, position, log_filter)
+                if data:
+                    yield data
+                if not progressed:
+                    await asyncio.sleep(poll_interval)
+        finally:
+            if f is not None:
+                f.close()
+
+    def _poll(self, f: Optional[BinaryIO], position: int,
+              log_filter: Optional[LogFilter]) -> Tuple[Optional[BinaryIO], int, bytes, bool]:
+        """
+        One follow step: reads new complete lines from the open file and
+        switches to the new file once a rotated one has been read to its end.
+
+        Args:
+            f (Optional[BinaryIO]): The followed file, None to open it.
+            position (int): Offset of the next unread line.
+            log_filter (Optional[LogFilter]): Line filter.
+
+        Returns:
+            Tuple: (file, position, matching lines, whether anything was consumed).
+        """
+        if f is None:
+            try:
+                f = open(self.log_file, 'rb')
+            except FileNotFoundError:
+                return None, position, b"", False
+        size = os.fstat(f.fileno()).st_size
+        if size < position:
+            position = 0
+        if size > position:
+            data, new_position = self._read_complete_lines(f, position, size, log_filter)
+            if new_position > position:
+                return f, new_position, data, True
+        try:
+            rotated = os.stat(self.log_file).st_ino != os.fstat(f.fileno()).st_ino
+        except FileNotFoundError:
+            rotated = True
+        if rotated:
+            f.close()
+            return None, 0, b"", True
+        return f, position, b"", False
+
+    def _read_complete_lines(self, f: BinaryIO, offset: int, end: int,
+                             log_filter: Optional[LogFilter]) -> Tuple[bytes, int]:
+        """
+        Reads the complete lines between two offsets. A trailing partial line
+        is left for the next read. A line longer than one read is read
+        through to its newline.
+
+        Args:
+            f (BinaryIO): The open log file.
+            offset (int): First byte (a line start).
+            end (int): End of the readable data.
+            log_filter (Optional[LogFilter]): Line filter.
+
+        Returns:
+            Tuple[bytes, int]: The matching lines and the offset after the last complete line.
+        """
+        read_size = 16 * self.chunk_size
+        f.seek(offset)
+        data = f.read(min(end - offset, read_size))
+        complete = data.rfind(b"\n") + 1
+        if complete == 0 and offset + len(data) < end:
+            # One line longer than a read: keep reading until it ends
+            buffer = bytearray(data)
+            while complete == 0 and offset + len(buffer) < end:
+                chunk = f.read(min(end - offset - len(buffer), read_size))
+                if not chunk:
+                    break
+                newline = chunk.find(b"\n")
+                if newline >= 0:
+                    complete = len(buffer) + newline + 1
+                buffer += chunk
+            data = bytes(buffer)
+        if complete == 0:
+            return b"", offset
+        lines = data[:complete]
+        if log_filter is not None and log_filter.active:
+            lines = b"".join(line for line in lines.splitlines(keepends=True) if log_filter.matches(line))
+        return lines, offset + complete
+
+
+if __name__ == "__main__":
+    # Simple test
+    import tempfile
+    log_file = Path(tempfile.mkdtemp()) / "test.log"
+    with open(log_file, 'w') as f:
+        for i in range(5):
+            level = "ERROR" if i % 2 else "INFO"
+            f.write(json.dumps({"level": level, "logger": "supermanus.test", "message": f"line {i}", "task_id": f"T{i}"}) + "\n")
+    reader = LogReader(log_file)
+    print("Last 2 lines:", reader.tail(2))
+    print("Errors:", b"".join(reader.read(log_filter=LogFilter(level="ERROR"))).decode())
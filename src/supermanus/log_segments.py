@@ -0,0 +1,248 @@
+# src/supermanus/log_segments.py
+import gzip
+import io
+import logging
+import os
+import re
+import shutil
+import time
+from pathlib import Path
+from typing import BinaryIO, List, Optional
+
+try:
+    import zstandard
+except ImportError:  # Optional: only needed for zstd-compressed log segments
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+# Suffix appended to a rotated segment by each compression method
+COMPRESSION_SUFFIXES = {
+    "gzip": ".gz",
+    "zstd": ".zst",
+}
+
+_SEGMENT_PATTERN = r"\.(\d{8}-\d{6})(?:-(\d+))?(?:\.gz|\.zst)?"
+
+
+def new_segment_path(log_file: Path) -> Path:
+    """
+    Picks the name a log file is renamed to when it is rotated:
+    ``<name>.<YYYYmmdd-HHMMSS>``, with a counter if that name is taken.
+
+    Args:
+        log_file (Path): The active log file.
+
+    Returns:
+        Path: The segment path.
+    """
+    stem = f"{log_file.name}.{time.strftime('%Y%m%d-%H%M%S')}"
+    candidate = log_file.with_name(stem)
+    counter = 0
+    while any(candidate.with_name(candidate.name + suffix).exists() for suffix in ("", ".gz", ".zst")):
+        counter += 1
+        candidate = log_file.with_name(f"{stem}-{counter}")
+    return candidate
+
+
+def strip_compression_suffix(path: Path) -> Path:
+    """
+    Gets the uncompressed name of a segment.
+
+    Args:
+        path (Path): The segment path.
+
+    Returns:
+        Path: The path without a compression suffix.
+    """
+    for suffix in COMPRESSION_SUFFIXES.values():
+        if path.name.endswith(suffix):
+            return path.with_name(path.name[:-len(suffix)])
+    return path
+
+
+def is_compressed(path: Path) -> bool:
+    return strip_compression_suffix(path) != path
+
+
+def list_segments(log_file: Path) -> List[Path]:
+    """
+    Lists the rotated segments of a log file, oldest first. The active file is not included.
+
+    Args:
+        log_file (Path): The active log file.
+
+    Returns:
+        List[Path]: The segment paths.
+    """
+    log_file = Path(log_file)
+    pattern = re.compile(re.escape(log_file.name) + _SEGMENT_PATTERN + "$")
+    try:
+        matches = [(pattern.match(path.name), path) for path in log_file.parent.iterdir()]
+    except FileNotFoundError:
+        return []
+    # Sort on rotation time and counter, so a segment keeps its place while it is being compressed
+    keyed = sorted((match.group(1), int(match.group(2) or 0), path.name, path) for match, path in matches if match)
+    return [path for *_, path in keyed]
+
+
+def segment_time(path: Path) -> Optional[float]:
+    """
+    Gets the rotation time encoded in a segment name. Unlike the mtime it
+    is not reset when the segment is compressed.
+
+    Args:
+        path (Path): The segment.
+
+    Returns:
+        Optional[float]: Epoch seconds, or None if the name has no timestamp.
+    """
+    match = re.search(_SEGMENT_PATTERN + "$", Path(path).name)
+    if not match:
+        return None
+    return time.mktime(time.strptime(match.group(1), "%Y%m%d-%H%M%S"))
+
+
+def open_segment(path: Path) -> BinaryIO:
+    """
+    Opens a log file or segment for binary reading, decompressing transparently.
+    Compressed streams support forward seeks only.
+
+    Args:
+        path (Path): The file.
+
+    Returns:
+        BinaryIO: The readable stream.
+    """
+    path = Path(path)
+    if path.name.endswith(".gz"):
+        return gzip.open(path, 'rb')
+    if path.name.endswith(".zst"):
+        # Opened first, so a missing segment raises FileNotFoundError whether or not zstandard is installed
+        raw = open(path, 'rb')
+        if zstandard is None:
+            raw.close()
+            raise ImportError(f"Reading {path} requires the zstandard package (pip install zstandard)")
+        # The raw zstd reader has no readline; buffering adds it
+        return io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(raw, closefd=True))
+    return open(path, 'rb')
+
+
+def open_rotated_segment(path: Path) -> Optional[BinaryIO]:
+    """
+    Opens a segment that may have been compressed or removed since it was listed.
+
+    Args:
+        path (Path): The segment as listed by ``list_segments``.
+
+    Returns:
+        Optional[BinaryIO]: The readable stream, or None if the segment is gone.
+    """
+    plain = strip_compression_suffix(Path(path))
+    for candidate in [Path(path), plain] + [plain.with_name(plain.name + suffix) for suffix in COMPRESSION_SUFFIXES.values()]:
+        try:
+            return open_segment(candidate)
+        except FileNotFoundError:
+            continue
+    return None
+
+
+def compress_segment(path: Path, method: str = "gzip") -> Path:
+    """
+    Compresses a rotated segment and removes the uncompressed file.
+
+    Args:
+        path (Path): The segment.
+        method (str): 'gzip' or 'zstd'.
+
+    Returns:
+        Path: The compressed segment.
+    """
+    target = path.with_name(path.name + COMPRESSION_SUFFIXES[method])
+    partial = target.with_name(target.name + ".tmp")
+    with open(path, 'rb') as source:
+        if method == "zstd":
+            if zstandard is None:
+                raise ImportError("zstd log compression requires the zstandard package (pip install zstandard)")
+            with open(partial, 'wb') as raw:
+                zstandard.ZstdCompressor().copy_stream(source, raw)
+        else:
+            with gzip.open(partial, 'wb', compresslevel=6) as compressed:
+                shutil.copyfileobj(source, compressed, 1024 * 1024)
+    os.replace(partial, target)
+    os.remove(path)
+    return target
+
+
+def remove_segment(path: Path) -> None:
+    """
+    Deletes a segment together with its sidecar index.
+
+    Args:
+        path (Path): The segment.
+    """
+    index_file = segment_index_path(path)
+    for victim in (path, index_file, Path(f"{index_file}-wal"), Path(f"{index_file}-shm")):
+        try:
+            victim.unlink()
+        except FileNotFoundError:
+            pass
+
+
+def segment_index_path(path: Path) -> Path:
+    """
+    Gets the sidecar index path of a log file or segment. Compression does
+    not change it, so an index built before compression stays valid.
+
+    Args:
+        path (Path): The log file or segment.
+
+    Returns:
+        Path: The index path.
+    """
+    plain = strip_compression_suffix(Path(path))
+    return plain.with_name(plain.name + ".idx")
+
+
+def apply_retention(log_file: Path, backup_count: int = 0, max_age_days: float = 0) -> List[Path]:
+    """
+    Deletes rotated segments beyond the retention limits.
+
+    Args:
+        log_file (Path): The active log file.
+        backup_count (int): Number of segments to keep. 0 keeps all.
+        max_age_days (float): Delete segments older than this. 0 disables the limit.
+
+    Returns:
+        List[Path]: The deleted segments.
+    """
+    segments = list_segments(log_file)
+    expired: List[Path] = []
+    if backup_count > 0 and len(segments) > backup_count:
+        expired.extend(segments[:len(segments) - backup_count])
+    if max_age_days > 0:
+        cutoff = time.time() - max_age_days * 86400
+        for segment in segments:
+            rotated_at = segment_time(segment)
+            if segment not in expired and rotated_at is not None and rotated_at < cutoff:
+                expired.append(segment)
+    for segment in expired:
+        remove_segment(segment)
+        logger.info("Removed expired log segment %s", segment)
+    return expired
+
+
+if __name__ == "__main__":
+    # Simple test
+    import tempfile
+    logging.basicConfig(level=logging.INFO)
+    log_file = Path(tempfile.mkdtemp()) / "test.log"
+    for i in range(3):
+        log_file.write_text(f"segment {i}\n")
+        segment = new_segment_path(log_file)
+        os.replace(log_file, segment)
+        compress_segment(segment)
+    apply_retention(log_file, backup_count=2)
+    for segment in list_segments(log_file):
+        with open_segment(segment) as f:
+            print(segment.name, f.read())
@@ -1,64 +1,165 @@
 # src/supermanus/logging_config.py
+import atexit
+import contextvars
+import copy
 import logging
+import os
+import queue
 import sys
 import json
 import threading
+import time
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, Any, Optional
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Dict, Any, Iterator, List, Optional, Set
+try:
+    import orjson
+except ImportError:  # Optional: faster JSON log encoding
+    orjson = None
+
+from .histogram import Histogram
+from .log_segments import (
+    COMPRESSION_SUFFIXES, apply_retention, compress_segment, is_compressed,
+    list_segments, new_segment_path, zstandard
+)
+
+
+# Structured context of the current thread or asyncio task. The dict is never
+# mutated, only replaced, so contexts copied into new tasks stay independent.
+_log_context: contextvars.ContextVar[Dict[str, Any]] = contextvars.ContextVar("supermanus_log_context", default={})
+
+
+@contextmanager
+def log_context(**kwargs) -> Iterator[None]:
+    """
+    Adds fields to every structured log record written inside the block,
+    in the current thread or asyncio task only.
+
+    Args:
+        **kwargs: The context fields, e.g. task_id.
+    """
+    token = _log_context.set({**_log_context.get(), **kwargs})
+    try:
+        yield
+    finally:
+        _log_context.reset(token)
+
+
+class LogContextFilter(logging.Filter):
+    """
+    Attaches the ``log_context`` fields to records from plain ``logging``
+    loggers, which StructuredLogger does itself. Installed on the handlers
+    that run in the logging thread, before records cross to the writer.
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        context = _log_context.get()
+        if context:
+            if not hasattr(record, "extra"):
+                record.extra = context
+            if "task_id" in context and not hasattr(record, "task_id"):
+                record.task_id = context["task_id"]
+        return True
 
 
 class StructuredLogger:
-    """Enhanced logger with structured logging capabilities"""
+    """
+    Enhanced logger with structured logging capabilities.
+
+    Evaluation is lazy: nothing is formatted or merged unless the level is
+    enabled. Messages take ``%``-style arguments, a message may be a
+    callable returning the text, and callable extra values are called
+    only for emitted records.
+    """
 
     def __init__(self, name: str):
         self.logger = logging.getLogger(name)
-        # Store structured data for current context
-        self._context_data: Dict[str, Any] = {}
-        self._local = threading.local()
+
+    def isEnabledFor(self, level: int) -> bool:
+        return self.logger.isEnabledFor(level)
+
+    def context(self, **kwargs):
+        """Scope contextual information to a ``with`` block (see ``log_context``)"""
+        return log_context(**kwargs)
 
     def with_context(self, **kwargs) -> 'StructuredLogger':
-        """Add contextual information to all log messages"""
-        self._context_data.update(kwargs)
+        """Add contextual information to all log messages of the current thread or asyncio task"""
+        _log_context.set({**_log_context.get(), **kwargs})
         return self
 
     def clear_context(self) -> None:
-        """Clear all contextual information"""
-        self._context_data.clear()
+        """Clear all contextual information of the current thread or asyncio task"""
+        _log_context.set({})
 
     def _get_full_context(self, **extra) -> Dict[str, Any]:
         """Get the full context including both stored context and provided extra data"""
-        full_context = dict(self._context_data)
-        full_context.update(extra)
-        return full_context
-
-    def debug(self, message: str, **extra):
-        self.logger.debug(message, extra=self._get_full_context(**extra))
-
-    def info(self, message: str, **extra):
-        self.logger.info(message, extra=self._get_full_context(**extra))
-
-    def warning(self, message: str, **extra):
-        self.logger.warning(message, extra=self._get_full_context(**extra))
-
-    def error(self, message: str, exc_info: bool = None, **extra):
-        self.logger.error(message, exc_info=exc_info, extra=self._get_full_context(**extra))
-
-    def critical(self, message: str, **extra):
-        self.logger.critical(message, extra=self._get_full_context(**extra))
-
-    def exception(self, message: str, **extra):
-        self.logger.exception(message, extra=self._get_full_context(**extra))
+        context = _log_context.get()
+        if not extra:
+            return context
+        extra = {key: value() if callable(value) else value for key, value in extra.items()}
+        if not context:
+            return extra
+        return {**context, **extra}
+
+    def _log(self, level: int, message: Any, args: tuple, exc_info: Any = None, /, **extra) -> None:
+        if not self.logger.isEnabledFor(level):
+            return
+        if callable(message):
+            message = message()
+        full_context = self._get_full_context(**extra)
+        record_extra = None
+        if full_context:
+            # Kept under one attribute so context keys cannot clash with LogRecord fields
+            record_extra = {"extra": full_context}
+            if "task_id" in full_context:
+                record_extra["task_id"] = full_context["task_id"]
+        self.logger.log(level, message, *args, exc_info=exc_info, extra=record_extra, stacklevel=3)
+
+    def debug(self, message: Any, *args, **extra):
+        self._log(logging.DEBUG, message, args, **extra)
+
+    def info(self, message: Any, *args, **extra):
+        self._log(logging.INFO, message, args, **extra)
+
+    def warning(self, message: Any, *args, **extra):
+        self._log(logging.WARNING, message, args, **extra)
+
+    def error(self, message: Any, *args, exc_info: bool = None, **extra):
+        self._log(logging.ERROR, message, args, exc_info, **extra)
+
+    def critical(self, message: Any, *args, **extra):
+        self._log(logging.CRITICAL, message, args, **extra)
+
+    def exception(self, message: Any, *args, **extra):
+        self._log(logging.ERROR, message, args, True, **extra)
 
 
 class JsonFormatter(logging.Formatter):
     """Custom JSON formatter for structured logging"""
 
-    def __init__(self, include_extra: bool = True):
+    _PRIMITIVE_TYPES = (str, int, float, bool, type(None))
+
+    def __init__(self, include_extra: bool = True, fast: bool = True):
+        """
+        Args:
+            include_extra (bool): Include the record's structured ``extra`` data.
+            fast (bool): Use the optimized path: timestamps from ``record.created`` with a
+                per-second cache, a reused encoder (orjson when installed), and sanitizing
+                only payloads the encoder rejects.
+        """
         super().__init__()
         self.include_extra = include_extra
+        self.fast = fast
+        self._encoder = json.JSONEncoder(default=str, separators=(',', ':'))
+        # (second, formatted date and time), replaced as a whole so threads can share it
+        self._second_cache = (None, "")
 
     def format(self, record: logging.LogRecord) -> str:
+        if self.fast:
+            return self._format_fast(record)
+
         # Base log data
         log_data = {
             "timestamp": datetime.utcnow().isoformat() + "Z",
@@ -75,6 +176,9 @@ class JsonFormatter(logging.Formatter):
         # Add exception info if present
         if record.exc_info:
             log_data["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            # Rendered before the record crossed threads (BoundedQueueHandler.prepare)
+            log_data["exception"] = record.exc_text
 
         # Add extra structured data if enabled and present
         if self.include_extra and hasattr(record, 'extra') and record.extra:
@@ -88,16 +192,385 @@ class JsonFormatter(logging.Formatter):
 
         return json.dumps(log_data, default=str, separators=(',', ':'))
 
-    def _sanitize_for_json(self, data: Any) -> Any:
-        """Ensure data is JSON serializable"""
-        if isinstance(data, dict):
-            return {k: self._sanitize_for_json(v) for k, v in data.items()}
-        elif isinstance(data, (list, tuple)):
-            return [self._sanitize_for_json(item) for item in data]
-        elif isinstance(data, (str, int, float, bool)) or data is None:
+    def _format_fast(self, record: logging.LogRecord) -> str:
+        """Format a record without per-call datetime, encoder or sanitizing overhead"""
+        log_data = {
+            "timestamp": self._format_timestamp(record.created),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "module": record.module,
+            "function": record.funcName,
+            "line": record.lineno,
+            "thread": record.thread,
+            "process": record.process
+        }
+        if record.exc_info and not record.exc_text:
+            # Cached on the record like logging.Formatter does, so other handlers reuse it
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            log_data["exception"] = record.exc_text
+        extra = getattr(record, 'extra', None) if self.include_extra else None
+        if extra:
+            log_data["extra"] = extra
+        task_id = getattr(record, 'task_id', None)
+        if task_id is not None:
+            log_data["task_id"] = task_id
+        try:
+            return self._encode(log_data)
+        except (TypeError, ValueError):
+            # Non-string keys, circular references or integers orjson cannot represent;
+            # the standard encoder handles arbitrarily large integers
+            if extra:
+                log_data["extra"] = self._sanitize_for_json(extra)
+            return self._encoder.encode(log_data)
+
+    def _encode(self, log_data: Dict[str, Any]) -> str:
+        if orjson is not None:
+            return orjson.dumps(log_data, default=str).decode("utf-8")
+        return self._encoder.encode(log_data)
+
+    def _format_timestamp(self, created: float) -> str:
+        """ISO 8601 UTC timestamp with microseconds; the date part is formatted once per second"""
+        # Rounded like datetime.fromtimestamp; truncating would turn .678901 into .678900
+        second, micros = divmod(round(created * 1000000), 1000000)
+        cached_second, prefix = self._second_cache
+        if second != cached_second:
+            prefix = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(second))
+            self._second_cache = (second, prefix)
+        return f"{prefix}.{micros:06d}Z"
+
+    def _sanitize_for_json(self, data: Any, _active: Optional[Set[int]] = None) -> Any:
+        """Ensure data is JSON serializable; a container that contains itself is replaced by a marker"""
+        if isinstance(data, self._PRIMITIVE_TYPES):
             return data
-        else:
+        if not isinstance(data, (dict, list, tuple)):
             return str(data)
+        if _active is None:
+            _active = set()
+        if id(data) in _active:
+            return "<circular reference>"
+        _active.add(id(data))
+        try:
+            if isinstance(data, dict):
+                return {str(k): self._sanitize_for_json(v, _active) for k, v in data.items()}
+            return [self._sanitize_for_json(item, _active) for item in data]
+        finally:
+            _active.discard(id(data))
+
+
+class BufferedFileHandler(logging.FileHandler):
+    """File handler that writes a whole batch of records with one write and one flush"""
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.emit_batch([record])
+
+    def emit_batch(self, records: List[logging.LogRecord]) -> None:
+        """Format and write a batch of records"""
+        lines = []
+        for record in records:
+            try:
+                lines.append(self.format(record))
+            except Exception:
+                self.handleError(record)
+        if not lines:
+            return
+        data = self.terminator.join(lines) + self.terminator
+        self.acquire()
+        try:
+            self._before_write(len(data))
+            if self.stream is None:
+                self.stream = self._open()
+            self.stream.write(data)
+            self.flush()
+        except Exception:
+            self.handleError(records[-1])
+        finally:
+            self.release()
+
+    def _before_write(self, size: int) -> None:
+        """Hook called with the lock held before ``size`` characters are written"""
+
+
+class RotatingBufferedFileHandler(BufferedFileHandler):
+    """
+    BufferedFileHandler that rotates the file by size and/or age.
+
+    The full file is renamed to ``<name>.<YYYYmmdd-HHMMSS>`` and a new one is
+    started; compression and retention then run on a background thread, so
+    the writer only pays for a rename. Uncompressed segments left behind by
+    a crash are compressed on startup.
+    """
+
+    def __init__(self, filename: str, max_bytes: int = 0, rotate_interval: float = 0.0,
+                 compression: Optional[str] = "gzip", backup_count: int = 0, max_age_days: float = 0.0):
+        """
+        Args:
+            filename (str): The active log file.
+            max_bytes (int): Rotate before the file would exceed this size. 0 disables size rotation.
+            rotate_interval (float): Rotate after this many seconds. 0 disables time rotation.
+            compression (Optional[str]): 'gzip', 'zstd' or None.
+            backup_count (int): Number of rotated segments to keep. 0 keeps all.
+            max_age_days (float): Delete rotated segments older than this. 0 disables the limit.
+        """
+        if compression is not None and compression not in COMPRESSION_SUFFIXES:
+            raise ValueError(f"Unknown log compression '{compression}'. Available: {', '.join(COMPRESSION_SUFFIXES)}")
+        if compression == "zstd" and zstandard is None:
+            raise ImportError("zstd log compression requires the zstandard package (pip install zstandard)")
+        super().__init__(filename)
+        self.max_bytes = max_bytes
+        self.rotate_interval = rotate_interval
+        self.compression = compression
+        self.backup_count = backup_count
+        self.max_age_days = max_age_days
+        self._next_rollover = time.time() + rotate_interval if rotate_interval > 0 else None
+        # Only the process that created the handler rotates; forked workers follow its renames
+        self._owner_pid = os.getpid()
+        self._archiver = ThreadPoolExecutor(max_workers=1, thread_name_prefix="log-archiver")
+        for segment in list_segments(Path(self.baseFilename)):
+            if compression is not None and not is_compressed(segment):
+                self._archiver.submit(self._archive, segment)
+
+    def _before_write(self, size: int) -> None:
+        if self.stream is None:
+            return
+        if os.getpid() != self._owner_pid:
+            self._reopen_if_rotated()
+            return
+        position = self.stream.tell()
+        if position == 0:
+            return
+        if (self.max_bytes > 0 and position + size > self.max_bytes) or (
+                self._next_rollover is not None and time.time() >= self._next_rollover):
+            self.do_rollover()
+
+    def do_rollover(self) -> None:
+        """Rename the active file to a new segment and hand it to the archiver. Callers hold the handler lock."""
+        if self.stream is not None:
+            self.stream.close()
+            self.stream = None
+        log_file = Path(self.baseFilename)
+        if log_file.exists() and log_file.stat().st_size > 0:
+            segment = new_segment_path(log_file)
+            os.replace(log_file, segment)
+            self._archiver.submit(self._archive, segment)
+        self.stream = self._open()
+        if self.rotate_interval > 0:
+            self._next_rollover = time.time() + self.rotate_interval
+
+    def _reopen_if_rotated(self) -> None:
+        """Switch to the new active file after another process rotated the log"""
+        try:
+            rotated = os.stat(self.baseFilename).st_ino != os.fstat(self.stream.fileno()).st_ino
+        except FileNotFoundError:
+            rotated = True
+        if rotated:
+            self.stream.close()
+            self.stream = self._open()
+
+    def _archive(self, segment: Path) -> None:
+        """Compress a rotated segment and apply the retention limits (archiver thread)"""
+        try:
+            if self.compression is not None and segment.exists():
+                compress_segment(segment, self.compression)
+            apply_retention(Path(self.baseFilename), self.backup_count, self.max_age_days)
+        except Exception as e:
+            # Logging from here could re-enter this handler
+            print(f"Error archiving log segment {segment}: {e}", file=sys.stderr)
+
+    def close(self) -> None:
+        super().close()
+        if os.getpid() == self._owner_pid:
+            self._archiver.shutdown(wait=True)
+
+
+# Renders tracebacks in BoundedQueueHandler.prepare, in the format every formatter here uses
+_traceback_formatter = logging.Formatter()
+
+
+class BoundedQueueHandler(logging.Handler):
+    """
+    Hands records to a background listener through a bounded queue, so the
+    logging thread never formats or writes.
+
+    When the queue is full the overflow policy decides what happens to
+    records at or below ``drop_level`` (DEBUG by default): 'block' waits for
+    room, 'drop_debug' discards them and 'sample' keeps one in ``sample_every``.
+    Records above ``drop_level`` always wait for room. Dropped records are reported with a
+    warning once the queue has room again, at most every ``report_interval`` seconds.
+    """
+
+    OVERFLOW_POLICIES = ("block", "drop_debug", "sample")
+
+    def __init__(self, log_queue: queue.Queue, overflow_policy: str = "drop_debug",
+                 drop_level: int = logging.DEBUG, sample_every: int = 10,
+                 block_timeout: Optional[float] = None, report_interval: float = 10.0):
+        super().__init__()
+        if overflow_policy not in self.OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy '{overflow_policy}'. Available: {', '.join(self.OVERFLOW_POLICIES)}")
+        self.queue = log_queue
+        self.overflow_policy = overflow_policy
+        self.drop_level = drop_level
+        self.sample_every = max(1, sample_every)
+        self.block_timeout = block_timeout
+        self.report_interval = report_interval
+        # Guards the drop counters, which every logging thread updates on overflow
+        self._drop_lock = threading.Lock()
+        self.dropped = 0
+        self._last_report = 0.0
+        self._unreported_drops = 0
+        self._overflow_count = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """
+        Merge the message arguments and render any traceback now, like
+        ``QueueHandler.prepare``: arguments may change once the call returns,
+        and a queued exc_info would keep the traceback and its frames alive.
+        """
+        message = record.getMessage()
+        exc_text = record.exc_text
+        if record.exc_info and not exc_text:
+            exc_text = _traceback_formatter.formatException(record.exc_info)
+        record = copy.copy(record)
+        record.msg = message
+        record.args = None
+        record.exc_info = None
+        record.exc_text = exc_text
+        return record
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            record = self.prepare(record)
+            try:
+                self.queue.put_nowait(record)
+            except queue.Full:
+                self._handle_overflow(record)
+                return
+            if self._unreported_drops and time.monotonic() - self._last_report >= self.report_interval:
+                self._report_drops()
+        except Exception:
+            self.handleError(record)
+
+    def _handle_overflow(self, record: logging.LogRecord) -> None:
+        """Apply the overflow policy to a record that did not fit"""
+        if record.levelno <= self.drop_level and self.overflow_policy != "block":
+            with self._drop_lock:
+                self._overflow_count += 1
+                sampled = self.overflow_policy == "sample" and self._overflow_count % self.sample_every == 0
+            if not sampled:
+                self._count_drop()
+                return
+        try:
+            self.queue.put(record, timeout=self.block_timeout)
+        except queue.Full:
+            self._count_drop()
+
+    def _count_drop(self) -> None:
+        with self._drop_lock:
+            self.dropped += 1
+            self._unreported_drops += 1
+
+    def _report_drops(self) -> None:
+        """Queue a warning about records dropped since the last report"""
+        with self._drop_lock:
+            now = time.monotonic()
+            # Another thread may have reported them meanwhile
+            if not self._unreported_drops or now - self._last_report < self.report_interval:
+                return
+            count, self._unreported_drops = self._unreported_drops, 0
+            self._last_report = now
+            total = self.dropped
+        warning = logging.makeLogRecord({
+            "name": __name__,
+            "levelno": logging.WARNING,
+            "levelname": "WARNING",
+            "msg": f"Log queue overflow: dropped {count} records ({total} in total)"
+        })
+        try:
+            self.queue.put_nowait(warning)
+        except queue.Full:
+            with self._drop_lock:
+                self._unreported_drops += count
+
+
+class BatchingQueueListener:
+    """Background thread that drains a log queue and passes records to handlers in batches"""
+
+    _STOP = object()
+
+    def __init__(self, log_queue: queue.Queue, handlers: List[logging.Handler], batch_size: int = 512):
+        self.queue = log_queue
+        self.handlers = handlers
+        self.batch_size = batch_size
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Write every queued record and stop the thread"""
+        if self._thread is None:
+            return
+        self.queue.put(self._STOP)
+        self._thread.join()
+        self._thread = None
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            batch = [self.queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            if any(record is self._STOP for record in batch):
+                stopping = True
+                batch = [record for record in batch if record is not self._STOP]
+            if batch:
+                self._dispatch(batch)
+
+    def _dispatch(self, batch: List[logging.LogRecord]) -> None:
+        for handler in self.handlers:
+            records = [record for record in batch if record.levelno >= handler.level and handler.filter(record)]
+            if not records:
+                continue
+            if isinstance(handler, BufferedFileHandler):
+                handler.emit_batch(records)
+            else:
+                for record in records:
+                    handler.handle(record)
+
+
+# Background writer installed by setup_logging(async_logging=True)
+_queue_handler: Optional[BoundedQueueHandler] = None
+_queue_listener: Optional[BatchingQueueListener] = None
+
+
+def shutdown_logging() -> None:
+    """Write all queued log records and stop the background writer"""
+    global _queue_listener, _queue_handler
+    if _queue_listener is not None:
+        _queue_listener.stop()
+        for handler in _queue_listener.handlers:
+            handler.close()
+    _queue_listener = None
+    _queue_handler = None
+
+
+def _restart_writer_after_fork() -> None:
+    """Worker processes do not inherit the writer thread; give them their own queue and writer"""
+    global _queue_listener
+    if _queue_handler is not None and _queue_listener is not None:
+        _queue_handler.queue = queue.Queue(maxsize=_queue_handler.queue.maxsize)
+        _queue_listener = BatchingQueueListener(_queue_handler.queue, _queue_listener.handlers, _queue_listener.batch_size)
+        _queue_listener.start()
+
+
+atexit.register(shutdown_logging)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_restart_writer_after_fork)
 
 
 class MetricsCollector:
@@ -130,27 +603,26 @@ class MetricsCollector:
                 self._metrics[key] = {
                     "name": name,
                     "type": "timing",
-                    "samples": [],
-                    "count": 0,
-                    "avg_duration": 0,
-                    "max_duration": 0,
-                    "min_duration": float('inf'),
+                    # Bounded-memory distribution of the samples; O(1) per record
+                    "histogram": Histogram(),
                     "labels": labels,
                     "created_at": datetime.utcnow().isoformat()
                 }
 
             metric = self._metrics[key]
-            metric["samples"].append(duration_seconds)
-            metric["count"] += 1
-            metric["avg_duration"] = sum(metric["samples"]) / len(metric["samples"])
-            metric["max_duration"] = max(metric["max_duration"], duration_seconds)
-            metric["min_duration"] = min(metric["min_duration"], duration_seconds)
+            metric["histogram"].record(duration_seconds)
             metric["last_updated"] = datetime.utcnow().isoformat()
 
     def get_metrics(self) -> Dict[str, Any]:
         """Get all collected metrics"""
         with self._lock:
-            return dict(self._metrics)
+            metrics = {}
+            for key, metric in self._metrics.items():
+                metric = dict(metric)
+                if metric["type"] == "timing":
+                    metric.update(self._timing_summary(metric.pop("histogram")))
+                metrics[key] = metric
+            return metrics
 
     def get_metric_summary(self) -> Dict[str, Any]:
         """Get summary of key metrics"""
@@ -166,15 +638,32 @@ class MetricsCollector:
                 if metric["type"] == "counter":
                     summary["counters"][metric["name"]] = metric["value"]
                 elif metric["type"] == "timing":
-                    summary["timings"][metric["name"]] = {
-                        "count": metric["count"],
-                        "avg_duration": metric["avg_duration"],
-                        "max_duration": metric["max_duration"],
-                        "min_duration": metric["min_duration"]
-                    }
+                    summary["timings"][metric["name"]] = self._timing_summary(metric["histogram"])
 
             return summary
 
+    def get_export_snapshot(self) -> List[Dict[str, Any]]:
+        """Copy every metric for exporters, with a histogram copy instead of a summary for timings"""
+        with self._lock:
+            snapshot = []
+            for metric in self._metrics.values():
+                metric = dict(metric)
+                if metric["type"] == "timing":
+                    metric["histogram"] = metric["histogram"].copy()
+                snapshot.append(metric)
+            return snapshot
+
+    def _timing_summary(self, histogram: Histogram) -> Dict[str, Any]:
+        """Count, average, extremes and p50/p90/p99/p999 of a timing metric"""
+        stats = histogram.summary()
+        return {
+            "count": stats.pop("count"),
+            "avg_duration": stats.pop("avg"),
+            "max_duration": stats.pop("max"),
+            "min_duration": stats.pop("min"),
+            **{name: value for name, value in stats.items() if name.startswith("p")}
+        }
+
     def _make_key(self, name: str, labels: Dict[str, Any]) -> str:
         """Create unique key from metric name and labels"""
         if labels:
@@ -196,7 +685,16 @@ def setup_logging(
     log_file: str = "app.log",
     level: int = logging.INFO,
     json_format: bool = True,
-    include_structured_logs: bool = True
+    include_structured_logs: bool = True,
+    async_logging: bool = True,
+    queue_size: int = 10000,
+    overflow_policy: str = "drop_debug",
+    max_bytes: int = 0,
+    rotate_interval: float = 0.0,
+    compression: Optional[str] = "gzip",
+    backup_count: int = 0,
+    max_age_days: float = 0.0,
+    fast_json: bool = True
 ) -> StructuredLogger:
     """
     Sets up advanced logging configuration with structured logging and metrics support.
@@ -206,7 +704,18 @@ def setup_logging(
         level (int): Logging level (e.g., logging.DEBUG, logging.INFO).
         json_format (bool): Whether to use JSON format for logs.
         include_structured_logs (bool): Whether to include structured logging capabilities.
+        async_logging (bool): Whether to format and write records on a background thread.
+        queue_size (int): Maximum number of records waiting for the background writer.
+        overflow_policy (str): What to do with DEBUG records when the queue is full ('block', 'drop_debug' or 'sample').
+        max_bytes (int): Rotate the log file before it exceeds this size. 0 disables size rotation.
+        rotate_interval (float): Rotate the log file every this many seconds. 0 disables time rotation.
+        compression (Optional[str]): Compression of rotated segments ('gzip', 'zstd' or None).
+        backup_count (int): Number of rotated segments to keep. 0 keeps all.
+        max_age_days (float): Delete rotated segments older than this. 0 disables the limit.
+        fast_json (bool): Use the optimized JsonFormatter path.
     """
+    global _queue_handler, _queue_listener
+
     # Create root logger
     root_logger = logging.getLogger()
     root_logger.setLevel(level)
@@ -214,10 +723,11 @@ def setup_logging(
     # Remove existing handlers to avoid duplicates
     for handler in root_logger.handlers[:]:
         root_logger.removeHandler(handler)
+    shutdown_logging()
 
     # Create appropriate formatter
     if json_format:
-        formatter = JsonFormatter(include_extra=include_structured_logs)
+        formatter = JsonFormatter(include_extra=include_structured_logs, fast=fast_json)
     else:
         formatter = logging.Formatter(
             "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
@@ -227,10 +737,16 @@ def setup_logging(
     log_path = Path(log_file)
     log_path.parent.mkdir(parents=True, exist_ok=True)
 
-    file_handler = logging.FileHandler(log_path)
+    file_handler = RotatingBufferedFileHandler(
+        str(log_path),
+        max_bytes=max_bytes,
+        rotate_interval=rotate_interval,
+        compression=compression,
+        backup_count=backup_count,
+        max_age_days=max_age_days
+    )
     file_handler.setLevel(level)
     file_handler.setFormatter(formatter)
-    root_logger.addHandler(file_handler)
 
     # Console handler for development
     console_handler = logging.StreamHandler(sys.stdout)
@@ -239,12 +755,23 @@ def setup_logging(
     )
     console_handler.setFormatter(console_formatter)
     console_handler.setLevel(logging.WARNING)  # Only warnings and above to console
-    root_logger.addHandler(console_handler)
+
+    context_filter = LogContextFilter()
+    if async_logging:
+        _queue_handler = BoundedQueueHandler(queue.Queue(maxsize=queue_size), overflow_policy=overflow_policy)
+        _queue_handler.addFilter(context_filter)
+        _queue_listener = BatchingQueueListener(_queue_handler.queue, [file_handler, console_handler])
+        _queue_listener.start()
+        root_logger.addHandler(_queue_handler)
+    else:
+        file_handler.addFilter(context_filter)
+        root_logger.addHandler(file_handler)
+        root_logger.addHandler(console_handler)
 
     # Create structured logger instance
     structured_logger = StructuredLogger("supermanus.app")
     structured_logger.info(
-        f"Enhanced logging configured. JSON: {json_format}, Structured: {include_structured_logs}",
+        "Enhanced logging configured. JSON: %s, Structured: %s", json_format, include_structured_logs,
         log_file=str(log_path),
         level=logging.getLevelName(level),
         timestamp_setup=datetime.utcnow().isoformat()
@@ -271,7 +798,7 @@ def log_performance(func_name: str, duration: float, result_success: bool = True
 
     logger = get_logger("performance")
     logger.info(
-        f"Function {func_name} completed",
+        "Function %s completed", func_name,
         duration_seconds=duration,
         success=result_success,
         metric="performance"
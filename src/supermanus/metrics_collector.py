@@ -1,9 +1,12 @@
 # src/supermanus/metrics_collector.py
+import inspect
 import time
 import threading
 from datetime import datetime, timedelta
-from typing import Dict, Any, List, Optional
+from functools import wraps
+from typing import Dict, Any, List, Optional, Tuple
 from collections import defaultdict
+from .histogram import DEFAULT_WINDOWS, Ewma, Histogram, WindowedCounter, WindowedStats
 from .logging_config import get_logger
 
 logger = get_logger("metrics_collector")
@@ -14,8 +17,13 @@ class TaskMetricsCollector:
 
     def __init__(self):
         self._lock = threading.Lock()
-        # Task completion times by status
-        self.task_completion_times = defaultdict(list)
+        # Task completion times by status, agent type and risk level, as
+        # all-time plus 1m/5m/1h windowed histograms (bounded memory)
+        self.task_completion_times: Dict[str, WindowedStats] = defaultdict(WindowedStats)
+        self.agent_completion_times: Dict[str, WindowedStats] = defaultdict(WindowedStats)
+        self.risk_completion_times: Dict[str, WindowedStats] = defaultdict(WindowedStats)
+        # Risk level of started tasks, until they complete
+        self._task_risk_levels: Dict[str, str] = {}
         # Active tasks count over time
         self.active_tasks_history = []
         # Task status transitions
@@ -32,23 +40,31 @@ class TaskMetricsCollector:
     def record_task_start(self, task_id: str, agent_type: str, risk_level: str):
         """Record when a task starts execution"""
         with self._lock:
-            logger.info(
-                f"Task {task_id} started by {agent_type}",
-                metric="task_started",
-                task_id=task_id,
-                agent_type=agent_type,
-                risk_level=risk_level
-            )
-
             agent_stats = self.agent_performance[agent_type]
             agent_stats["tasks_assigned"] += 1
             self._update_success_rate(agent_type)
-
-    def record_task_completion(self, task_id: str, agent_type: str, start_time: datetime, end_time: datetime, status: str):
-        """Record task completion with timing"""
+            self._task_risk_levels[task_id] = risk_level
+
+        # Log after releasing the lock so other recorders never wait on logging
+        logger.info(
+            "Task %s started by %s", task_id, agent_type,
+            metric="task_started",
+            task_id=task_id,
+            agent_type=agent_type,
+            risk_level=risk_level
+        )
+
+    def record_task_completion(self, task_id: str, agent_type: str, start_time: datetime, end_time: datetime, status: str,
+                               risk_level: Optional[str] = None):
+        """Record task completion with timing. The risk level defaults to the one given at task start."""
         with self._lock:
             duration = (end_time - start_time).total_seconds()
-            self.task_completion_times[status].append(duration)
+            started_risk_level = self._task_risk_levels.pop(task_id, None)
+            risk_level = risk_level or started_risk_level or "unknown"
+            now = time.time()
+            self.task_completion_times[status].record(duration, now)
+            self.agent_completion_times[agent_type].record(duration, now)
+            self.risk_completion_times[risk_level].record(duration, now)
             self.task_status_changes[status] += 1
 
             agent_stats = self.agent_performance[agent_type]
@@ -60,14 +76,14 @@ class TaskMetricsCollector:
 
             self._update_success_rate(agent_type)
 
-            logger.info(
-                f"Task {task_id} {status} by {agent_type}",
-                metric="task_completed",
-                task_id=task_id,
-                agent_type=agent_type,
-                duration_seconds=duration,
-                status=status
-            )
+        logger.info(
+            "Task %s %s by %s", task_id, status, agent_type,
+            metric="task_completed",
+            task_id=task_id,
+            agent_type=agent_type,
+            duration_seconds=duration,
+            status=status
+        )
 
     def _update_avg_completion_time(self, agent_type: str, new_duration: float):
         """Update average completion time for an agent type"""
@@ -89,26 +105,28 @@ class TaskMetricsCollector:
             agent_stats["success_rate"] = successful_tasks / total_tasks
 
     def get_task_metrics_summary(self) -> Dict[str, Any]:
-        """Get comprehensive task metrics summary"""
+        """
+        Get comprehensive task metrics summary. Completion times are reported per
+        status, agent type and risk level with percentiles over all time and the
+        last 1m/5m/1h; the cost is O(histogram buckets), not O(tasks ever seen).
+        """
         with self._lock:
+            now = time.time()
             summary = {
                 "total_tasks_by_status": dict(self.task_status_changes),
-                "task_completion_stats": {},
-                "agent_performance": dict(self.agent_performance),
+                "task_completion_stats": {
+                    status: self._duration_stats(stats, now) for status, stats in self.task_completion_times.items()
+                },
+                "agent_latency": {
+                    agent_type: self._duration_stats(stats, now) for agent_type, stats in self.agent_completion_times.items()
+                },
+                "risk_latency": {
+                    risk_level: self._duration_stats(stats, now) for risk_level, stats in self.risk_completion_times.items()
+                },
+                "agent_performance": {agent_type: dict(stats) for agent_type, stats in self.agent_performance.items()},
                 "generated_at": datetime.utcnow().isoformat()
             }
 
-            # Calculate stats for each task status
-            for status, times in self.task_completion_times.items():
-                if times:
-                    summary["task_completion_stats"][status] = {
-                        "count": len(times),
-                        "avg_duration": sum(times) / len(times),
-                        "max_duration": max(times),
-                        "min_duration": min(times),
-                        "total_duration": sum(times)
-                    }
-
             # Overall system stats
             total_completed = sum(stats["tasks_completed"] for stats in self.agent_performance.values())
             total_failed = sum(stats["tasks_failed"] for stats in self.agent_performance.values())
@@ -123,16 +141,63 @@ class TaskMetricsCollector:
 
             return summary
 
+    def get_export_snapshot(self) -> Dict[str, Any]:
+        """
+        Copies the pre-aggregated state for exporters (O(series x buckets), no sample walks).
 
-class SystemHealthCollector:
-    """Collect system health and performance metrics"""
+        Returns:
+            Dict[str, Any]: Status counts, agent counters and all-time duration histograms
+            by status, agent type and risk level.
+        """
+        with self._lock:
+            return {
+                "tasks_by_status": dict(self.task_status_changes),
+                "agent_performance": {agent_type: dict(stats) for agent_type, stats in self.agent_performance.items()},
+                "durations_by_status": {status: stats.total.copy() for status, stats in self.task_completion_times.items()},
+                "durations_by_agent": {agent_type: stats.total.copy() for agent_type, stats in self.agent_completion_times.items()},
+                "durations_by_risk": {risk_level: stats.total.copy() for risk_level, stats in self.risk_completion_times.items()},
+            }
 
-    def __init__(self):
+    def _duration_stats(self, stats: WindowedStats, now: float) -> Dict[str, Any]:
+        """Summarize a completion time series in the task_completion_stats format"""
+        summary = stats.summary(now)
+        windows = summary.pop("windows")
+        duration_stats = self._rename_duration_fields(summary)
+        duration_stats["windows"] = {name: self._rename_duration_fields(window) for name, window in windows.items()}
+        return duration_stats
+
+    def _rename_duration_fields(self, summary: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "count": summary.pop("count"),
+            "avg_duration": summary.pop("avg"),
+            "max_duration": summary.pop("max"),
+            "min_duration": summary.pop("min"),
+            "total_duration": summary.pop("sum"),
+            **summary
+        }
+
+
+class SystemHealthCollector:
+    """
+    Collect system health and performance metrics.
+
+    Per endpoint this keeps a latency histogram (all time and the last
+    1m/5m/1h), an exponentially weighted average latency, and request and
+    error counts over the same sliding windows. Every update is O(1) in
+    the number of requests seen.
+    """
+
+    def __init__(self, ewma_alpha: float = 0.1, windows: Optional[Dict[str, float]] = None):
+        """
+        Args:
+            ewma_alpha (float): Weight of the newest request in ``avg_duration``.
+            windows (Optional[Dict[str, float]]): Window names and lengths in seconds. Defaults to 1m/5m/1h.
+        """
         self._lock = threading.Lock()
-        # API request metrics
-        self.api_requests = defaultdict(lambda: {"count": 0, "errors": 0, "avg_duration": 0})
-        # Memory usage approximations
-        self.request_times = []
+        self.ewma_alpha = ewma_alpha
+        self.windows = windows or DEFAULT_WINDOWS
+        # API request metrics per "METHOD:endpoint"
+        self.api_requests: Dict[str, Dict[str, Any]] = {}
         # Error counts by type
         self.error_counts = defaultdict(int)
 
@@ -140,45 +205,58 @@ class SystemHealthCollector:
         """Record API request metrics"""
         with self._lock:
             api_key = f"{method}:{endpoint}"
-            metrics = self.api_requests[api_key]
+            metrics = self.api_requests.get(api_key)
+            if metrics is None:
+                metrics = self.api_requests[api_key] = {
+                    "endpoint": endpoint,
+                    "method": method,
+                    "count": 0,
+                    "errors": 0,
+                    "avg_duration": Ewma(self.ewma_alpha),
+                    "latency": WindowedStats(self.windows),
+                    "recent_errors": {name: WindowedCounter(seconds) for name, seconds in self.windows.items()}
+                }
 
+            now = time.time()
             metrics["count"] += 1
             if not success:
                 metrics["errors"] += 1
-
-            # Update average duration (running average)
-            if metrics["avg_duration"] == 0:
-                metrics["avg_duration"] = duration
-            else:
-                metrics["avg_duration"] = (metrics["avg_duration"] + duration) / 2
-
-            logger.info(
-                f"API request {method}:{endpoint}",
-                metric="api_request",
-                endpoint=endpoint,
-                method=method,
-                duration_seconds=duration,
-                success=success
-            )
+                for counter in metrics["recent_errors"].values():
+                    counter.add(1, now)
+            metrics["avg_duration"].update(duration)
+            metrics["latency"].record(duration, now)
+
+        # Log after releasing the lock so concurrent requests never wait on logging
+        logger.debug(
+            "API request %s:%s", method, endpoint,
+            metric="api_request",
+            endpoint=endpoint,
+            method=method,
+            duration_seconds=duration,
+            success=success
+        )
 
     def record_error(self, error_type: str, error_message: str):
         """Record error occurrence"""
         with self._lock:
             self.error_counts[error_type] += 1
+            total_errors_for_type = self.error_counts[error_type]
 
-            logger.error(
-                f"System error: {error_message}",
-                metric="system_error",
-                error_type=error_type,
-                error_message=error_message,
-                total_errors_for_type=self.error_counts[error_type]
-            )
+        logger.error(
+            "System error: %s", error_message,
+            metric="system_error",
+            error_type=error_type,
+            error_message=error_message,
+            total_errors_for_type=total_errors_for_type
+        )
 
     def get_health_metrics(self) -> Dict[str, Any]:
         """Get system health metrics"""
         with self._lock:
+            now = time.time()
             health_data = {
-                "api_requests": dict(self.api_requests),
+                "api_requests": {api_key: self._endpoint_summary(metrics, now)
+                                 for api_key, metrics in self.api_requests.items()},
                 "error_counts": dict(self.error_counts),
                 "total_errors": sum(self.error_counts.values()),
                 "timestamp": datetime.utcnow().isoformat()
@@ -193,10 +271,156 @@ class SystemHealthCollector:
 
             return health_data
 
+    def get_export_snapshot(self) -> Dict[str, Any]:
+        """
+        Copies the pre-aggregated state for exporters (O(endpoints x buckets), no sample walks).
+
+        Returns:
+            Dict[str, Any]: Per-endpoint counters, EWMA latency and all-time latency
+            histogram, plus error counts by type.
+        """
+        with self._lock:
+            return {
+                "endpoints": [
+                    {
+                        "endpoint": metrics["endpoint"],
+                        "method": metrics["method"],
+                        "count": metrics["count"],
+                        "errors": metrics["errors"],
+                        "ewma_duration": metrics["avg_duration"].value,
+                        "latency": metrics["latency"].total.copy(),
+                    }
+                    for metrics in self.api_requests.values()
+                ],
+                "error_counts": dict(self.error_counts),
+            }
+
+    def _endpoint_summary(self, metrics: Dict[str, Any], now: float) -> Dict[str, Any]:
+        """JSON-ready latency, rate and error statistics of one endpoint"""
+        latency = metrics["latency"].summary(now)
+        windows = {}
+        for name, window in latency.pop("windows").items():
+            seconds = self.windows[name]
+            errors = metrics["recent_errors"][name].total(now)
+            windows[name] = {
+                "requests": window["count"],
+                "requests_per_second": window["count"] / seconds,
+                "errors": errors,
+                "error_rate": errors / window["count"] if window["count"] else 0,
+                **{key: value for key, value in window.items() if key.startswith("p")}
+            }
+        return {
+            "endpoint": metrics["endpoint"],
+            "method": metrics["method"],
+            "count": metrics["count"],
+            "errors": metrics["errors"],
+            "avg_duration": metrics["avg_duration"].value,
+            "mean_duration": latency["avg"],
+            "max_duration": latency["max"],
+            "min_duration": latency["min"],
+            **{key: value for key, value in latency.items() if key.startswith("p")},
+            "windows": windows
+        }
+
+
+class RouteStats:
+    """Latency histogram and status code counts of one route and method, with its own lock"""
+
+    def __init__(self, route: str, method: str):
+        self.route = route
+        self.method = method
+        self.lock = threading.Lock()
+        self.latency = Histogram()
+        self.status_counts: Dict[int, int] = defaultdict(int)
+
+    def record(self, duration: float, status_code: int) -> None:
+        with self.lock:
+            self.latency.record(duration)
+            self.status_counts[status_code] += 1
+
+
+class RequestMetrics:
+    """
+    Per-route HTTP request metrics fed by the MCP server's ASGI middleware.
+
+    Each route and method has its own RouteStats and lock, so concurrent
+    requests to different routes never contend; the registry lock is only
+    taken the first time a route is seen. In-flight gauges are per method.
+    The exporter folds these routes into the API health metrics at scrape
+    time, so the request path never touches SystemHealthCollector.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routes: Dict[Tuple[str, str], RouteStats] = {}
+        self._in_flight_lock = threading.Lock()
+        self._in_flight: Dict[str, int] = defaultdict(int)
+
+    def request_started(self, method: str) -> None:
+        with self._in_flight_lock:
+            self._in_flight[method] += 1
+
+    def request_finished(self, method: str) -> None:
+        with self._in_flight_lock:
+            self._in_flight[method] -= 1
+
+    def route_stats(self, route: str, method: str) -> RouteStats:
+        """
+        Gets the stats of a route, creating them on first use.
+
+        Args:
+            route (str): The route template, e.g. '/tasks/{task_id}'.
+            method (str): The HTTP method.
+
+        Returns:
+            RouteStats: The stats.
+        """
+        key = (route, method)
+        stats = self._routes.get(key)
+        if stats is None:
+            with self._lock:
+                stats = self._routes.setdefault(key, RouteStats(route, method))
+        return stats
+
+    def record(self, route: str, method: str, duration: float, status_code: int) -> None:
+        """
+        Records a finished request.
+
+        Args:
+            route (str): The route template.
+            method (str): The HTTP method.
+            duration (float): Seconds from request start until the response started.
+            status_code (int): The response status.
+        """
+        self.route_stats(route, method).record(duration, status_code)
+
+    def get_export_snapshot(self) -> Dict[str, Any]:
+        """
+        Copies the per-route state for exporters (O(routes x buckets)).
+
+        Returns:
+            Dict[str, Any]: Per-route status counts and latency histogram, and in-flight requests per method.
+        """
+        with self._lock:
+            routes = list(self._routes.values())
+        snapshot = []
+        for stats in routes:
+            with stats.lock:
+                snapshot.append({
+                    "route": stats.route,
+                    "method": stats.method,
+                    "status_counts": dict(stats.status_counts),
+                    "latency": stats.latency.copy(),
+                })
+        with self._in_flight_lock:
+            in_flight = dict(self._in_flight)
+        return {"routes": snapshot, "in_flight": in_flight}
+
 
 # Global instances
 _task_collector = TaskMetricsCollector()
 _health_collector = SystemHealthCollector()
+_request_metrics = RequestMetrics()
 
 
 def get_task_metrics_collector() -> TaskMetricsCollector:
@@ -209,6 +433,11 @@ def get_health_metrics_collector() -> SystemHealthCollector:
     return _health_collector
 
 
+def get_request_metrics() -> RequestMetrics:
+    """Get the global per-route HTTP request metrics"""
+    return _request_metrics
+
+
 def get_all_metrics() -> Dict[str, Any]:
     """Get all collected metrics"""
     return {
@@ -249,19 +478,63 @@ def monitor_task(func):
                 risk_level = task_info.get("risk_level", "unknown")
                 task_id = task_info.get("task_id", "unknown")
 
-                status = "completed" if success else "failed"
-                _task_collector.record_task_completion(task_id, agent_type, start_time, end_time, status)
-
                 # Record task start as well (in a real system this would be recorded separately)
                 _task_collector.record_task_start(task_id, agent_type, risk_level)
 
+                status = "completed" if success else "failed"
+                _task_collector.record_task_completion(task_id, agent_type, start_time, end_time, status)
+
     return wrapper
 
 
-def monitor_api_call(func):
-    """Decorator to monitor API call performance"""
+def _request_labels(func, args, kwargs, endpoint: Optional[str], method: Optional[str]) -> Tuple[str, str]:
+    """Endpoint and method of a monitored call: explicit labels, else the request argument, else the function name"""
+    if endpoint is None or method is None:
+        for value in list(args) + list(kwargs.values()):
+            # Duck-typed so any Starlette/FastAPI-style request works without importing it
+            if hasattr(value, "method") and hasattr(value, "url"):
+                route = getattr(value, "scope", {}).get("route")
+                endpoint = endpoint or getattr(route, "path_format", None) or value.url.path
+                method = method or value.method
+                break
+    return endpoint or func.__name__, method or "CALL"
+
+
+def monitor_api_call(func=None, *, endpoint: Optional[str] = None, method: Optional[str] = None):
+    """
+    Decorator to monitor API call performance. Use as ``@monitor_api_call`` to
+    take the endpoint and method from a request argument (or the function
+    name), or as ``@monitor_api_call(endpoint="/tasks", method="GET")``.
+    Works on both regular and async functions.
+    """
+    if func is None:
+        return lambda f: monitor_api_call(f, endpoint=endpoint, method=method)
+
+    def record(start_time: float, success: bool, args, kwargs):
+        duration = time.perf_counter() - start_time
+        labels = _request_labels(func, args, kwargs, endpoint, method)
+        _health_collector.record_api_request(labels[0], labels[1], duration, success)
+
+    if inspect.iscoroutinefunction(func):
+        @wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            start_time = time.perf_counter()
+            success = False
+            try:
+                result = await func(*args, **kwargs)
+                success = True
+                return result
+            except Exception as e:
+                _health_collector.record_error("api_error", str(e))
+                raise
+            finally:
+                record(start_time, success, args, kwargs)
+
+        return async_wrapper
+
+    @wraps(func)
     def wrapper(*args, **kwargs):
-        start_time = time.time()
+        start_time = time.perf_counter()
         success = False
 
         try:
@@ -272,9 +545,7 @@ def monitor_api_call(func):
             _health_collector.record_error("api_error", str(e))
             raise
         finally:
-            duration = time.time() - start_time
-            # In a real system, you'd extract the endpoint and method from the request
-            _health_collector.record_api_request("/api/unknown", "POST", duration, success)
+            record(start_time, success, args, kwargs)
 
     return wrapper
 
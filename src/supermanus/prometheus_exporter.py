@@ -0,0 +1,284 @@
+# src/supermanus/prometheus_exporter.py
+import re
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+try:
+    from prometheus_client import CollectorRegistry, generate_latest, CONTENT_TYPE_LATEST
+    from prometheus_client import GCCollector, PlatformCollector, ProcessCollector
+    from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily, HistogramMetricFamily
+except ImportError:  # Optional: only needed to serve Prometheus metrics
+    CollectorRegistry = None
+    CONTENT_TYPE_LATEST = "text/plain; version=0.0.4; charset=utf-8"
+
+from .histogram import Histogram
+from .logging_config import MetricsCollector, get_metrics_collector
+from .metrics_collector import (
+    RequestMetrics, SystemHealthCollector, TaskMetricsCollector,
+    get_health_metrics_collector, get_request_metrics, get_task_metrics_collector
+)
+
+# Histogram bucket bounds (seconds) for request latencies and task durations
+LATENCY_BUCKETS: Tuple[float, ...] = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+TASK_DURATION_BUCKETS: Tuple[float, ...] = (1.0, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0, 1800.0, 3600.0, 7200.0)
+
+METRIC_PREFIX = "supermanus"
+
+
+def _metric_name(*parts: str) -> str:
+    """Joins name parts into a valid Prometheus metric name"""
+    return re.sub(r"[^a-zA-Z0-9_]", "_", "_".join(part for part in parts if part)).lower()
+
+
+def _histogram_family(name: str, documentation: str, labels: Sequence[str],
+                      series: Iterable[Tuple[Sequence[str], Histogram]],
+                      bounds: Sequence[float]) -> "HistogramMetricFamily":
+    """
+    Builds a Prometheus histogram from streaming histograms.
+
+    Args:
+        name (str): The metric name.
+        documentation (str): The help text.
+        labels (Sequence[str]): Label names.
+        series (Iterable[Tuple[Sequence[str], Histogram]]): Label values and histogram per series.
+        bounds (Sequence[float]): Ascending bucket upper bounds.
+
+    Returns:
+        HistogramMetricFamily: The metric family.
+    """
+    family = HistogramMetricFamily(name, documentation, labels=labels)
+    for label_values, histogram in series:
+        counts = histogram.cumulative_counts(bounds)
+        buckets = [(repr(float(bound)), count) for bound, count in zip(bounds, counts)]
+        buckets.append(("+Inf", histogram.count))
+        family.add_metric(list(label_values), buckets, histogram.sum)
+    return family
+
+
+class SupermanusCollector:
+    """
+    Prometheus collector over the in-process metric collectors.
+
+    Every scrape copies the collectors' pre-aggregated state (counters and
+    streaming histograms) under their locks and renders it, so the cost is
+    O(series x buckets) and independent of how many samples were recorded.
+    Sections select which collectors are exported: 'tasks', 'health'
+    (API requests recorded in SystemHealthCollector plus the per-route
+    request metrics, merged at scrape time), 'requests' (per-route HTTP
+    metrics from the ASGI middleware) and 'app'.
+    """
+
+    def __init__(self, sections: Iterable[str] = ("tasks", "health", "requests", "app"),
+                 task_collector: Optional[TaskMetricsCollector] = None,
+                 health_collector: Optional[SystemHealthCollector] = None,
+                 app_collector: Optional[MetricsCollector] = None,
+                 request_metrics: Optional[RequestMetrics] = None):
+        """
+        Initializes the SupermanusCollector.
+
+        Args:
+            sections (Iterable[str]): The collectors to export.
+            task_collector (Optional[TaskMetricsCollector]): Defaults to the global task collector.
+            health_collector (Optional[SystemHealthCollector]): Defaults to the global health collector.
+            app_collector (Optional[MetricsCollector]): Defaults to the global logging_config collector.
+            request_metrics (Optional[RequestMetrics]): Defaults to the global per-route request metrics.
+        """
+        self.sections = tuple(sections)
+        self.task_collector = task_collector or get_task_metrics_collector()
+        self.health_collector = health_collector or get_health_metrics_collector()
+        self.app_collector = app_collector or get_metrics_collector()
+        self.request_metrics = request_metrics or get_request_metrics()
+
+    def collect(self) -> Iterator[Any]:
+        """
+        Yields the metric families. Called by the registry on every scrape.
+        """
+        if "tasks" in self.sections:
+            yield from self._collect_tasks()
+        if "health" in self.sections:
+            yield from self._collect_health()
+        if "requests" in self.sections:
+            yield from self._collect_requests()
+        if "app" in self.sections:
+            yield from self._collect_app()
+
+    def _collect_tasks(self) -> Iterator[Any]:
+        snapshot = self.task_collector.get_export_snapshot()
+
+        tasks = CounterMetricFamily(_metric_name(METRIC_PREFIX, "tasks"), "Finished tasks by status", labels=["status"])
+        for status, count in snapshot["tasks_by_status"].items():
+            tasks.add_metric([status], count)
+        yield tasks
+
+        agent_tasks = CounterMetricFamily(_metric_name(METRIC_PREFIX, "agent_tasks"),
+                                          "Tasks per agent type and outcome", labels=["agent_type", "outcome"])
+        success = GaugeMetricFamily(_metric_name(METRIC_PREFIX, "agent_success_ratio"),
+                                    "Completed over assigned tasks per agent type", labels=["agent_type"])
+        for agent_type, stats in snapshot["agent_performance"].items():
+            agent_tasks.add_metric([agent_type, "assigned"], stats["tasks_assigned"])
+            agent_tasks.add_metric([agent_type, "completed"], stats["tasks_completed"])
+            agent_tasks.add_metric([agent_type, "failed"], stats["tasks_failed"])
+            success.add_metric([agent_type], stats["success_rate"])
+        yield agent_tasks
+        yield success
+
+        for name, label, key, documentation in (
+            ("task_duration_seconds", "status", "durations_by_status", "Task duration by final status"),
+            ("agent_task_duration_seconds", "agent_type", "durations_by_agent", "Task duration by agent type"),
+            ("risk_task_duration_seconds", "risk_level", "durations_by_risk", "Task duration by risk level"),
+        ):
+            yield _histogram_family(
+                _metric_name(METRIC_PREFIX, name), documentation, [label],
+                (([value], histogram) for value, histogram in snapshot[key].items()), TASK_DURATION_BUCKETS
+            )
+
+    def _api_endpoints(self, snapshot: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Merges the health collector's endpoints with the middleware's per-route
+        request metrics. 5xx responses count as errors; only endpoints recorded
+        in the health collector have an EWMA latency.
+
+        Args:
+            snapshot (Dict[str, Any]): The health collector's export snapshot.
+
+        Returns:
+            List[Dict[str, Any]]: Per endpoint and method counts, errors, EWMA and latency histogram.
+        """
+        endpoints = {(endpoint["endpoint"], endpoint["method"]): endpoint for endpoint in snapshot["endpoints"]}
+        for route in self.request_metrics.get_export_snapshot()["routes"]:
+            key = (route["route"], route["method"])
+            endpoint = endpoints.get(key)
+            if endpoint is None:
+                endpoint = endpoints[key] = {"endpoint": key[0], "method": key[1], "count": 0, "errors": 0,
+                                             "ewma_duration": None, "latency": Histogram()}
+            endpoint["count"] += sum(route["status_counts"].values())
+            endpoint["errors"] += sum(count for status_code, count in route["status_counts"].items() if status_code >= 500)
+            endpoint["latency"].merge(route["latency"])
+        return list(endpoints.values())
+
+    def _collect_health(self) -> Iterator[Any]:
+        snapshot = self.health_collector.get_export_snapshot()
+        endpoints = self._api_endpoints(snapshot)
+        labels = ["endpoint", "method"]
+
+        requests = CounterMetricFamily(_metric_name(METRIC_PREFIX, "api_requests"), "API requests", labels=labels)
+        errors = CounterMetricFamily(_metric_name(METRIC_PREFIX, "api_request_errors"), "Failed API requests", labels=labels)
+        ewma = GaugeMetricFamily(_metric_name(METRIC_PREFIX, "api_request_duration_ewma_seconds"),
+                                 "Exponentially weighted average API latency", labels=labels)
+        for endpoint in endpoints:
+            label_values = [endpoint["endpoint"], endpoint["method"]]
+            requests.add_metric(label_values, endpoint["count"])
+            errors.add_metric(label_values, endpoint["errors"])
+            if endpoint["ewma_duration"] is not None:
+                ewma.add_metric(label_values, endpoint["ewma_duration"])
+        yield requests
+        yield errors
+        yield ewma
+        yield _histogram_family(
+            _metric_name(METRIC_PREFIX, "api_request_duration_seconds"), "API request latency", labels,
+            (([endpoint["endpoint"], endpoint["method"]], endpoint["latency"]) for endpoint in endpoints),
+            LATENCY_BUCKETS
+        )
+
+        system_errors = CounterMetricFamily(_metric_name(METRIC_PREFIX, "errors"), "Recorded errors by type", labels=["error_type"])
+        for error_type, count in snapshot["error_counts"].items():
+            system_errors.add_metric([error_type], count)
+        yield system_errors
+
+    def _collect_requests(self) -> Iterator[Any]:
+        snapshot = self.request_metrics.get_export_snapshot()
+
+        requests = CounterMetricFamily(_metric_name(METRIC_PREFIX, "http_requests"), "HTTP requests by route template, method and status",
+                                       labels=["route", "method", "status"])
+        for route in snapshot["routes"]:
+            for status_code, count in route["status_counts"].items():
+                requests.add_metric([route["route"], route["method"], str(status_code)], count)
+        yield requests
+
+        yield _histogram_family(
+            _metric_name(METRIC_PREFIX, "http_request_duration_seconds"), "HTTP request latency by route template and method",
+            ["route", "method"], (([route["route"], route["method"]], route["latency"]) for route in snapshot["routes"]),
+            LATENCY_BUCKETS
+        )
+
+        in_flight = GaugeMetricFamily(_metric_name(METRIC_PREFIX, "http_requests_in_flight"), "HTTP requests being processed",
+                                      labels=["method"])
+        for method, count in snapshot["in_flight"].items():
+            in_flight.add_metric([method], count)
+        yield in_flight
+
+    def _collect_app(self) -> Iterator[Any]:
+        # Group series by metric name; label names must be the same within a family
+        counters: Dict[str, List[Dict[str, Any]]] = {}
+        timings: Dict[str, List[Dict[str, Any]]] = {}
+        for metric in self.app_collector.get_export_snapshot():
+            target = counters if metric["type"] == "counter" else timings
+            target.setdefault(metric["name"], []).append(metric)
+
+        for name, metrics in counters.items():
+            label_names = sorted({key for metric in metrics for key in metric["labels"]})
+            family = CounterMetricFamily(_metric_name(METRIC_PREFIX, "app", name), f"Counter {name}",
+                                         labels=[_metric_name(label) for label in label_names])
+            for metric in metrics:
+                family.add_metric([str(metric["labels"].get(label, "")) for label in label_names], metric["value"])
+            yield family
+
+        for name, metrics in timings.items():
+            label_names = sorted({key for metric in metrics for key in metric["labels"]})
+            yield _histogram_family(
+                _metric_name(METRIC_PREFIX, "app", name, "seconds"), f"Timing {name}",
+                [_metric_name(label) for label in label_names],
+                (([str(metric["labels"].get(label, "")) for label in label_names], metric["histogram"]) for metric in metrics),
+                LATENCY_BUCKETS
+            )
+
+
+def create_registry(sections: Iterable[str] = ("tasks", "health", "requests", "app"),
+                    include_process_metrics: bool = True) -> "CollectorRegistry":
+    """
+    Creates a registry that exports the in-process collectors.
+
+    Args:
+        sections (Iterable[str]): The collectors to export ('tasks', 'health', 'requests', 'app').
+        include_process_metrics (bool): Also export process, platform and GC metrics.
+
+    Returns:
+        CollectorRegistry: The registry.
+
+    Raises:
+        ImportError: If prometheus_client is not installed.
+    """
+    if CollectorRegistry is None:
+        raise ImportError("Prometheus metrics require the prometheus-client package (pip install prometheus-client)")
+    registry = CollectorRegistry()
+    registry.register(SupermanusCollector(sections))
+    if include_process_metrics:
+        ProcessCollector(registry=registry)
+        PlatformCollector(registry=registry)
+        GCCollector(registry=registry)
+    return registry
+
+
+def render(registry: "CollectorRegistry") -> bytes:
+    """
+    Renders a registry in the Prometheus text exposition format (``CONTENT_TYPE_LATEST``).
+
+    Args:
+        registry (CollectorRegistry): The registry.
+
+    Returns:
+        bytes: The exposition.
+    """
+    return generate_latest(registry)
+
+
+if __name__ == "__main__":
+    # Simple test
+    from datetime import datetime, timedelta
+    health = get_health_metrics_collector()
+    health.record_api_request("/tasks", "GET", 0.004)
+    health.record_api_request("/task/report", "POST", 0.03, success=False)
+    end = datetime.utcnow()
+    get_task_metrics_collector().record_task_start("T1", "coding", "low")
+    get_task_metrics_collector().record_task_completion("T1", "coding", end - timedelta(seconds=42), end, "completed")
+    get_metrics_collector().record_timing("function_duration", 0.02, function="demo", success=True)
+    print(render(create_registry(include_process_metrics=False)).decode())
@@ -1,62 +1,275 @@
 # src/supermanus/session_manager.py
-import json
+import atexit
 import logging
+import threading
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Iterator, List, Optional
+from .state_storage import StateStorage, JsonFileStorage, apply_changes
 
 
 class SessionManager:
     """
     Manages the session state for the Miss_TaskMaster application.
-    Handles loading and saving state to/from a JSON file.
+    Handles loading and saving state through a pluggable storage engine
+    (a JSON file by default).
+
+    Writes are tracked as dirty state. By default every change is written
+    immediately; with a ``flush_interval`` changes are coalesced and written
+    by a background flusher thread at most that many seconds later (or as
+    soon as ``max_pending_changes`` are pending), which bounds the data-loss
+    window. ``flush``, ``checkpoint`` and ``close`` force the write.
     """
 
-    def __init__(self, state_file: str = "session_state.json"):
+    def __init__(self, state_file: str = "session_state.json", storage: Optional[StateStorage] = None,
+                 flush_interval: float = 0.0, max_pending_changes: int = 0):
         """
         Initializes the SessionManager.
 
         Args:
             state_file (str): Path to the state file.
+            storage (Optional[StateStorage]): The storage engine. Defaults to a JSON file at ``state_file``.
+            flush_interval (float): Maximum seconds a change may stay unwritten. 0 writes every change immediately.
+            max_pending_changes (int): Number of unwritten changes that forces a flush. 0 disables the limit.
         """
         self.state_file = Path(state_file)
+        self.storage = storage or JsonFileStorage(self.state_file)
         self.state: Dict[str, Any] = {}
         self.logger = logging.getLogger(__name__)
+        self.flush_interval = flush_interval
+        self.max_pending_changes = max_pending_changes
+        # Guards the in-memory state against concurrent flushes. Callers that
+        # mutate the state from several threads should hold it too.
+        self.lock = threading.RLock()
+        # Writes run in the order their flushes were encoded: each flush takes a ticket
+        # under ``lock`` and waits on _write_cond, without holding ``lock``, until the
+        # previous ticket is written. _snapshot_seq is the ticket of the newest snapshot;
+        # older writes are covered by it and skipped.
+        self._write_cond = threading.Condition()
+        self._flush_seq = 0
+        self._written_seq = 0
+        self._snapshot_seq = 0
+        self._task_index: Optional[Dict[str, Dict[str, Any]]] = None
+        # Dirty tracking: a pending full snapshot and/or unwritten changes
+        self._snapshot_dirty = False
+        self._pending_changes: List[Dict[str, Any]] = []
+        # Changes held back by an open group_commit() block
+        self._group_depth = 0
+        self._group_changes: List[Dict[str, Any]] = []
+        self._stop_flusher = threading.Event()
+        self._flusher: Optional[threading.Thread] = None
 
     def load_state(self) -> Dict[str, Any]:
         """
-        Loads the state from the file.
+        Loads the state from the storage engine.
 
         Returns:
             Dict[str, Any]: The loaded state.
         """
-        if self.state_file.exists():
-            try:
-                with open(self.state_file, 'r') as f:
-                    self.state = json.load(f)
-                self.logger.info(f"State loaded from {self.state_file}")
-            except (json.JSONDecodeError, IOError) as e:
-                self.logger.error(f"Error loading state: {e}")
-                self.state = {}
-        else:
-            self.logger.info(f"State file {self.state_file} does not exist. Starting with empty state.")
-            self.state = {}
+        with self.lock:
+            self.state = self.storage.load()
+            self._task_index = None
+            self._snapshot_dirty = False
+            self._pending_changes = []
         return self.state
 
     def save_state(self, state: Optional[Dict[str, Any]] = None) -> None:
         """
-        Saves the state to the file.
+        Saves a full snapshot of the state to the storage engine. Does nothing
+        if no state is given and nothing changed since the last write.
 
         Args:
             state (Optional[Dict[str, Any]]): The state to save. If None, uses current state.
         """
-        if state is not None:
-            self.state = state
+        with self.lock:
+            if state is not None:
+                self.state = state
+                self._task_index = None
+            elif not self.dirty:
+                return
+            # A snapshot covers every unwritten change
+            self._snapshot_dirty = True
+            self._pending_changes = []
+            self._group_changes = []
+        self._schedule_flush()
+
+    def record_changes(self, changes: List[Dict[str, Any]]) -> None:
+        """
+        Applies incremental changes to the state and persists them.
+        Storage engines that support it log only the changes instead of
+        rewriting the whole state.
+
+        Args:
+            changes (List[Dict[str, Any]]): Changes built with ``state_storage.set_change``/``task_change``.
+        """
+        if not changes:
+            return
+        self.stage_changes(changes)
+        self.persist_changes(changes)
+
+    def stage_changes(self, changes: List[Dict[str, Any]]) -> None:
+        """
+        Applies incremental changes to the in-memory state only.
+
+        Args:
+            changes (List[Dict[str, Any]]): The changes to apply.
+        """
+        with self.lock:
+            self._task_index = apply_changes(self.state, changes, self._task_index)
+
+    def persist_changes(self, changes: List[Dict[str, Any]]) -> None:
+        """
+        Queues changes that were already applied to the in-memory state for
+        writing. Inside a ``group_commit`` block they are held back until the
+        block exits.
+
+        Args:
+            changes (List[Dict[str, Any]]): The applied changes.
+        """
+        with self.lock:
+            if self._group_depth:
+                self._group_changes.extend(changes)
+                return
+            if not self._snapshot_dirty:
+                self._pending_changes.extend(changes)
+        self._schedule_flush()
+
+    @property
+    def dirty(self) -> bool:
+        """
+        Whether the in-memory state has changes that are not written yet.
+        """
+        return self._snapshot_dirty or bool(self._pending_changes)
+
+    def _schedule_flush(self) -> None:
+        """
+        Writes pending state now or leaves it to the background flusher,
+        according to the flush policy.
+        """
+        if self.flush_interval <= 0 or (
+                self.max_pending_changes and len(self._pending_changes) >= self.max_pending_changes):
+            self.flush()
+        else:
+            self._ensure_flusher()
+
+    def _ensure_flusher(self) -> None:
+        """
+        Starts the background flusher thread if it is not running.
+        """
+        if self._flusher is not None:
+            return
+        self._stop_flusher.clear()
+        self._flusher = threading.Thread(target=self._flush_periodically, name="session-state-flusher", daemon=True)
+        self._flusher.start()
+        atexit.register(self.close)
+
+    def _flush_periodically(self) -> None:
+        """
+        Background flusher loop: writes pending state every ``flush_interval``
+        seconds until ``close`` stops it.
+        """
+        while not self._stop_flusher.wait(self.flush_interval):
+            if self.dirty:
+                self.flush()
+
+    def flush(self) -> bool:
+        """
+        Writes any pending snapshot or changes to the storage engine now.
+        The state is encoded under ``lock`` but written after releasing it,
+        so state changes are not blocked by the disk I/O or by other flushes
+        waiting for their turn to write.
+
+        Returns:
+            bool: True if something was written (or superseded by a newer snapshot).
+        """
+        error = None
+        write = None
+        with self.lock:
+            snapshot, self._snapshot_dirty = self._snapshot_dirty, False
+            changes, self._pending_changes = self._pending_changes, []
+            if not snapshot and not changes:
+                return False
+            self._flush_seq += 1
+            seq = self._flush_seq
+            if snapshot:
+                self._snapshot_seq = seq
+            try:
+                if snapshot:
+                    write = self.storage.prepare_save(self.state)
+                else:
+                    write = self.storage.prepare_append(changes, self.state)
+            except Exception as e:
+                error = e
+
+        with self._write_cond:
+            while self._written_seq != seq - 1:
+                self._write_cond.wait()
+            try:
+                # A newer snapshot was encoded meanwhile and covers this write
+                if write is not None and seq >= self._snapshot_seq:
+                    write()
+            except Exception as e:
+                error = e
+            finally:
+                self._written_seq = seq
+                self._write_cond.notify_all()
+        if error is not None:
+            self._flush_failed(error)
+            return False
+        return True
+
+    def _flush_failed(self, error: Exception) -> None:
+        """
+        Logs a failed write and schedules a full snapshot, which covers the lost changes.
+
+        Args:
+            error (Exception): The storage error.
+        """
+        self.logger.error("Error saving state: %s", error)
+        with self.lock:
+            self._snapshot_dirty = True
+
+    def checkpoint(self) -> None:
+        """
+        Forces a durable full snapshot of the current state, regardless of
+        the flush policy. Log-based engines compact their log as part of it.
+        """
+        with self.lock:
+            self._snapshot_dirty = True
+            self._pending_changes = []
+        self.flush()
+
+    @contextmanager
+    def group_commit(self) -> Iterator[None]:
+        """
+        Collects every change recorded inside the block and persists them in
+        a single write when the outermost block exits.
+        """
+        with self.lock:
+            self._group_depth += 1
         try:
-            with open(self.state_file, 'w') as f:
-                json.dump(self.state, f, indent=2)
-            self.logger.info(f"State saved to {self.state_file}")
-        except IOError as e:
-            self.logger.error(f"Error saving state: {e}")
+            yield
+        finally:
+            with self.lock:
+                self._group_depth -= 1
+                changes = []
+                if self._group_depth == 0 and self._group_changes:
+                    changes, self._group_changes = self._group_changes, []
+            if changes:
+                self.persist_changes(changes)
+
+    def close(self) -> None:
+        """
+        Stops the background flusher, writes pending state and closes the
+        underlying storage engine.
+        """
+        if self._flusher is not None:
+            self._stop_flusher.set()
+            self._flusher.join()
+            self._flusher = None
+            atexit.unregister(self.close)
+        self.flush()
+        self.storage.close()
 
     def get_state(self) -> Dict[str, Any]:
         """
@@ -74,8 +287,13 @@ class SessionManager:
         Args:
             updates (Dict[str, Any]): The updates to apply.
         """
-        self.state.update(updates)
-        self.logger.debug(f"State updated: {updates}")
+        with self.lock:
+            self.state.update(updates)
+            if "project_tasks" in updates:
+                self._task_index = None
+            self._snapshot_dirty = True
+            self._pending_changes = []
+        self.logger.debug("State updated: %s", updates)
 
 
 if __name__ == "__main__":
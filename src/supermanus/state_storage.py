@@ -0,0 +1,774 @@
+# src/supermanus/state_storage.py
+import json
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, Any, List, Optional, Tuple
+
+try:
+    import msgpack
+except ImportError:  # Optional: only needed for the binary 'msgpack' state format
+    msgpack = None
+
+# Snapshot key holding the WriteAheadLogStorage generation; removed from the state on load
+WAL_GENERATION_KEY = "_wal_generation"
+
+# os.umask can only be read by setting it, so read it once at import rather than per write
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+def set_change(key: str, value: Any) -> Dict[str, Any]:
+    """
+    Builds a change that sets a top-level state key.
+
+    Args:
+        key (str): The state key.
+        value (Any): The new value.
+
+    Returns:
+        Dict[str, Any]: The change record.
+    """
+    return {"op": "set", "key": key, "value": value}
+
+
+def task_change(task_id: str, fields: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Builds a change that updates fields of a single task in ``project_tasks``.
+
+    Args:
+        task_id (str): The task ID.
+        fields (Dict[str, Any]): The task fields to update.
+
+    Returns:
+        Dict[str, Any]: The change record.
+    """
+    return {"op": "task", "id": task_id, "fields": fields}
+
+
+def build_task_index(state: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """
+    Builds an id -> task mapping over the tasks stored in the state.
+
+    Args:
+        state (Dict[str, Any]): The session state.
+
+    Returns:
+        Dict[str, Dict[str, Any]]: The task index.
+    """
+    return {task["id"]: task for task in state.get("project_tasks", []) if "id" in task}
+
+
+def apply_changes(state: Dict[str, Any], changes: List[Dict[str, Any]],
+                  task_index: Optional[Dict[str, Dict[str, Any]]] = None) -> Optional[Dict[str, Dict[str, Any]]]:
+    """
+    Applies change records to a state in place.
+
+    Args:
+        state (Dict[str, Any]): The state to update.
+        changes (List[Dict[str, Any]]): The changes to apply, in order.
+        task_index (Optional[Dict[str, Dict[str, Any]]]): A prebuilt task index for the state.
+
+    Returns:
+        Optional[Dict[str, Dict[str, Any]]]: The task index to reuse for later changes, or None if it was invalidated.
+    """
+    for change in changes:
+        op = change.get("op")
+        if op == "set":
+            state[change["key"]] = change["value"]
+            if change["key"] == "project_tasks":
+                task_index = None
+        elif op == "task":
+            if task_index is None:
+                task_index = build_task_index(state)
+            task = task_index.get(change["id"])
+            if task is not None:
+                task.update(change["fields"])
+        else:
+            raise ValueError(f"Unknown state change operation: {op}")
+    return task_index
+
+
+def atomic_write(path: Path, data: bytes, fsync: bool = True) -> None:
+    """
+    Writes a file atomically by writing a temporary file and renaming it over the target.
+    The file keeps the target's permissions, or gets the umask defaults if it is new.
+
+    Args:
+        path (Path): The target path.
+        data (bytes): The file contents.
+        fsync (bool): Whether to fsync the file and its directory.
+    """
+    directory = path.parent if str(path.parent) else Path(".")
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=directory)
+    try:
+        try:
+            mode = os.stat(path).st_mode & 0o7777
+        except FileNotFoundError:
+            mode = 0o666 & ~_UMASK
+        with os.fdopen(fd, "wb") as f:
+            # mkstemp creates the file with mode 0600
+            os.fchmod(f.fileno(), mode)
+            f.write(data)
+            f.flush()
+            if fsync:
+                os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+    if fsync and hasattr(os, "O_DIRECTORY"):
+        dir_fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+
+class StateSerializer:
+    """
+    Encodes and decodes full state snapshots.
+    """
+
+    name = ""
+
+    def dumps(self, state: Dict[str, Any]) -> bytes:
+        raise NotImplementedError
+
+    def loads(self, data: bytes) -> Dict[str, Any]:
+        raise NotImplementedError
+
+
+class JsonSerializer(StateSerializer):
+    """
+    Pretty-printed JSON, the historical session_state.json format.
+    """
+
+    name = "json"
+
+    def dumps(self, state: Dict[str, Any]) -> bytes:
+        return json.dumps(state, indent=2).encode("utf-8")
+
+    def loads(self, data: bytes) -> Dict[str, Any]:
+        return json.loads(data)
+
+
+class CompactJsonSerializer(JsonSerializer):
+    """
+    JSON without whitespace, encoded by the C accelerator in one pass.
+    """
+
+    name = "compact_json"
+
+    def dumps(self, state: Dict[str, Any]) -> bytes:
+        return json.dumps(state, separators=(',', ':')).encode("utf-8")
+
+
+class MsgpackSerializer(StateSerializer):
+    """
+    Binary MessagePack encoding. Requires the optional ``msgpack`` package.
+    """
+
+    name = "msgpack"
+
+    def __init__(self):
+        if msgpack is None:
+            raise ImportError("The 'msgpack' state format requires the msgpack package (pip install msgpack)")
+
+    def dumps(self, state: Dict[str, Any]) -> bytes:
+        return msgpack.packb(state, use_bin_type=True)
+
+    def loads(self, data: bytes) -> Dict[str, Any]:
+        return msgpack.unpackb(data, raw=False)
+
+
+SERIALIZERS = {
+    serializer.name: serializer
+    for serializer in (JsonSerializer, CompactJsonSerializer, MsgpackSerializer)
+}
+
+
+def get_serializer(name: str) -> StateSerializer:
+    """
+    Creates a serializer by name.
+
+    Args:
+        name (str): The serializer name (see ``SERIALIZERS``).
+
+    Returns:
+        StateSerializer: The serializer.
+    """
+    try:
+        return SERIALIZERS[name]()
+    except KeyError:
+        raise ValueError(f"Unknown state format '{name}'. Available: {', '.join(sorted(SERIALIZERS))}")
+
+
+def detect_serializer(data: bytes) -> StateSerializer:
+    """
+    Picks the serializer for an existing snapshot. JSON documents start
+    with '{' after optional whitespace; anything else is read as msgpack.
+
+    Args:
+        data (bytes): The snapshot contents.
+
+    Returns:
+        StateSerializer: A serializer able to decode the data.
+
+    Raises:
+        ImportError: If the data is msgpack and the msgpack package is not installed.
+    """
+    if data.lstrip()[:1] == b"{":
+        return JsonSerializer()
+    return MsgpackSerializer()
+
+
+def read_state_file(path: Path, logger: logging.Logger) -> Dict[str, Any]:
+    """
+    Reads a snapshot written in any supported format. A file that cannot be
+    decoded is renamed to ``<name>.corrupt-<timestamp>`` instead of being
+    overwritten by the next save, and an empty state is returned.
+
+    Args:
+        path (Path): The snapshot path.
+        logger (logging.Logger): Logger for errors.
+
+    Returns:
+        Dict[str, Any]: The decoded state.
+
+    Raises:
+        ImportError: If the snapshot is msgpack and the msgpack package is not
+            installed. The file is left in place rather than quarantined.
+    """
+    try:
+        data = path.read_bytes()
+    except IOError as e:
+        logger.error("Error loading state: %s", e)
+        return {}
+    serializer = detect_serializer(data)
+    try:
+        state = serializer.loads(data)
+        if not isinstance(state, dict):
+            raise ValueError(f"expected an object, got {type(state).__name__}")
+        return state
+    except Exception as e:
+        # Nanoseconds so two quarantines within the same second do not overwrite each other
+        quarantine = path.with_name(f"{path.name}.corrupt-{time.time_ns()}")
+        logger.error("Error loading state from %s: %s. Moving it to %s and starting with empty state.", path, e, quarantine)
+        try:
+            os.replace(path, quarantine)
+        except OSError as move_error:
+            logger.error("Could not move corrupt state file: %s", move_error)
+        return {}
+
+
+class StateStorage:
+    """
+    Base class for SessionManager storage engines.
+    Persists the session state as full snapshots or as incremental changes.
+    """
+
+    # Whether the engine can answer ``count_tasks_by_status``/``query_tasks`` itself
+    supports_task_queries = False
+
+    def load(self) -> Dict[str, Any]:
+        """
+        Loads the persisted state.
+
+        Returns:
+            Dict[str, Any]: The loaded state.
+        """
+        raise NotImplementedError
+
+    def save(self, state: Dict[str, Any]) -> None:
+        """
+        Persists a full snapshot of the state.
+
+        Args:
+            state (Dict[str, Any]): The state to save.
+        """
+        self.prepare_save(state)()
+
+    def append(self, changes: List[Dict[str, Any]], state: Dict[str, Any]) -> None:
+        """
+        Persists changes that have already been applied to the state.
+
+        Args:
+            changes (List[Dict[str, Any]]): The applied changes.
+            state (Dict[str, Any]): The state after the changes.
+        """
+        self.prepare_append(changes, state)()
+
+    def prepare_save(self, state: Dict[str, Any]) -> Callable[[], None]:
+        """
+        Encodes a full snapshot of the state and returns the write that
+        persists it. The write no longer reads the state, so callers can run
+        it after releasing the lock that guards the state. Writes must run in
+        the order they were prepared.
+
+        Args:
+            state (Dict[str, Any]): The state to save.
+
+        Returns:
+            Callable[[], None]: The write.
+        """
+        raise NotImplementedError
+
+    def prepare_append(self, changes: List[Dict[str, Any]], state: Dict[str, Any]) -> Callable[[], None]:
+        """
+        Encodes changes that have already been applied to the state and
+        returns the write that persists them (see ``prepare_save``).
+        Engines without incremental support fall back to a full snapshot.
+
+        Args:
+            changes (List[Dict[str, Any]]): The applied changes.
+            state (Dict[str, Any]): The state after the changes.
+
+        Returns:
+            Callable[[], None]: The write.
+        """
+        return self.prepare_save(state)
+
+    def count_tasks_by_status(self) -> Dict[str, int]:
+        """
+        Counts the stored tasks per status.
+
+        Returns:
+            Dict[str, int]: Task counts keyed by status.
+        """
+        raise NotImplementedError
+
+    def query_tasks(self, status: Optional[str] = None, exclude_status: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Returns stored tasks in plan order, optionally filtered by status.
+
+        Args:
+            status (Optional[str]): Only return tasks with this status.
+            exclude_status (Optional[str]): Skip tasks with this status.
+
+        Returns:
+            List[Dict[str, Any]]: The matching tasks.
+        """
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """
+        Releases any resources held by the engine.
+        """
+
+
+class JsonFileStorage(StateStorage):
+    """
+    Stores the whole state as a single document, pretty-printed JSON by default.
+
+    Every save writes a temporary file and atomically renames it over the
+    state file, so a crash mid-write leaves the previous state intact. The
+    format of an existing file is detected on load, so switching serializers
+    needs no migration.
+    """
+
+    def __init__(self, state_file: Path, serializer: str = "json", fsync: bool = True):
+        """
+        Initializes the JsonFileStorage.
+
+        Args:
+            state_file (Path): Path to the state file.
+            serializer (str): The snapshot format ('json', 'compact_json' or 'msgpack').
+            fsync (bool): Whether to fsync the file and directory on every save.
+        """
+        self.state_file = Path(state_file)
+        self.serializer = get_serializer(serializer)
+        self.fsync = fsync
+        self.logger = logging.getLogger(__name__)
+
+    def load(self) -> Dict[str, Any]:
+        if not self.state_file.exists():
+            self.logger.info("State file %s does not exist. Starting with empty state.", self.state_file)
+            return {}
+        state = read_state_file(self.state_file, self.logger)
+        # Left by a snapshot written by the wal backend
+        state.pop(WAL_GENERATION_KEY, None)
+        self.logger.info("State loaded from %s", self.state_file)
+        return state
+
+    def prepare_save(self, state: Dict[str, Any]) -> Callable[[], None]:
+        data = self.serializer.dumps(state)
+
+        def write() -> None:
+            atomic_write(self.state_file, data, fsync=self.fsync)
+            self.logger.info("State saved to %s", self.state_file)
+        return write
+
+
+class WriteAheadLogStorage(StateStorage):
+    """
+    Stores the state as a snapshot plus an append-only JSON log of changes.
+
+    Each change is written as one compact JSON line, so a status update costs
+    O(change) instead of O(state). ``load`` replays the log on top of the
+    snapshot, and the log is compacted into a new snapshot every
+    ``compact_every`` records. Snapshots are replaced atomically and a torn
+    trailing log line is discarded on replay, so a crash mid-write leaves the
+    last complete state intact.
+
+    Every snapshot carries a generation number, and the log starts with a
+    header naming the generation its changes apply to. A crash after a new
+    snapshot is in place but before the log is reset leaves a log of an
+    older generation, which ``load`` discards instead of replaying stale
+    values over the snapshot.
+    """
+
+    def __init__(self, state_file: Path, log_file: Optional[Path] = None,
+                 compact_every: int = 1000, fsync: bool = False, serializer: str = "compact_json"):
+        """
+        Initializes the WriteAheadLogStorage.
+
+        Args:
+            state_file (Path): Path to the snapshot file.
+            log_file (Optional[Path]): Path to the change log. Defaults to ``<state_file>.wal``.
+            compact_every (int): Number of logged changes that triggers a compaction.
+            fsync (bool): Whether to fsync after every append (durability across power loss).
+            serializer (str): The snapshot format ('json', 'compact_json' or 'msgpack').
+        """
+        self.state_file = Path(state_file)
+        self.serializer = get_serializer(serializer)
+        self.log_file = Path(log_file) if log_file else self.state_file.with_name(self.state_file.name + ".wal")
+        self.compact_every = compact_every
+        self.fsync = fsync
+        self.logger = logging.getLogger(__name__)
+        self._log_handle = None
+        self._log_records = 0
+        # Snapshot generation and log length including writes prepared but not run yet
+        self._prepared_generation = 0
+        self._prepared_records = 0
+
+    def load(self) -> Dict[str, Any]:
+        self._close_log()
+        state: Dict[str, Any] = {}
+        if self.state_file.exists():
+            state = read_state_file(self.state_file, self.logger)
+        generation = state.pop(WAL_GENERATION_KEY, 0)
+
+        self._log_records = 0
+        if self.log_file.exists():
+            valid_size = self._replay_log(state, generation)
+            if valid_size < self.log_file.stat().st_size:
+                with open(self.log_file, 'r+b') as f:
+                    f.truncate(valid_size)
+        self._prepared_generation = generation
+        self._prepared_records = self._log_records
+        self.logger.info("State loaded from %s with %s logged changes replayed", self.state_file, self._log_records)
+        return state
+
+    def _replay_log(self, state: Dict[str, Any], generation: int) -> int:
+        """
+        Replays the change log onto the state if it belongs to the snapshot's generation.
+
+        Args:
+            state (Dict[str, Any]): The snapshot state to update in place.
+            generation (int): The snapshot's generation.
+
+        Returns:
+            int: Size in bytes of the valid log prefix; 0 for a log of an older generation.
+        """
+        task_index = None
+        valid_size = 0
+        with open(self.log_file, 'rb') as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    self.logger.warning("Discarding torn record at end of %s", self.log_file)
+                    break
+                try:
+                    change = json.loads(line)
+                except json.JSONDecodeError:
+                    self.logger.error("Corrupt record in %s at offset %s; ignoring the rest of the log", self.log_file, valid_size)
+                    break
+                if valid_size == 0:
+                    # Logs written before generations existed have no header and count as generation 0
+                    log_generation = change.get("generation", 0) if change.get("op") == "generation" else 0
+                    if log_generation < generation:
+                        # Already folded into the snapshot; a crash stopped the log reset
+                        self.logger.warning("Discarding log of generation %s older than snapshot generation %s",
+                                            log_generation, generation)
+                        return 0
+                if change.get("op") != "generation":
+                    task_index = apply_changes(state, [change], task_index)
+                    self._log_records += 1
+                valid_size += len(line)
+        return valid_size
+
+    def prepare_save(self, state: Dict[str, Any]) -> Callable[[], None]:
+        generation = self._prepared_generation + 1
+        data = self.serializer.dumps({**state, WAL_GENERATION_KEY: generation})
+        self._prepared_generation = generation
+        self._prepared_records = 0
+
+        def write() -> None:
+            self._close_log()
+            atomic_write(self.state_file, data)
+            # Only reset the log once the snapshot that covers it is in place
+            with open(self.log_file, 'wb') as f:
+                f.write(self._generation_header(generation))
+            self._log_records = 0
+            self.logger.info("State snapshot saved to %s", self.state_file)
+        return write
+
+    def prepare_append(self, changes: List[Dict[str, Any]], state: Dict[str, Any]) -> Callable[[], None]:
+        if not changes:
+            return lambda: None
+        if self._prepared_records + len(changes) > self.compact_every:
+            return self.prepare_save(state)
+        self._prepared_records += len(changes)
+        generation = self._prepared_generation
+        payload = b"".join(json.dumps(change, separators=(',', ':')).encode("utf-8") + b"\n" for change in changes)
+
+        def write() -> None:
+            if self._log_handle is None:
+                self._log_handle = open(self.log_file, 'ab')
+                if self._log_handle.tell() == 0:
+                    self._log_handle.write(self._generation_header(generation))
+            self._log_handle.write(payload)
+            self._log_handle.flush()
+            if self.fsync:
+                os.fsync(self._log_handle.fileno())
+            self._log_records += len(changes)
+        return write
+
+    def close(self) -> None:
+        self._close_log()
+
+    @staticmethod
+    def _generation_header(generation: int) -> bytes:
+        """The first log line, naming the snapshot generation the logged changes apply to"""
+        return json.dumps({"op": "generation", "generation": generation}, separators=(',', ':')).encode("utf-8") + b"\n"
+
+    def _close_log(self) -> None:
+        if self._log_handle is not None:
+            self._log_handle.close()
+            self._log_handle = None
+
+
+class SqliteStorage(StateStorage):
+    """
+    Stores the state in a SQLite database with one row per task.
+
+    Tasks live in a ``tasks`` table indexed by id, status and phase, so a
+    status change is a single-row UPDATE and status counts are answered by
+    the index. All other top-level keys are stored as JSON values in a
+    ``state`` table. On first use an existing JSON state file is imported.
+    """
+
+    supports_task_queries = True
+
+    def __init__(self, state_file: Path, db_file: Optional[Path] = None):
+        """
+        Initializes the SqliteStorage.
+
+        Args:
+            state_file (Path): Path to the legacy JSON state file to import on first use.
+            db_file (Optional[Path]): Path to the database. Defaults to ``state_file`` with a ``.db`` suffix.
+        """
+        self.state_file = Path(state_file)
+        self.db_file = Path(db_file) if db_file else self.state_file.with_suffix(".db")
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_file), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS state (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS tasks (
+                id TEXT PRIMARY KEY,
+                position INTEGER NOT NULL,
+                status TEXT,
+                phase TEXT,
+                data TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_tasks_position ON tasks(position);
+            CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks(status, position);
+            CREATE INDEX IF NOT EXISTS idx_tasks_phase ON tasks(phase, position);
+        """)
+
+    def load(self) -> Dict[str, Any]:
+        with self._lock:
+            is_empty = (self._conn.execute("SELECT COUNT(*) FROM state").fetchone()[0] == 0
+                        and self._conn.execute("SELECT COUNT(*) FROM tasks").fetchone()[0] == 0)
+        if is_empty and self.state_file.exists():
+            self.logger.info("Importing legacy state from %s into %s", self.state_file, self.db_file)
+            migrate_state(JsonFileStorage(self.state_file), self)
+
+        with self._lock:
+            state = {key: json.loads(value) for key, value in self._conn.execute("SELECT key, value FROM state")}
+            rows = self._conn.execute("SELECT data FROM tasks ORDER BY position").fetchall()
+        if rows or "project_tasks" in state:
+            state["project_tasks"] = [json.loads(data) for (data,) in rows]
+        self.logger.info("State loaded from %s", self.db_file)
+        return state
+
+    def prepare_save(self, state: Dict[str, Any]) -> Callable[[], None]:
+        values = [(key, json.dumps(value)) for key, value in state.items() if key != "project_tasks"]
+        task_rows = self._task_rows(state["project_tasks"]) if "project_tasks" in state else None
+
+        def write() -> None:
+            with self._lock, self._conn:
+                self._conn.execute("DELETE FROM state")
+                self._conn.executemany("INSERT INTO state (key, value) VALUES (?, ?)", values)
+                if task_rows is not None:
+                    self._replace_tasks(task_rows)
+                else:
+                    self._conn.execute("DELETE FROM tasks")
+            self.logger.info("State saved to %s", self.db_file)
+        return write
+
+    def prepare_append(self, changes: List[Dict[str, Any]], state: Dict[str, Any]) -> Callable[[], None]:
+        # Each change becomes either a full task row replacement or one statement
+        operations: List[Tuple[str, Any]] = []
+        for change in changes:
+            op = change.get("op")
+            if op == "set" and change["key"] == "project_tasks":
+                operations.append(("replace_tasks", self._task_rows(change["value"])))
+            elif op == "set":
+                operations.append(("execute", ("INSERT OR REPLACE INTO state (key, value) VALUES (?, ?)",
+                                               (change["key"], json.dumps(change["value"])))))
+            elif op == "task":
+                operations.append(("execute", self._task_update(change["id"], change["fields"])))
+            else:
+                raise ValueError(f"Unknown state change operation: {op}")
+
+        def write() -> None:
+            with self._lock, self._conn:
+                for kind, operation in operations:
+                    if kind == "replace_tasks":
+                        self._replace_tasks(operation)
+                    else:
+                        self._conn.execute(*operation)
+        return write
+
+    @staticmethod
+    def _task_rows(tasks: List[Dict[str, Any]]) -> List[Tuple[Any, ...]]:
+        """
+        Encodes tasks as rows of the tasks table.
+
+        Args:
+            tasks (List[Dict[str, Any]]): The tasks in plan order.
+
+        Returns:
+            List[Tuple[Any, ...]]: (id, position, status, phase, data) rows.
+        """
+        return [(task["id"], position, task.get("status"), task.get("phase"), json.dumps(task))
+                for position, task in enumerate(tasks)]
+
+    def _replace_tasks(self, task_rows: List[Tuple[Any, ...]]) -> None:
+        """
+        Replaces all task rows. Must be called inside a transaction.
+
+        Args:
+            task_rows (List[Tuple[Any, ...]]): Rows built by ``_task_rows``.
+        """
+        self._conn.execute("DELETE FROM tasks")
+        self._conn.execute("INSERT OR REPLACE INTO state (key, value) VALUES ('project_tasks', 'null')")
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO tasks (id, position, status, phase, data) VALUES (?, ?, ?, ?, ?)",
+            task_rows
+        )
+
+    @staticmethod
+    def _task_update(task_id: str, fields: Dict[str, Any]) -> Tuple[str, List[Any]]:
+        """
+        Builds the UPDATE that sets the given fields of one task row in place.
+
+        Args:
+            task_id (str): The task ID.
+            fields (Dict[str, Any]): The fields to set.
+
+        Returns:
+            Tuple[str, List[Any]]: The statement and its parameters.
+        """
+        assignments = []
+        params: List[Any] = []
+        for column in ("status", "phase"):
+            if column in fields:
+                assignments.append(f"{column} = ?")
+                params.append(fields[column])
+        paths = []
+        for key, value in fields.items():
+            paths.append("?, json(?)")
+            params.extend([f'$."{key}"', json.dumps(value)])
+        assignments.append(f"data = json_set(data, {', '.join(paths)})")
+        params.append(task_id)
+        return f"UPDATE tasks SET {', '.join(assignments)} WHERE id = ?", params
+
+    def count_tasks_by_status(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM tasks GROUP BY status").fetchall()
+        return {status: count for status, count in rows}
+
+    def query_tasks(self, status: Optional[str] = None, exclude_status: Optional[str] = None) -> List[Dict[str, Any]]:
+        query = "SELECT data FROM tasks"
+        params: List[Any] = []
+        if status is not None:
+            query += " WHERE status = ?"
+            params.append(status)
+        elif exclude_status is not None:
+            query += " WHERE status IS NOT ?"
+            params.append(exclude_status)
+        query += " ORDER BY position"
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        return [json.loads(data) for (data,) in rows]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def migrate_state(source: StateStorage, target: StateStorage) -> Dict[str, Any]:
+    """
+    Copies the full state from one storage engine to another.
+
+    Args:
+        source (StateStorage): The engine to read from.
+        target (StateStorage): The engine to write to.
+
+    Returns:
+        Dict[str, Any]: The migrated state.
+    """
+    state = source.load()
+    target.save(state)
+    return state
+
+
+STORAGE_BACKENDS = {
+    "json": JsonFileStorage,
+    "wal": WriteAheadLogStorage,
+    "sqlite": SqliteStorage,
+}
+
+
+def create_storage(backend: str, state_file: Path, **options) -> StateStorage:
+    """
+    Creates a storage engine by name.
+
+    Args:
+        backend (str): The backend name (see ``STORAGE_BACKENDS``).
+        state_file (Path): Path to the state file.
+        **options: Backend-specific options.
+
+    Returns:
+        StateStorage: The storage engine.
+    """
+    try:
+        storage_class = STORAGE_BACKENDS[backend]
+    except KeyError:
+        raise ValueError(f"Unknown storage backend '{backend}'. Available: {', '.join(sorted(STORAGE_BACKENDS))}")
+    return storage_class(Path(state_file), **options)
@@ -1,27 +1,71 @@
 # src/supermanus/task_enforcer.py
+import bisect
+import heapq
 import json
 import logging
+from collections import OrderedDict, deque
 from pathlib import Path
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+from .event_bus import EventBus
 from .session_manager import SessionManager
+from .state_storage import set_change, task_change
 
 
 class TaskEnforcer:
     """
     Enforces task execution rules and manages project progress.
+
+    Tasks may declare ``depends_on`` (a list of task IDs). A task is ready once
+    every dependency is completed; ready tasks are handed out in plan order.
+
+    With an ``event_bus``, every plan load, task change and current-task change
+    is published as a ``plan_loaded``, ``task_updated`` or ``current_task`` event.
     """
 
-    def __init__(self, session_manager: SessionManager):
+    # Statuses that keep a ready task from being dispatched again
+    NON_DISPATCHABLE_STATUSES = ("completed", "in_progress", "failed")
+    # Status counted for tasks that do not declare one
+    DEFAULT_STATUS = "pending"
+
+    def __init__(self, session_manager: SessionManager, event_bus: Optional[EventBus] = None):
         """
         Initializes the TaskEnforcer.
 
         Args:
             session_manager (SessionManager): The session manager instance.
+            event_bus (Optional[EventBus]): Bus that receives task change events.
         """
         self.session_manager = session_manager
+        self.event_bus = event_bus
         self.project_tasks: List[Dict[str, Any]] = []
         self.current_task: Optional[Dict[str, Any]] = None
         self.logger = logging.getLogger(__name__)
+        # id -> task and id -> plan position lookups
+        self._task_index: Dict[str, Dict[str, Any]] = {}
+        self._task_positions: Dict[str, int] = {}
+        # Dependency graph: id -> dependent ids, and id -> number of dependencies not yet completed
+        self._dependents: Dict[str, List[str]] = {}
+        self._unmet_dependencies: Dict[str, int] = {}
+        # Min-heap of plan positions of ready tasks (not completed, all dependencies completed).
+        # Entries that stop being ready are pruned lazily when they reach the top.
+        self._pending_heap: List[int] = []
+        # Sorted plan positions of dispatchable tasks (ready and not in progress or failed), kept exact on every update
+        self._ready_positions: List[int] = []
+        # Sorted plan positions grouped by status and by phase, maintained on every task update
+        self._status_positions: Dict[str, List[int]] = {}
+        self._phase_positions: Dict[Any, List[int]] = {}
+        # Task IDs in lexicographic order and their plan positions, for ID prefix queries
+        self._sorted_ids: List[str] = []
+        self._sorted_id_positions: List[int] = []
+        # Incremented on every change to the plan, a task or the current task
+        self.version = 0
+        # Task id -> version of its last change, oldest change first
+        self._task_versions: "OrderedDict[str, int]" = OrderedDict()
+        # Version at which the current plan was loaded; older deltas need a full resync
+        self._plan_version = 0
+        # get_status result, reused until the version or overall status changes
+        self._status_snapshot: Dict[str, Any] = {}
+        self._status_snapshot_key: Optional[Tuple[int, Any]] = None
 
     def load_project_plan(self, plan: Dict[str, Any]) -> None:
         """
@@ -29,48 +73,227 @@ class TaskEnforcer:
 
         Args:
             plan (Dict[str, Any]): The project plan.
+
+        Raises:
+            ValueError: If a task depends on an unknown task or the dependencies contain a cycle.
         """
-        self.project_tasks = plan.get("tasks", [])
+        self._rebuild_index(plan.get("tasks", []))
         state = self.session_manager.load_state()
         state["project_tasks"] = self.project_tasks
         self.session_manager.save_state(state)
+        self._publish("plan_loaded", total_tasks=len(self.project_tasks))
         self.logger.info("Project plan loaded.")
 
+    def load_state(self) -> None:
+        """
+        Restores the plan and current task from the persisted session state,
+        so commands run in a new process see the plan loaded by an earlier one.
+
+        Raises:
+            ValueError: If the persisted plan has unknown dependencies or a cycle.
+        """
+        state = self.session_manager.load_state()
+        self._rebuild_index(state.get("project_tasks", []))
+        current_task = state.get("current_task")
+        self.current_task = self._task_index.get(current_task["id"]) if isinstance(current_task, dict) else None
+
     def get_status(self) -> Dict[str, Any]:
         """
-        Gets the current status of the project.
+        Gets the current status of the project. The task lists are rebuilt
+        only when something changed since the previous call.
 
         Returns:
             Dict[str, Any]: The status.
         """
-        state = self.session_manager.get_state()
+        overall_status = self.session_manager.get_state().get("overall_status", "not_started")
+        snapshot_key = (self.version, overall_status)
+        if self._status_snapshot_key != snapshot_key:
+            completed_tasks: List[Dict[str, Any]] = []
+            pending_tasks: List[Dict[str, Any]] = []
+            for task in self.project_tasks:
+                (completed_tasks if task.get("status") == "completed" else pending_tasks).append(task)
+            self._status_snapshot = {
+                "version": self.version,
+                "current_task": self.current_task,
+                "project_tasks": self.project_tasks,
+                "overall_status": overall_status,
+                "task_counts": self._count_by_status(),
+                "completed_tasks": completed_tasks,
+                "pending_tasks": pending_tasks
+            }
+            self._status_snapshot_key = snapshot_key
+        return dict(self._status_snapshot)
+
+    def get_status_counts(self) -> Dict[str, Any]:
+        """
+        Gets task counts without materializing any task list. Costs
+        O(number of distinct statuses).
+
+        Returns:
+            Dict[str, Any]: The version, overall status, total, completed and
+            pending counts, and the count per status.
+        """
+        total = len(self.project_tasks)
+        completed = len(self._status_positions.get("completed", ()))
+        return {
+            "version": self.version,
+            "overall_status": self.session_manager.get_state().get("overall_status", "not_started"),
+            "current_task_id": self.current_task["id"] if self.current_task else None,
+            "total_tasks": total,
+            "completed_count": completed,
+            "pending_count": total - completed,
+            "task_counts": self._count_by_status()
+        }
+
+    def get_tasks_changed_since(self, since: int, fields: Optional[List[str]] = None) -> Optional[List[Dict[str, Any]]]:
+        """
+        Gets the tasks changed after a version. Costs O(number of changed tasks).
+
+        Args:
+            since (int): A version previously returned by this enforcer.
+            fields (Optional[List[str]]): Task fields to return. The ID is always included.
+
+        Returns:
+            Optional[List[Dict[str, Any]]]: The changed tasks in plan order, or
+            None if ``since`` predates the current plan (or is unknown) and the
+            caller must reload the full task list.
+        """
+        if since < self._plan_version or since > self.version:
+            return None
+        positions = []
+        for task_id in reversed(self._task_versions):
+            if self._task_versions[task_id] <= since:
+                break
+            positions.append(self._task_positions[task_id])
+        return [self._project_task(self.project_tasks[position], fields) for position in sorted(positions)]
+
+    def query_tasks(self, status: Optional[str] = None, phase: Optional[str] = None,
+                    id_prefix: Optional[str] = None, cursor: Optional[str] = None,
+                    limit: Optional[int] = None, fields: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Gets one page of tasks in plan order, filtered through the status,
+        phase and ID indexes. The most selective filter drives the scan, so a
+        page costs O(log n + page size) for a status or phase filter. An ID
+        prefix drives the scan only when it matches the fewest tasks, at the
+        cost of putting its k matches in plan order (O(k log k)); otherwise
+        it is checked per scanned task.
+
+        Args:
+            status (Optional[str]): Only tasks with this status.
+            phase (Optional[str]): Only tasks in this phase.
+            id_prefix (Optional[str]): Only tasks whose ID starts with this prefix.
+            cursor (Optional[str]): The ``next_cursor`` of the previous page.
+            limit (Optional[int]): Page size. None returns every match.
+            fields (Optional[List[str]]): Task fields to return. The ID is always included.
+
+        Returns:
+            Dict[str, Any]: The tasks, the cursor of the next page (None on the
+            last page), the total number of tasks and the version.
+
+        Raises:
+            ValueError: If the cursor is malformed or belongs to a previously loaded plan.
+        """
+        if limit is not None and limit < 1:
+            raise ValueError("limit must be at least 1")
+        start = 0
+        if cursor:
+            try:
+                plan_version, position = (int(part) for part in cursor.split(":"))
+            except ValueError:
+                raise ValueError(f"Invalid cursor: {cursor}")
+            if position < 0:
+                raise ValueError(f"Invalid cursor: {cursor}")
+            if plan_version != self._plan_version:
+                raise ValueError("Cursor belongs to a previously loaded plan; restart from the first page")
+            start = position + 1
+
+        candidates: List[Iterable[int]] = []
+        if status is not None:
+            candidates.append(self._status_positions.get(status, []))
+        if phase is not None:
+            candidates.append(self._phase_positions.get(phase, []))
+        if id_prefix:
+            low = bisect.bisect_left(self._sorted_ids, id_prefix)
+            high = bisect.bisect_left(self._sorted_ids, id_prefix + "\U0010ffff", low)
+            if high - low < min((len(positions) for positions in candidates), default=len(self.project_tasks)):
+                candidates.append(sorted(self._sorted_id_positions[low:high]))
+        if candidates:
+            positions = min(candidates, key=len)
+            offset = bisect.bisect_left(positions, start)
+        else:
+            positions = range(len(self.project_tasks))
+            offset = start
+
+        tasks: List[Dict[str, Any]] = []
+        next_cursor = None
+        for index in range(offset, len(positions)):
+            task = self.project_tasks[positions[index]]
+            if ((status is not None and self._status_of(task) != status)
+                    or (phase is not None and task.get("phase") != phase)
+                    or (id_prefix and not str(task["id"]).startswith(id_prefix))):
+                continue
+            if limit is not None and len(tasks) == limit:
+                next_cursor = f"{self._plan_version}:{positions[index - 1]}"
+                break
+            tasks.append(self._project_task(task, fields))
         return {
-            "current_task": self.current_task,
-            "project_tasks": self.project_tasks,
-            "overall_status": state.get("overall_status", "not_started"),
-            "completed_tasks": [t for t in self.project_tasks if t.get("status") == "completed"],
-            "pending_tasks": [t for t in self.project_tasks if t.get("status") != "completed"]
+            "tasks": tasks,
+            "next_cursor": next_cursor,
+            "total_count": len(self.project_tasks),
+            "version": self.version
         }
 
     def assign_next_task(self) -> Optional[Dict[str, Any]]:
         """
-        Assigns the next pending task.
+        Assigns the first ready task in plan order.
 
         Returns:
             Optional[Dict[str, Any]]: The next task.
         """
-        for task in self.project_tasks:
-            if task.get("status") != "completed":
-                self.current_task = task
-                state = self.session_manager.get_state()
-                state["current_task"] = self.current_task
-                self.session_manager.save_state(state)
-                self.logger.info(f"Assigned task: {task['id']}")
-                return task
-        self.current_task = None
+        task = self._peek_pending()
+        if task is not None:
+            self.current_task = task
+            self.version += 1
+            self._publish("current_task", task_id=task["id"])
+            self.session_manager.record_changes([set_change("current_task", self.current_task)])
+            self.logger.info("Assigned task: %s", task['id'], extra={"task_id": task['id']})
+            return task
+        if self.current_task is not None:
+            self.current_task = None
+            self.version += 1
+            self._publish("current_task", task_id=None)
         self.logger.info("No more tasks to assign.")
         return None
 
+    def get_ready_tasks(self) -> List[Dict[str, Any]]:
+        """
+        Gets every task that can be dispatched now: all dependencies are
+        completed and the task is not completed, in progress or failed.
+
+        Returns:
+            List[Dict[str, Any]]: The ready tasks in plan order.
+        """
+        return [self.project_tasks[position] for position in self._ready_positions]
+
+    def assign_ready_tasks(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Marks every ready task (up to ``limit``) as in progress so that they
+        can be dispatched in parallel. The status changes are persisted together.
+
+        Args:
+            limit (Optional[int]): Maximum number of tasks to assign.
+
+        Returns:
+            List[Dict[str, Any]]: The assigned tasks in plan order.
+        """
+        positions = self._ready_positions if limit is None else self._ready_positions[:limit]
+        tasks = [self.project_tasks[position] for position in positions]
+        changes = [self._apply_task_fields(task, {"status": "in_progress"}) for task in tasks]
+        self.session_manager.record_changes(changes)
+        if tasks and self.logger.isEnabledFor(logging.INFO):
+            self.logger.info("Assigned %s ready tasks: %s", len(tasks), ", ".join(task['id'] for task in tasks))
+        return tasks
+
     def mark_task_completed(self, task_id: str) -> None:
         """
         Marks a task as completed.
@@ -78,14 +301,10 @@ class TaskEnforcer:
         Args:
             task_id (str): The task ID.
         """
-        for task in self.project_tasks:
-            if task["id"] == task_id:
-                task["status"] = "completed"
-                self.logger.info(f"Task {task_id} marked as completed.")
-                break
-        state = self.session_manager.get_state()
-        state["project_tasks"] = self.project_tasks
-        self.session_manager.save_state(state)
+        task = self._task_index.get(task_id)
+        if task is not None:
+            self._update_task(task, {"status": "completed"})
+            self.logger.info("Task %s marked as completed.", task_id, extra={"task_id": task_id})
 
     def mark_task_failed(self, task_id: str, error: str) -> None:
         """
@@ -95,16 +314,293 @@ class TaskEnforcer:
             task_id (str): The task ID.
             error (str): The error message.
         """
-        for task in self.project_tasks:
-            if task["id"] == task_id:
-                task["status"] = "failed"
-                task["error"] = error
-                self.logger.error(f"Task {task_id} failed: {error}")
-                break
-        state = self.session_manager.get_state()
-        state["project_tasks"] = self.project_tasks
-        self.session_manager.save_state(state)
+        task = self._task_index.get(task_id)
+        if task is not None:
+            self._update_task(task, {"status": "failed", "error": error})
+            self.logger.error("Task %s failed: %s", task_id, error, extra={"task_id": task_id})
+
+    def get_task(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Looks up a task by ID.
+
+        Args:
+            task_id (str): The task ID.
+
+        Returns:
+            Optional[Dict[str, Any]]: The task, or None if it is not in the plan.
+        """
+        return self._task_index.get(task_id)
+
+    def _rebuild_index(self, tasks: List[Dict[str, Any]]) -> None:
+        """
+        Validates the plan and rebuilds the task lookup index, dependency graph and ready queue.
+
+        Args:
+            tasks (List[Dict[str, Any]]): The plan tasks.
+
+        Raises:
+            ValueError: If a task depends on an unknown task or the dependencies contain a cycle.
+        """
+        task_index: Dict[str, Dict[str, Any]] = {}
+        task_positions: Dict[str, int] = {}
+        for position, task in enumerate(tasks):
+            if task["id"] not in task_index:
+                task_index[task["id"]] = task
+                task_positions[task["id"]] = position
+
+        dependents: Dict[str, List[str]] = {task_id: [] for task_id in task_index}
+        in_degree: Dict[str, int] = {}
+        for task_id, task in task_index.items():
+            dependencies = self._get_dependencies(task)
+            for dependency in dependencies:
+                if dependency not in task_index:
+                    raise ValueError(f"Task {task_id} depends on unknown task {dependency}")
+                dependents[dependency].append(task_id)
+            in_degree[task_id] = len(dependencies)
+        self._check_acyclic(dependents, in_degree)
+
+        self.project_tasks = tasks
+        self._task_index = task_index
+        self._task_positions = task_positions
+        self._dependents = dependents
+        self._unmet_dependencies = {
+            task_id: sum(1 for dependency in self._get_dependencies(task)
+                         if task_index[dependency].get("status") != "completed")
+            for task_id, task in task_index.items()
+        }
+        self._pending_heap = [
+            task_positions[task_id] for task_id, task in task_index.items() if self._is_ready(task)
+        ]
+        heapq.heapify(self._pending_heap)
+        self._ready_positions = sorted(
+            task_positions[task_id] for task_id, task in task_index.items() if self._is_dispatchable(task)
+        )
+        self._status_positions = {}
+        self._phase_positions = {}
+        for position, task in enumerate(tasks):
+            self._status_positions.setdefault(self._status_of(task), []).append(position)
+            self._phase_positions.setdefault(task.get("phase"), []).append(position)
+        self._sorted_ids = sorted(task_index)
+        self._sorted_id_positions = [task_positions[task_id] for task_id in self._sorted_ids]
+        self.version += 1
+        self._plan_version = self.version
+        self._task_versions = OrderedDict()
+
+    @staticmethod
+    def _get_dependencies(task: Dict[str, Any]) -> List[str]:
+        """
+        Gets the IDs a task depends on.
+
+        Args:
+            task (Dict[str, Any]): The task.
 
+        Returns:
+            List[str]: The dependency IDs (duplicates removed).
+        """
+        dependencies = task.get("depends_on") or []
+        if isinstance(dependencies, str):
+            dependencies = [dependencies]
+        return list(dict.fromkeys(dependencies))
+
+    @staticmethod
+    def _check_acyclic(dependents: Dict[str, List[str]], in_degree: Dict[str, int]) -> None:
+        """
+        Checks that the dependency graph has no cycles (Kahn's algorithm).
+
+        Args:
+            dependents (Dict[str, List[str]]): id -> dependent ids.
+            in_degree (Dict[str, int]): id -> number of dependencies.
+
+        Raises:
+            ValueError: If the graph contains a cycle.
+        """
+        remaining = dict(in_degree)
+        queue = deque(task_id for task_id, degree in remaining.items() if degree == 0)
+        visited = 0
+        while queue:
+            task_id = queue.popleft()
+            visited += 1
+            for dependent in dependents[task_id]:
+                remaining[dependent] -= 1
+                if remaining[dependent] == 0:
+                    queue.append(dependent)
+        if visited < len(remaining):
+            cyclic = sorted(task_id for task_id, degree in remaining.items() if degree > 0)
+            raise ValueError(f"Task dependencies contain a cycle involving: {', '.join(cyclic)}")
+
+    @staticmethod
+    def _project_task(task: Dict[str, Any], fields: Optional[List[str]]) -> Dict[str, Any]:
+        """
+        Selects fields of a task.
+
+        Args:
+            task (Dict[str, Any]): The task.
+            fields (Optional[List[str]]): The fields, or None for the whole task.
+
+        Returns:
+            Dict[str, Any]: The task or its projection.
+        """
+        if fields is None:
+            return task
+        projection = {"id": task["id"]}
+        for field in fields:
+            if field in task:
+                projection[field] = task[field]
+        return projection
+
+    def _publish(self, event_type: str, **data: Any) -> None:
+        """
+        Publishes an event tagged with the current version, if anyone is listening.
+
+        Args:
+            event_type (str): The event type.
+            **data: The event payload.
+        """
+        if self.event_bus is not None and self.event_bus.has_subscribers:
+            self.event_bus.publish(event_type, version=self.version, **data)
+
+    def _status_of(self, task: Dict[str, Any]) -> str:
+        """
+        Gets the status a task is counted under.
+
+        Args:
+            task (Dict[str, Any]): The task.
+
+        Returns:
+            str: The task status.
+        """
+        return task.get("status") or self.DEFAULT_STATUS
+
+    def _count_by_status(self) -> Dict[str, int]:
+        """
+        Counts tasks per status from the maintained membership sets.
+
+        Returns:
+            Dict[str, int]: status -> number of tasks.
+        """
+        return {status: len(positions) for status, positions in self._status_positions.items() if positions}
+
+    @staticmethod
+    def _move_position(index: Dict[Any, List[int]], position: int, old_key: Any, new_key: Any) -> None:
+        """
+        Moves a plan position between two sorted lists of an index.
+
+        Args:
+            index (Dict[Any, List[int]]): key -> sorted positions.
+            position (int): The plan position.
+            old_key (Any): The key the position is currently filed under.
+            new_key (Any): The key to file it under.
+        """
+        if old_key == new_key:
+            return
+        positions = index[old_key]
+        del positions[bisect.bisect_left(positions, position)]
+        bisect.insort(index.setdefault(new_key, []), position)
+
+    def _is_ready(self, task: Dict[str, Any]) -> bool:
+        """
+        Checks whether a task is not completed and all its dependencies are.
+
+        Args:
+            task (Dict[str, Any]): The task.
+
+        Returns:
+            bool: True if the task is ready.
+        """
+        return task.get("status") != "completed" and self._unmet_dependencies.get(task["id"], 0) == 0
+
+    def _is_dispatchable(self, task: Dict[str, Any]) -> bool:
+        """
+        Checks whether ``get_ready_tasks`` hands out a task: all its dependencies
+        are completed and it is not completed, in progress or failed.
+
+        Args:
+            task (Dict[str, Any]): The task.
+
+        Returns:
+            bool: True if the task can be dispatched.
+        """
+        return (task.get("status") not in self.NON_DISPATCHABLE_STATUSES
+                and self._unmet_dependencies.get(task["id"], 0) == 0)
+
+    def _sync_ready(self, task: Dict[str, Any], was_dispatchable: bool) -> None:
+        """
+        Adds a task to or removes it from the ready positions after a change.
+
+        Args:
+            task (Dict[str, Any]): The changed task.
+            was_dispatchable (bool): Whether the task was dispatchable before the change.
+        """
+        if self._is_dispatchable(task) == was_dispatchable:
+            return
+        position = self._task_positions[task["id"]]
+        if was_dispatchable:
+            del self._ready_positions[bisect.bisect_left(self._ready_positions, position)]
+        else:
+            bisect.insort(self._ready_positions, position)
+
+    def _peek_pending(self) -> Optional[Dict[str, Any]]:
+        """
+        Returns the first ready task in plan order.
+
+        Returns:
+            Optional[Dict[str, Any]]: The task, or None if no task is ready.
+        """
+        while self._pending_heap:
+            task = self.project_tasks[self._pending_heap[0]]
+            if self._is_ready(task):
+                return task
+            heapq.heappop(self._pending_heap)
+        return None
+
+    def _apply_task_fields(self, task: Dict[str, Any], fields: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Updates a task in memory and keeps the ready queue, dependency
+        counters, ready positions and status membership in sync. Costs
+        O(out-degree) when the completion state changes.
+
+        Args:
+            task (Dict[str, Any]): The task to update.
+            fields (Dict[str, Any]): The fields to set.
+
+        Returns:
+            Dict[str, Any]: The change record to persist.
+        """
+        was_completed = task.get("status") == "completed"
+        was_dispatchable = self._is_dispatchable(task)
+        old_status, old_phase = self._status_of(task), task.get("phase")
+        task.update(fields)
+        is_completed = task.get("status") == "completed"
+        position = self._task_positions[task["id"]]
+        self._move_position(self._status_positions, position, old_status, self._status_of(task))
+        self._move_position(self._phase_positions, position, old_phase, task.get("phase"))
+        self.version += 1
+        self._task_versions[task["id"]] = self.version
+        self._task_versions.move_to_end(task["id"])
+        self._publish("task_updated", task_id=task["id"], status=task.get("status"), fields=dict(fields))
+        if was_completed != is_completed:
+            delta = -1 if is_completed else 1
+            for dependent_id in self._dependents.get(task["id"], []):
+                dependent = self._task_index[dependent_id]
+                dependent_was_dispatchable = self._is_dispatchable(dependent)
+                self._unmet_dependencies[dependent_id] += delta
+                self._sync_ready(dependent, dependent_was_dispatchable)
+                if self._is_ready(dependent):
+                    heapq.heappush(self._pending_heap, self._task_positions[dependent_id])
+            if self._is_ready(task):
+                heapq.heappush(self._pending_heap, self._task_positions[task["id"]])
+        self._sync_ready(task, was_dispatchable)
+        return task_change(task["id"], fields)
+
+    def _update_task(self, task: Dict[str, Any], fields: Dict[str, Any]) -> None:
+        """
+        Updates a task and persists only the changed fields.
+
+        Args:
+            task (Dict[str, Any]): The task to update.
+            fields (Dict[str, Any]): The fields to set.
+        """
+        self.session_manager.record_changes([self._apply_task_fields(task, fields)])
 
 if __name__ == "__main__":
     # Simple test
@@ -119,6 +615,7 @@ if __name__ == "__main__":
     }
     enforcer.load_project_plan(plan)
     print("Status:", enforcer.get_status())
+    print("Counts:", enforcer.get_status_counts())
     task = enforcer.assign_next_task()
     print("Assigned task:", task)
     if task:
@@ -0,0 +1,26 @@
+# tests/conftest.py
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+# Import the package the way main.py and the MCP server do
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+@pytest.fixture(scope="session")
+def server(tmp_path_factory):
+    """The MCP server module, logging and keeping session state in a temporary directory"""
+    pytest.importorskip("fastapi")
+    data_dir = tmp_path_factory.mktemp("mcp_server")
+    os.environ["LOG_FILE"] = str(data_dir / "mcp_server.log")
+    os.environ["SESSION_STATE_DIR"] = str(data_dir)
+    import mcp_server.main as server_module
+    return server_module
+
+
+@pytest.fixture(scope="session")
+def client(server):
+    from fastapi.testclient import TestClient
+    return TestClient(server.app)
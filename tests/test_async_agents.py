@@ -0,0 +1,131 @@
+# tests/test_async_agents.py
+import asyncio
+import copy
+import json
+
+from src.supermanus.async_agents import AsyncGatekeeperAgent, AsyncReportBatcher
+from src.supermanus.gatekeeper_agent import GatekeeperAgent
+
+PLAN = {
+    "tasks": [
+        {"id": "A"},
+        {"id": "B", "depends_on": ["A"]},
+        {"id": "C", "depends_on": ["A"]},
+        {"id": "D", "depends_on": ["B", "C"]},
+    ]
+}
+
+
+def saved_statuses(tmp_path):
+    state = json.loads((tmp_path / "session_state.json").read_text())
+    return {task["id"]: task.get("status") for task in state["project_tasks"]}
+
+
+def test_scheduler_runs_the_plan_in_dependency_order(tmp_path):
+    async def run():
+        gatekeeper = AsyncGatekeeperAgent(tmp_path)
+        await gatekeeper.load_project_plan(copy.deepcopy(PLAN))
+        subscription = gatekeeper.event_bus.subscribe()
+        executed = await gatekeeper.run_scheduler(max_concurrency=2)
+        await gatekeeper.close()
+        return executed, gatekeeper.get_status_counts(), subscription.drain()
+
+    executed, counts, events = asyncio.run(run())
+    assert executed == 4
+    running, peak, order = set(), 0, []
+    for event in events:
+        if event["type"] == "task_updated" and event["status"] == "in_progress":
+            running.add(event["task_id"])
+            peak = max(peak, len(running))
+        elif event["type"] == "task_updated" and event["status"] == "completed":
+            running.discard(event["task_id"])
+            order.append(event["task_id"])
+    assert peak == 2
+    assert order[0] == "A" and order[-1] == "D"
+    assert counts["completed_count"] == 4
+    assert saved_statuses(tmp_path) == {"A": "completed", "B": "completed", "C": "completed", "D": "completed"}
+
+
+def test_dispatch_respects_dependencies_and_limit(tmp_path):
+    async def run():
+        gatekeeper = AsyncGatekeeperAgent(tmp_path)
+        await gatekeeper.load_project_plan(copy.deepcopy(PLAN))
+        first = [task["id"] for task in await gatekeeper.dispatch_ready_tasks()]
+        await gatekeeper.receive_coding_agent_report("A", "completed")
+        limited = [task["id"] for task in await gatekeeper.dispatch_ready_tasks(limit=1)]
+        rest = [task["id"] for task in await gatekeeper.dispatch_ready_tasks()]
+        await gatekeeper.close()
+        return first, limited, rest
+
+    assert asyncio.run(run()) == (["A"], ["B"], ["C"])
+
+
+def test_commit_defers_writes_until_the_flush_interval(tmp_path):
+    async def run():
+        gatekeeper = AsyncGatekeeperAgent(tmp_path, flush_interval=60)
+        await gatekeeper.load_project_plan(copy.deepcopy(PLAN))
+        await gatekeeper.session_manager.aflush()
+        await gatekeeper.receive_coding_agent_report("A", "completed")
+        before_flush = saved_statuses(tmp_path)["A"]
+        await gatekeeper.close()
+        return before_flush
+
+    assert asyncio.run(run()) is None
+    assert saved_statuses(tmp_path)["A"] == "completed"
+
+
+def test_report_batcher_coalesces_reports_into_one_group_commit(tmp_path):
+    async def run():
+        gatekeeper = AsyncGatekeeperAgent(tmp_path)
+        await gatekeeper.load_project_plan({"tasks": [{"id": f"T{i}"} for i in range(5)]})
+        batches = []
+        receive = gatekeeper.receive_coding_agent_reports
+
+        async def recording_receive(reports):
+            batches.append([report["task_id"] for report in reports])
+            return await receive(reports)
+
+        gatekeeper.receive_coding_agent_reports = recording_receive
+        batcher = AsyncReportBatcher(gatekeeper, flush_window=0.05, max_batch_size=3)
+        await asyncio.gather(*(batcher.submit(f"T{i}", "completed") for i in range(5)))
+        await batcher.close()
+        await gatekeeper.close()
+        return batches
+
+    # Three reports fill a batch; the other two wait for the flush window
+    assert asyncio.run(run()) == [["T0", "T1", "T2"], ["T3", "T4"]]
+    assert set(saved_statuses(tmp_path).values()) == {"completed"}
+
+
+def test_report_batcher_fails_every_report_of_a_failed_batch(tmp_path):
+    async def run():
+        gatekeeper = AsyncGatekeeperAgent(tmp_path)
+
+        async def failing_receive(reports):
+            raise OSError("disk full")
+
+        gatekeeper.receive_coding_agent_reports = failing_receive
+        batcher = AsyncReportBatcher(gatekeeper, flush_window=0.01)
+        return await asyncio.gather(batcher.submit("A", "completed"), batcher.submit("B", "failed"),
+                                    return_exceptions=True)
+
+    results = asyncio.run(run())
+    assert [type(result) for result in results] == [OSError, OSError]
+
+
+def test_sync_report_batch_is_written_once(tmp_path):
+    gatekeeper = GatekeeperAgent(tmp_path)
+    gatekeeper.load_project_plan({"tasks": [{"id": "A"}, {"id": "B"}, {"id": "C"}]})
+    flushes = []
+    flush = gatekeeper.session_manager.flush
+    gatekeeper.session_manager.flush = lambda: flushes.append(1) or flush()
+
+    applied = gatekeeper.receive_coding_agent_reports([
+        {"task_id": "A", "status": "completed"},
+        {"task_id": "B", "status": "failed", "error": "boom"},
+        {"task_id": "C", "status": "completed"},
+    ])
+    assert applied == 3
+    assert len(flushes) == 1
+    assert saved_statuses(tmp_path) == {"A": "completed", "B": "failed", "C": "completed"}
+    gatekeeper.close()
@@ -0,0 +1,115 @@
+# tests/test_event_bus.py
+import asyncio
+import threading
+
+from src.supermanus.event_bus import EventBus
+from src.supermanus.session_manager import SessionManager
+from src.supermanus.task_enforcer import TaskEnforcer
+
+
+def test_publish_without_subscribers_is_a_no_op():
+    bus = EventBus()
+    bus.publish("task_updated", task_id="T1")
+    assert not bus.has_subscribers
+    subscription = bus.subscribe()
+    assert subscription.drain() == []
+
+
+def test_events_are_numbered_and_delivered_to_every_subscriber():
+    bus = EventBus()
+    first, second = bus.subscribe(), bus.subscribe()
+    bus.publish("task_updated", task_id="T1", status="completed")
+    bus.publish("current_task", task_id="T2")
+
+    expected = [
+        {"id": 1, "type": "task_updated", "task_id": "T1", "status": "completed"},
+        {"id": 2, "type": "current_task", "task_id": "T2"},
+    ]
+    assert first.drain() == expected
+    assert second.drain() == expected
+    assert first.drain() == []
+
+
+def test_full_buffer_drops_the_oldest_events_and_asks_for_a_resync():
+    bus = EventBus(max_buffer=2)
+    subscription = bus.subscribe()
+    for i in range(5):
+        bus.publish("task_updated", task_id=f"T{i}")
+
+    events = subscription.drain()
+    assert events[0] == {"type": "resync", "dropped": 3}
+    assert [event["task_id"] for event in events[1:]] == ["T3", "T4"]
+    # The resync is reported once
+    bus.publish("task_updated", task_id="T5")
+    assert [event["type"] for event in subscription.drain()] == ["task_updated"]
+
+
+def test_closed_subscription_stops_receiving():
+    bus = EventBus()
+    subscription = bus.subscribe()
+    subscription.close()
+    assert not bus.has_subscribers
+    bus.publish("task_updated", task_id="T1")
+    assert subscription.drain() == []
+
+
+def test_get_waits_for_a_publisher_thread():
+    bus = EventBus()
+    subscription = bus.subscribe()
+    assert subscription.get(timeout=0.01) == []
+
+    publisher = threading.Timer(0.02, bus.publish, args=("task_updated",), kwargs={"task_id": "T1"})
+    publisher.start()
+    events = subscription.get(timeout=5)
+    publisher.join()
+    assert [event["task_id"] for event in events] == ["T1"]
+
+
+def test_aget_is_woken_from_the_loop_and_from_other_threads():
+    async def run():
+        bus = EventBus()
+        subscription = bus.subscribe()
+        timed_out = await subscription.aget(timeout=0.01)
+
+        asyncio.get_running_loop().call_later(0.01, lambda: bus.publish("from_loop"))
+        from_loop = await subscription.aget(timeout=5)
+
+        publisher = threading.Timer(0.01, bus.publish, args=("from_thread",))
+        publisher.start()
+        from_thread = await subscription.aget(timeout=5)
+        publisher.join()
+        return timed_out, from_loop, from_thread
+
+    timed_out, from_loop, from_thread = asyncio.run(run())
+    assert timed_out == []
+    assert [event["type"] for event in from_loop] == ["from_loop"]
+    assert [event["type"] for event in from_thread] == ["from_thread"]
+
+
+def test_aget_requires_an_event_loop_subscription():
+    subscription = EventBus().subscribe()
+
+    async def run():
+        try:
+            await subscription.aget(timeout=0.01)
+        except RuntimeError as e:
+            return str(e)
+
+    assert "not created inside an event loop" in asyncio.run(run())
+
+
+def test_task_enforcer_publishes_versioned_task_changes(tmp_path):
+    bus = EventBus()
+    enforcer = TaskEnforcer(SessionManager(str(tmp_path / "session_state.json")), bus)
+    subscription = bus.subscribe()
+    enforcer.load_project_plan({"tasks": [{"id": "T1", "description": "First"}]})
+    enforcer.mark_task_completed("T1")
+
+    events = subscription.drain()
+    assert events[0]["type"] == "plan_loaded"
+    assert events[0]["total_tasks"] == 1
+    updates = [event for event in events if event["type"] == "task_updated"]
+    assert updates[-1]["task_id"] == "T1"
+    assert updates[-1]["status"] == "completed"
+    assert updates[-1]["version"] == enforcer.version
+    assert [event["id"] for event in events] == sorted(event["id"] for event in events)
@@ -0,0 +1,237 @@
+# tests/test_histogram.py
+import math
+import random
+
+import pytest
+
+from src.supermanus.histogram import (
+    DEFAULT_QUANTILES, Ewma, Histogram, WindowedCounter, WindowedHistogram, WindowedStats, quantile_label
+)
+
+
+def exact_quantile(samples, q):
+    ordered = sorted(samples)
+    return ordered[max(0, math.ceil(q * len(ordered)) - 1)]
+
+
+@pytest.mark.parametrize("relative_error", [0.01, 0.05])
+@pytest.mark.parametrize("distribution", ["exponential", "lognormal", "uniform"])
+def test_quantiles_are_within_the_relative_error(relative_error, distribution):
+    rng = random.Random(42)
+    draw = {
+        "exponential": lambda: rng.expovariate(10),
+        "lognormal": lambda: rng.lognormvariate(0, 2),
+        "uniform": lambda: rng.uniform(0.001, 5),
+    }[distribution]
+    samples = [draw() for _ in range(20000)]
+    histogram = Histogram(relative_error)
+    for sample in samples:
+        histogram.record(sample)
+
+    qs = (0.0, 0.01, 0.25) + DEFAULT_QUANTILES + (1.0,)
+    for q, estimate in zip(qs, histogram.quantiles(qs)):
+        exact = exact_quantile(samples, q)
+        assert abs(estimate - exact) <= relative_error * exact, (q, estimate, exact)
+    assert histogram.quantile(0.5) == histogram.quantiles([0.5])[0]
+
+
+def test_extremes_and_totals_are_exact():
+    histogram = Histogram()
+    for value in (0.5, 2.0, 8.0):
+        histogram.record(value)
+    histogram.record(1.0, count=3)
+    assert histogram.count == 6
+    assert histogram.sum == pytest.approx(13.5)
+    assert histogram.mean == pytest.approx(2.25)
+    assert (histogram.min, histogram.max) == (0.5, 8.0)
+    assert histogram.quantile(0) == pytest.approx(0.5, rel=0.01)
+    assert histogram.quantile(1) == pytest.approx(8.0, rel=0.01)
+
+
+def test_zero_and_negative_values_share_the_zero_bucket():
+    histogram = Histogram()
+    for value in (0.0, -1.0, 1e-12, 3.0):
+        histogram.record(value)
+    assert histogram.zero_count == 3
+    assert histogram.bucket_count == 2
+    assert histogram.quantile(0.5) == 0.0
+    assert histogram.quantile(1.0) == pytest.approx(3.0, rel=0.01)
+
+
+def test_empty_histogram():
+    histogram = Histogram()
+    assert histogram.quantile(0.5) is None
+    assert histogram.quantiles([0.5, 0.9]) == [None, None]
+    assert histogram.mean == 0.0
+    assert histogram.summary() == {"count": 0, "sum": 0.0, "avg": 0.0, "min": None, "max": None,
+                                   "p50": None, "p90": None, "p99": None, "p999": None}
+
+
+def test_memory_is_bounded_by_the_value_range():
+    histogram = Histogram(0.01)
+    rng = random.Random(1)
+    for _ in range(100000):
+        # 1 µs to 1 day
+        histogram.record(10 ** rng.uniform(-6, math.log10(86400)))
+    assert histogram.count == 100000
+    assert histogram.bucket_count <= 1300
+
+
+def test_merge_equals_recording_everything_in_one():
+    rng = random.Random(7)
+    samples = [rng.expovariate(1) for _ in range(5000)]
+    left, right, combined = Histogram(), Histogram(), Histogram()
+    for i, sample in enumerate(samples):
+        (left if i % 2 else right).record(sample)
+        combined.record(sample)
+    right.record(0.0)
+    combined.record(0.0)
+
+    left.merge(right)
+    assert left.count == combined.count
+    assert left.sum == pytest.approx(combined.sum)
+    assert (left.min, left.max, left.zero_count) == (combined.min, combined.max, combined.zero_count)
+    assert left.quantiles(DEFAULT_QUANTILES) == combined.quantiles(DEFAULT_QUANTILES)
+    left.merge(Histogram())
+    assert left.count == combined.count
+
+
+def test_merge_rejects_a_different_relative_error():
+    with pytest.raises(ValueError, match="different relative errors"):
+        Histogram(0.01).merge(Histogram(0.02))
+
+
+def test_copy_is_independent_and_reset_empties():
+    histogram = Histogram()
+    histogram.record(1.0)
+    duplicate = histogram.copy()
+    histogram.record(2.0)
+    assert duplicate.count == 1
+    histogram.reset()
+    assert histogram.count == 0
+    assert histogram.bucket_count == 0
+    assert histogram.quantile(0.5) is None
+
+
+def test_relative_error_must_be_a_fraction():
+    for relative_error in (0, 1, -0.1):
+        with pytest.raises(ValueError, match="relative_error"):
+            Histogram(relative_error)
+
+
+def test_cumulative_counts_match_exact_counts_away_from_the_bounds():
+    rng = random.Random(3)
+    samples = [rng.uniform(0.001, 10) for _ in range(10000)]
+    histogram = Histogram(0.01)
+    for sample in samples:
+        histogram.record(sample)
+    bounds = [0.005, 0.01, 0.1, 0.5, 1.0, 2.5, 5.0, 10.0]
+
+    counts = histogram.cumulative_counts(bounds)
+    assert counts == sorted(counts)
+    assert counts[-1] == len(samples)
+    for bound, count in zip(bounds, counts):
+        # Only samples within the relative error of a bound may land on its other side
+        surely_below = sum(1 for sample in samples if sample <= bound * 0.99)
+        possibly_below = sum(1 for sample in samples if sample <= bound * 1.01)
+        assert surely_below <= count <= possibly_below
+
+
+def test_cumulative_counts_include_the_zero_bucket():
+    histogram = Histogram()
+    histogram.record(0.0, count=4)
+    histogram.record(100.0)
+    assert histogram.cumulative_counts([0.0, 1.0, 100.0]) == [4, 4, 5]
+    assert Histogram().cumulative_counts([1.0]) == [0]
+
+
+def test_summary_and_quantile_labels():
+    assert [quantile_label(q) for q in (0.5, 0.9, 0.99, 0.999, 0.75)] == ["p50", "p90", "p99", "p999", "p75"]
+    histogram = Histogram()
+    for value in range(1, 101):
+        histogram.record(float(value))
+    summary = histogram.summary((0.5, 0.99))
+    assert set(summary) == {"count", "sum", "avg", "min", "max", "p50", "p99"}
+    assert summary["count"] == 100
+    assert summary["avg"] == pytest.approx(50.5)
+    assert summary["p50"] == pytest.approx(50, rel=0.01)
+    assert summary["p99"] == pytest.approx(99, rel=0.01)
+
+
+def test_windowed_histogram_expires_old_intervals():
+    window = WindowedHistogram(60, slots=6)
+    start = 1_000_000.0
+    window.record(1.0, now=start)
+    window.record(2.0, now=start + 30)
+    assert window.snapshot(start + 30).count == 2
+    # The first interval leaves the window once a whole window has passed
+    assert window.snapshot(start + 65).count == 1
+    assert window.snapshot(start + 125).count == 0
+    # Reusing a ring slot resets it first
+    window.record(3.0, now=start + 60)
+    snapshot = window.snapshot(start + 60)
+    assert (snapshot.count, snapshot.min, snapshot.max) == (2, 2.0, 3.0)
+
+
+def test_windowed_histogram_snapshot_matches_the_samples_in_the_window():
+    window = WindowedHistogram(300, slots=30)
+    rng = random.Random(5)
+    start = 2_000_000.0
+    samples = [(start + i, rng.expovariate(5)) for i in range(900)]
+    for now, value in samples:
+        window.record(value, now=now)
+    end = start + 899
+    # The window covers between window - interval and window seconds of history
+    recent = [value for now, value in samples if now > end - 290]
+    snapshot = window.snapshot(end)
+    assert len(recent) <= snapshot.count <= len(recent) + 10
+    assert snapshot.quantile(0.5) == pytest.approx(exact_quantile(recent, 0.5), rel=0.05)
+
+
+def test_windowed_stats_summary():
+    stats = WindowedStats({"10s": 10, "1m": 60})
+    start = 3_000_000.0
+    stats.record(5.0, now=start)
+    stats.record(1.0, now=start + 50)
+    summary = stats.summary(now=start + 55)
+    assert summary["count"] == 2
+    assert summary["max"] == 5.0
+    assert summary["windows"]["10s"]["count"] == 1
+    assert summary["windows"]["10s"]["p50"] == pytest.approx(1.0, rel=0.01)
+    assert summary["windows"]["1m"]["count"] == 2
+    assert set(WindowedStats().windows) == {"1m", "5m", "1h"}
+
+
+def test_windowed_counter_totals_and_rates():
+    counter = WindowedCounter(60, slots=6)
+    start = 4_000_000.0
+    counter.add(now=start)
+    counter.add(4, now=start + 30)
+    assert counter.total(start + 30) == 5
+    assert counter.rate(start + 30) == pytest.approx(5 / 60)
+    assert counter.total(start + 65) == 4
+    assert counter.total(start + 200) == 0
+    # A reused slot starts from zero
+    counter.add(2, now=start + 60)
+    assert counter.total(start + 60) == 6
+
+
+def test_ewma():
+    average = Ewma(alpha=0.5)
+    assert average.value is None
+    assert average.update(10) == 10
+    assert average.update(20) == 15
+    assert average.update(20) == 17.5
+    assert Ewma(alpha=1).update(3) == 3
+    for alpha in (0, 1.5):
+        with pytest.raises(ValueError, match="alpha"):
+            Ewma(alpha)
+
+
+def test_ewma_converges_to_a_new_level():
+    average = Ewma(alpha=0.1)
+    for _ in range(100):
+        average.update(1.0)
+    for _ in range(100):
+        average.update(5.0)
+    assert average.value == pytest.approx(5.0, rel=1e-3)
@@ -0,0 +1,76 @@
+# tests/test_log_context.py
+import logging
+
+import pytest
+
+from src.supermanus.gatekeeper_agent import GatekeeperAgent
+from src.supermanus.coding_agent import CodingAgent
+from src.supermanus.log_index import SegmentedLogIndex
+from src.supermanus.logging_config import log_context, setup_logging, shutdown_logging
+
+PLAN = {
+    "project_name": "demo",
+    "tasks": [
+        {"id": "T1", "description": "First", "phase": "build"},
+        {"id": "T2", "description": "Second", "phase": "build", "depends_on": ["T1"]},
+    ],
+}
+
+
+@pytest.fixture
+def log_file(tmp_path):
+    path = tmp_path / "app.log"
+    root = logging.getLogger()
+    saved_handlers, saved_level = root.handlers[:], root.level
+    setup_logging(log_file=path, level=logging.INFO)
+    yield path
+    shutdown_logging()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+        handler.close()
+    for handler in saved_handlers:
+        root.addHandler(handler)
+    root.setLevel(saved_level)
+
+
+def query_messages(log_file, task_id):
+    index = SegmentedLogIndex(log_file)
+    try:
+        index.update()
+        return [record["message"] for record in index.query(task_id=task_id)]
+    finally:
+        index.close()
+
+
+def test_task_lifecycle_logs_are_queryable_by_task_id(tmp_path, log_file):
+    gatekeeper = GatekeeperAgent(tmp_path)
+    gatekeeper.load_project_plan(PLAN)
+    gatekeeper.run_orchestration_loop()
+    agent = CodingAgent(gatekeeper.receive_coding_agent_report)
+    agent.assign_task(gatekeeper.task_enforcer.get_task("T1"))
+    agent.execute_task()
+    gatekeeper.receive_coding_agent_report("T2", "failed", error="boom")
+    gatekeeper.close()
+    shutdown_logging()
+
+    t1 = query_messages(log_file, "T1")
+    assert "Assigned task: T1" in t1
+    assert "Executing task T1" in t1
+    assert "Task T1 marked as completed." in t1
+    assert "Task T1 completed." in t1
+    assert query_messages(log_file, "T2") == ["Task T2 failed: boom", "Task T2 failed: boom"]
+
+
+def test_log_context_tags_plain_logger_records(log_file):
+    plain = logging.getLogger("tests.plain")
+    with log_context(task_id="T9", attempt=2):
+        plain.info("inside")
+    plain.info("outside")
+    shutdown_logging()
+
+    index = SegmentedLogIndex(log_file)
+    index.update()
+    records = [record for record in index.query(logger="tests.plain")]
+    index.close()
+    assert [(record["message"], record.get("task_id")) for record in records] == [("inside", "T9"), ("outside", None)]
+    assert records[0]["extra"] == {"task_id": "T9", "attempt": 2}
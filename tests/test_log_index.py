@@ -0,0 +1,154 @@
+# tests/test_log_index.py
+import json
+import os
+from datetime import datetime, timezone
+
+import pytest
+
+from src.supermanus.log_index import LogIndex, SegmentedLogIndex, parse_timestamp
+from src.supermanus.log_segments import compress_segment, segment_index_path
+
+BASE = datetime(2026, 1, 1, tzinfo=timezone.utc).timestamp()
+
+
+def record(i, level="INFO", logger="supermanus.app", **fields):
+    timestamp = datetime.fromtimestamp(BASE + i * 60, timezone.utc).isoformat()
+    return {"timestamp": timestamp, "level": level, "logger": logger, "message": f"line {i}", **fields}
+
+
+def append(path, *records, raw=b""):
+    with open(path, 'ab') as f:
+        for entry in records:
+            f.write((json.dumps(entry) + "\n").encode("utf-8"))
+        f.write(raw)
+
+
+def messages(records):
+    return [entry["message"] for entry in records]
+
+
+@pytest.fixture
+def log_file(tmp_path):
+    path = tmp_path / "app.log"
+    append(path, *(record(
+        i,
+        level="ERROR" if i % 10 == 0 else "INFO",
+        logger="supermanus.worker" if i % 3 == 0 else "supermanus.app",
+        **({"task_id": f"T{i % 4}"} if i % 2 else {"extra": {"task_id": f"T{i % 4}"}})
+    ) for i in range(100)))
+    return path
+
+
+def test_parse_timestamp():
+    assert parse_timestamp("2026-01-01T00:00:00+00:00") == BASE
+    assert parse_timestamp("2026-01-01T00:00:00Z") == BASE
+    assert parse_timestamp("2026-01-01T00:00:00") == BASE
+    assert parse_timestamp("yesterday") is None
+    assert parse_timestamp(None) is None
+
+
+@pytest.mark.parametrize("block_bytes", [1, 512, 64 * 1024])
+def test_queries_match_a_full_scan(log_file, block_bytes):
+    index = LogIndex(log_file, block_bytes=block_bytes)
+    assert index.update() == 100
+    every = [json.loads(line) for line in log_file.read_bytes().splitlines()]
+
+    def task_of(entry):
+        return entry.get("task_id") or entry.get("extra", {}).get("task_id")
+
+    assert list(index.query(task_id="T1")) == [entry for entry in every if task_of(entry) == "T1"]
+    assert list(index.query(task_id="T2")) == [entry for entry in every if task_of(entry) == "T2"]
+    assert messages(index.query(level="error")) == [f"line {i}" for i in range(0, 100, 10)]
+    assert list(index.query(logger="supermanus.worker")) == [entry for entry in every if entry["logger"] == "supermanus.worker"]
+    assert len(list(index.query(logger="supermanus"))) == 100
+    assert list(index.query(logger="supermanus.work")) == []
+    assert messages(index.query(since=BASE + 10 * 60, until=BASE + 13 * 60)) == ["line 10", "line 11", "line 12"]
+    assert messages(index.query(task_id="T0", level="ERROR", since=BASE + 30 * 60)) == ["line 40", "line 60", "line 80"]
+    assert list(index.query(task_id="T9")) == []
+    index.close()
+
+
+def test_limit_stops_across_query_pages(log_file, monkeypatch):
+    monkeypatch.setattr(LogIndex, "QUERY_PAGE_BLOCKS", 2)
+    index = LogIndex(log_file, block_bytes=1)
+    index.update()
+    assert messages(index.query(limit=5)) == [f"line {i}" for i in range(5)]
+    assert messages(index.query(task_id="T3", limit=3)) == ["line 3", "line 7", "line 11"]
+    assert len(list(index.query())) == 100
+    assert list(index.query(limit=0)) == []
+    index.close()
+
+
+def test_unknown_level_is_rejected(log_file):
+    index = LogIndex(log_file)
+    with pytest.raises(ValueError, match="Unknown log level"):
+        list(index.query(level="loud"))
+    index.close()
+
+
+def test_update_indexes_only_appended_complete_lines(log_file):
+    index = LogIndex(log_file, block_bytes=4096)
+    index.update()
+    partial = json.dumps(record(100, task_id="NEW")).encode("utf-8")
+    append(log_file, raw=b"not json\n" + partial)
+    assert index.update() == 1
+    assert list(index.query(task_id="NEW")) == []
+
+    append(log_file, raw=b"\n")
+    assert index.update() == 1
+    assert messages(index.query(task_id="NEW")) == ["line 100"]
+    assert index.update() == 0
+    index.close()
+
+
+def test_index_is_rebuilt_when_the_log_is_replaced(log_file):
+    index = LogIndex(log_file)
+    index.update()
+    log_file.unlink()
+    append(log_file, record(0, task_id="FRESH"))
+    assert index.update() == 1
+    assert messages(index.query()) == ["line 0"]
+    assert messages(index.query(task_id="FRESH")) == ["line 0"]
+    index.close()
+
+
+def test_index_survives_reopening(log_file):
+    LogIndex(log_file).update()
+    reopened = LogIndex(log_file)
+    assert reopened.update() == 0
+    assert len(list(reopened.query(task_id="T1"))) == 25
+    reopened.close()
+
+
+def test_sealed_index_stays_valid_after_compression(log_file):
+    segment = log_file.with_name("app.log.20260101-000000")
+    os.replace(log_file, segment)
+    index = LogIndex(segment, sealed=True, block_bytes=512)
+    assert index.update() == 100
+    compressed = compress_segment(segment)
+    assert segment_index_path(compressed) == index.index_file
+    index.log_file = compressed
+    assert index.update() == 0
+    assert messages(index.query(task_id="T0", level="ERROR")) == ["line 0", "line 20", "line 40", "line 60", "line 80"]
+    index.close()
+
+
+def test_segmented_index_queries_segments_oldest_first(tmp_path):
+    log_file = tmp_path / "app.log"
+    oldest = tmp_path / "app.log.20260101-000000"
+    older = tmp_path / "app.log.20260102-000000"
+    append(oldest, record(0, task_id="T1"), record(1, task_id="T2"))
+    append(older, record(2, task_id="T1"))
+    compress_segment(older)
+    append(log_file, record(3, task_id="T1"))
+
+    index = SegmentedLogIndex(log_file)
+    assert index.update() == 4
+    assert messages(index.query(task_id="T1")) == ["line 0", "line 2", "line 3"]
+    assert messages(index.query(task_id="T1", limit=2)) == ["line 0", "line 2"]
+
+    # Retention removed the oldest segment: its index is dropped on the next update
+    oldest.unlink()
+    assert index.update() == 0
+    assert messages(index.query(task_id="T1")) == ["line 2", "line 3"]
+    index.close()
@@ -0,0 +1,146 @@
+# tests/test_log_reader.py
+import asyncio
+import json
+import os
+
+import pytest
+
+from src.supermanus.log_reader import LogFilter, LogReader
+from src.supermanus.log_segments import compress_segment
+
+
+def json_line(message, level="INFO", logger="app", **fields):
+    return (json.dumps({"level": level, "logger": logger, "message": message, **fields}) + "\n").encode("utf-8")
+
+
+@pytest.fixture
+def log_file(tmp_path):
+    path = tmp_path / "app.log"
+    path.write_bytes(b"".join([
+        json_line("starting"),
+        json_line("debug detail", level="DEBUG"),
+        json_line("task done", task_id="T1"),
+        json_line("child", logger="app.worker", extra={"task_id": "T2"}),
+        json_line("broken", level="ERROR", logger="other"),
+        b"not json\n",
+    ]))
+    return path
+
+
+def lines(reader, **kwargs):
+    return b"".join(reader.read(**kwargs)).splitlines(keepends=True)
+
+
+def messages(chunks):
+    return [json.loads(line)["message"] for line in chunks]
+
+
+@pytest.mark.parametrize("chunk_size", [7, 64 * 1024])
+def test_read_range_returns_the_exact_bytes(log_file, chunk_size):
+    reader = LogReader(log_file, chunk_size=chunk_size)
+    content = log_file.read_bytes()
+    assert b"".join(reader.read()) == content
+    assert b"".join(reader.read(10, 50)) == content[10:50]
+    assert b"".join(reader.read(len(content))) == b""
+    assert all(len(chunk) <= chunk_size for chunk in reader.read_range())
+
+
+def test_iter_lines_skips_a_line_cut_by_the_offset(log_file):
+    reader = LogReader(log_file)
+    content = log_file.read_bytes()
+    second_line = content.index(b"\n") + 1
+    assert list(reader.iter_lines(second_line))[0] == json_line("debug detail", level="DEBUG")
+    assert list(reader.iter_lines(second_line + 1))[0] == json_line("task done", task_id="T1")
+    # A line starting before the end is returned whole
+    assert list(reader.iter_lines(0, 1)) == [json_line("starting")]
+
+
+@pytest.mark.parametrize("chunk_size", [5, 64 * 1024])
+def test_tail_returns_the_last_lines_in_order(log_file, chunk_size):
+    reader = LogReader(log_file, chunk_size=chunk_size)
+    assert reader.tail(2) == log_file.read_bytes().splitlines(keepends=True)[-2:]
+    assert reader.tail(0) == []
+    assert len(reader.tail(100)) == 6
+
+
+def test_tail_handles_a_missing_final_newline_and_long_lines(tmp_path):
+    path = tmp_path / "app.log"
+    long_line = b"x" * 1000
+    path.write_bytes(b"first\n" + long_line + b"\nlast")
+    reader = LogReader(path, chunk_size=16)
+    assert reader.tail(3) == [b"first\n", long_line + b"\n", b"last\n"]
+
+
+def test_filters(log_file):
+    reader = LogReader(log_file, chunk_size=16)
+    assert messages(lines(reader, log_filter=LogFilter(level="warning"))) == ["broken"]
+    assert messages(lines(reader, log_filter=LogFilter(logger="app"))) == ["starting", "debug detail", "task done", "child"]
+    assert messages(lines(reader, log_filter=LogFilter(task_id="T2"))) == ["child"]
+    assert messages(reader.tail(1, LogFilter(logger="app", level="INFO"))) == ["child"]
+    # Without an active filter every line is returned, JSON or not
+    assert lines(reader, log_filter=LogFilter()) == log_file.read_bytes().splitlines(keepends=True)
+
+
+def test_filter_rejects_unknown_levels():
+    with pytest.raises(ValueError, match="Unknown log level"):
+        LogFilter(level="loud")
+
+
+def write_segment(log_file, name, content, compress):
+    segment = log_file.with_name(f"{log_file.name}.{name}")
+    segment.write_bytes(content)
+    return compress_segment(segment) if compress else segment
+
+
+def test_rotated_segments_are_read_oldest_first(log_file):
+    write_segment(log_file, "20260101-000000", json_line("oldest"), compress=True)
+    write_segment(log_file, "20260102-000000", json_line("older", level="ERROR"), compress=False)
+    reader = LogReader(log_file)
+
+    streamed = lines(reader, include_rotated=True)
+    assert messages(streamed[:3]) == ["oldest", "older", "starting"]
+    assert lines(reader, include_rotated=True, log_filter=LogFilter(level="ERROR")) == [
+        json_line("older", level="ERROR"), json_line("broken", level="ERROR", logger="other")]
+    # The tail continues into the segments when the active file has too few matches
+    assert messages(reader.tail(3, LogFilter(level="ERROR"), include_rotated=True)) == ["older", "broken"]
+    assert messages(reader.tail(7, include_rotated=True)[:2]) == ["older", "starting"]
+
+
+def test_read_complete_lines_keeps_partial_lines_for_later(tmp_path):
+    path = tmp_path / "app.log"
+    path.write_bytes(b"one\ntw")
+    reader = LogReader(path, chunk_size=1)
+    with open(path, 'rb') as f:
+        assert reader._read_complete_lines(f, 0, 6, None) == (b"one\n", 4)
+        assert reader._read_complete_lines(f, 4, 6, None) == (b"", 4)
+    # A line longer than one read is read through to its newline
+    path.write_bytes(b"y" * 100 + b"\n")
+    with open(path, 'rb') as f:
+        assert reader._read_complete_lines(f, 0, 101, None) == (b"y" * 100 + b"\n", 101)
+
+
+def test_follow_streams_appended_lines_and_survives_rotation(tmp_path):
+    path = tmp_path / "app.log"
+    path.write_bytes(b"old\n")
+    reader = LogReader(path)
+
+    async def run():
+        received = []
+        stream = reader.follow(reader.size(), poll_interval=0.01)
+
+        async def collect(count):
+            while len(received) < count:
+                received.extend((await stream.__anext__()).splitlines())
+
+        with open(path, 'ab') as f:
+            f.write(b"new 1\n")
+        await asyncio.wait_for(collect(1), 5)
+        with open(path, 'ab') as f:
+            f.write(b"new 2\n")
+        os.replace(path, path.with_name("app.log.20260101-000000"))
+        path.write_bytes(b"after rotation\n")
+        await asyncio.wait_for(collect(3), 5)
+        await stream.aclose()
+        return received
+
+    assert asyncio.run(run()) == [b"new 1", b"new 2", b"after rotation"]
@@ -0,0 +1,117 @@
+# tests/test_log_segments.py
+import gzip
+import time
+
+import pytest
+
+from src.supermanus import log_segments
+from src.supermanus.log_segments import (
+    apply_retention, compress_segment, list_segments, new_segment_path, open_rotated_segment,
+    segment_index_path, segment_time, strip_compression_suffix
+)
+
+
+def make_segment(log_file, stamp, content=b"line\n", counter=None):
+    name = f"{log_file.name}.{stamp}" + (f"-{counter}" if counter else "")
+    segment = log_file.with_name(name)
+    segment.write_bytes(content)
+    return segment
+
+
+def test_new_segment_path_adds_a_counter_when_the_name_is_taken(tmp_path, monkeypatch):
+    monkeypatch.setattr(log_segments.time, "strftime", lambda fmt: "20260101-000000")
+    log_file = tmp_path / "app.log"
+    first = new_segment_path(log_file)
+    assert first.name == "app.log.20260101-000000"
+    # A compressed segment takes the name too
+    first.with_name(first.name + ".gz").write_bytes(b"")
+    second = new_segment_path(log_file)
+    assert second.name == "app.log.20260101-000000-1"
+    second.write_bytes(b"")
+    assert new_segment_path(log_file).name == "app.log.20260101-000000-2"
+
+
+def test_list_segments_orders_by_rotation_time_and_counter(tmp_path):
+    log_file = tmp_path / "app.log"
+    log_file.write_bytes(b"active\n")
+    later = make_segment(log_file, "20260102-000000")
+    counted = make_segment(log_file, "20260101-000000", counter=2)
+    first = compress_segment(make_segment(log_file, "20260101-000000"))
+    (tmp_path / "app.log.idx").write_bytes(b"")
+    (tmp_path / "other.log.20260101-000000").write_bytes(b"")
+    assert list_segments(log_file) == [first, counted, later]
+    assert list_segments(tmp_path / "missing" / "app.log") == []
+
+
+def test_segment_names_map_to_one_index_and_rotation_time(tmp_path):
+    segment = tmp_path / "app.log.20260101-120000"
+    compressed = tmp_path / "app.log.20260101-120000.gz"
+    assert strip_compression_suffix(compressed) == segment
+    assert segment_index_path(compressed) == segment_index_path(segment) == tmp_path / "app.log.20260101-120000.idx"
+    assert segment_time(compressed) == time.mktime(time.strptime("20260101-120000", "%Y%m%d-%H%M%S"))
+    assert segment_time(tmp_path / "app.log") is None
+
+
+def test_compress_segment_replaces_the_plain_file(tmp_path):
+    segment = make_segment(tmp_path / "app.log", "20260101-000000", b"one\ntwo\n")
+    compressed = compress_segment(segment)
+    assert compressed.name == "app.log.20260101-000000.gz"
+    assert not segment.exists()
+    assert not compressed.with_name(compressed.name + ".tmp").exists()
+    assert gzip.decompress(compressed.read_bytes()) == b"one\ntwo\n"
+
+
+def test_open_rotated_segment_follows_compression_and_removal(tmp_path, monkeypatch):
+    segment = make_segment(tmp_path / "app.log", "20260101-000000", b"content\n")
+    compressed = compress_segment(segment)
+    # Listed before it was compressed
+    with open_rotated_segment(segment) as f:
+        assert f.read() == b"content\n"
+    compressed.unlink()
+    assert open_rotated_segment(segment) is None
+    # Also when zstandard is not installed
+    monkeypatch.setattr(log_segments, "zstandard", None)
+    assert open_rotated_segment(segment) is None
+
+
+def test_zstd_requires_zstandard(tmp_path, monkeypatch):
+    monkeypatch.setattr(log_segments, "zstandard", None)
+    segment = make_segment(tmp_path / "app.log", "20260101-000000")
+    with pytest.raises(ImportError, match="zstandard"):
+        compress_segment(segment, "zstd")
+    zst = tmp_path / "app.log.20260102-000000.zst"
+    zst.write_bytes(b"")
+    with pytest.raises(ImportError, match="zstandard"):
+        log_segments.open_segment(zst)
+
+
+def test_zstd_round_trip(tmp_path):
+    pytest.importorskip("zstandard")
+    segment = make_segment(tmp_path / "app.log", "20260101-000000", b"one\ntwo\n")
+    compressed = compress_segment(segment, "zstd")
+    with open_rotated_segment(compressed) as f:
+        assert f.readline() == b"one\n"
+        assert f.read() == b"two\n"
+
+
+def test_retention_by_count_removes_the_oldest_segments_and_their_indexes(tmp_path):
+    log_file = tmp_path / "app.log"
+    segments = [make_segment(log_file, f"2026010{day}-000000") for day in range(1, 5)]
+    for segment in segments:
+        segment_index_path(segment).write_bytes(b"")
+    removed = apply_retention(log_file, backup_count=2)
+    assert removed == segments[:2]
+    assert list_segments(log_file) == segments[2:]
+    assert not segment_index_path(segments[0]).exists()
+    assert segment_index_path(segments[2]).exists()
+
+
+def test_retention_by_age_uses_the_rotation_time_in_the_name(tmp_path):
+    log_file = tmp_path / "app.log"
+    old = make_segment(log_file, time.strftime("%Y%m%d-%H%M%S", time.localtime(time.time() - 3 * 86400)))
+    recent = make_segment(log_file, time.strftime("%Y%m%d-%H%M%S", time.localtime(time.time() - 3600)))
+    # Compression resets the mtime but not the name
+    old = compress_segment(old)
+    assert apply_retention(log_file, max_age_days=2) == [old]
+    assert list_segments(log_file) == [recent]
+    assert apply_retention(log_file) == []
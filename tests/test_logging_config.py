@@ -0,0 +1,266 @@
+# tests/test_logging_config.py
+import gzip
+import json
+import logging
+import queue
+import sys
+import threading
+from datetime import datetime, timezone
+
+import pytest
+
+from src.supermanus import logging_config
+from src.supermanus.log_index import parse_timestamp
+from src.supermanus.log_segments import list_segments
+from src.supermanus.logging_config import BoundedQueueHandler, JsonFormatter, RotatingBufferedFileHandler
+
+
+class FullQueue(queue.Queue):
+    """A queue that is always full for put_nowait and records what a blocking put lets through"""
+
+    def __init__(self):
+        super().__init__()
+        self.accepted = []
+        self._accepted_lock = threading.Lock()
+
+    def put_nowait(self, item):
+        raise queue.Full
+
+    def put(self, item, block=True, timeout=None):
+        with self._accepted_lock:
+            self.accepted.append(item)
+
+
+def record(level, msg="message"):
+    return logging.makeLogRecord({"name": "test", "levelno": level, "levelname": logging.getLevelName(level), "msg": msg})
+
+
+def test_unknown_overflow_policy_is_rejected():
+    with pytest.raises(ValueError, match="Unknown overflow policy"):
+        BoundedQueueHandler(queue.Queue(), overflow_policy="drop_all")
+
+
+def test_drop_debug_drops_only_debug_records_by_default():
+    handler = BoundedQueueHandler(FullQueue())
+    for level in (logging.DEBUG, logging.DEBUG, logging.INFO, logging.WARNING):
+        handler.emit(record(level))
+    assert handler.dropped == 2
+    assert [accepted.levelno for accepted in handler.queue.accepted] == [logging.INFO, logging.WARNING]
+
+
+def test_drop_level_widens_what_is_dropped():
+    handler = BoundedQueueHandler(FullQueue(), drop_level=logging.INFO)
+    for level in (logging.DEBUG, logging.INFO, logging.WARNING):
+        handler.emit(record(level))
+    assert handler.dropped == 2
+    assert [accepted.levelno for accepted in handler.queue.accepted] == [logging.WARNING]
+
+
+def test_sample_keeps_one_in_sample_every():
+    handler = BoundedQueueHandler(FullQueue(), overflow_policy="sample", sample_every=3)
+    for i in range(9):
+        handler.emit(record(logging.DEBUG, f"debug {i}"))
+    assert handler.dropped == 6
+    assert [accepted.msg for accepted in handler.queue.accepted] == ["debug 2", "debug 5", "debug 8"]
+
+
+def test_block_waits_for_room():
+    log_queue = queue.Queue(maxsize=1)
+    log_queue.put_nowait(record(logging.INFO, "first"))
+    handler = BoundedQueueHandler(log_queue, overflow_policy="block")
+    drainer = threading.Timer(0.05, log_queue.get)
+    drainer.start()
+    handler.emit(record(logging.DEBUG, "second"))
+    drainer.join()
+    assert handler.dropped == 0
+    assert log_queue.get_nowait().msg == "second"
+
+
+def test_block_timeout_drops_the_record():
+    log_queue = queue.Queue(maxsize=1)
+    log_queue.put_nowait(record(logging.INFO))
+    handler = BoundedQueueHandler(log_queue, block_timeout=0.01)
+    handler.emit(record(logging.ERROR))
+    assert handler.dropped == 1
+
+
+@pytest.mark.parametrize("policy, expected_accepted", [("drop_debug", 0), ("sample", 800)])
+def test_drop_counters_are_exact_under_concurrency(policy, expected_accepted):
+    handler = BoundedQueueHandler(FullQueue(), overflow_policy=policy, sample_every=10)
+    threads, per_thread = 8, 1000
+
+    def log_many():
+        for _ in range(per_thread):
+            handler.emit(record(logging.DEBUG))
+
+    workers = [threading.Thread(target=log_many) for _ in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    total = threads * per_thread
+    assert len(handler.queue.accepted) == expected_accepted
+    assert handler.dropped == handler._unreported_drops == total - expected_accepted
+
+
+def test_drops_are_reported_once_the_queue_has_room():
+    log_queue = queue.Queue(maxsize=1)
+    log_queue.put_nowait(record(logging.INFO, "first"))
+    handler = BoundedQueueHandler(log_queue, report_interval=0)
+    handler.emit(record(logging.DEBUG))
+    handler.emit(record(logging.DEBUG))
+    assert handler.dropped == 2
+
+    log_queue = handler.queue = queue.Queue()
+    handler.emit(record(logging.INFO, "second"))
+    messages = [log_queue.get_nowait().getMessage() for _ in range(log_queue.qsize())]
+    assert messages == ["second", "Log queue overflow: dropped 2 records (2 in total)"]
+    assert handler._unreported_drops == 0
+
+
+def write(handler, *messages):
+    handler.emit_batch([record(logging.INFO, message) for message in messages])
+
+
+def test_size_rotation_keeps_every_file_under_max_bytes(tmp_path):
+    log_file = tmp_path / "app.log"
+    handler = RotatingBufferedFileHandler(str(log_file), max_bytes=40, compression=None)
+    for i in range(10):
+        write(handler, f"message {i:02d} padded")
+    handler.close()
+
+    segments = list_segments(log_file)
+    assert len(segments) >= 4
+    files = segments + [log_file]
+    assert all(path.stat().st_size <= 40 for path in files)
+    content = b"".join(path.read_bytes() for path in files).decode().splitlines()
+    assert content == [f"message {i:02d} padded" for i in range(10)]
+
+
+def test_a_batch_larger_than_max_bytes_is_written_whole(tmp_path):
+    log_file = tmp_path / "app.log"
+    handler = RotatingBufferedFileHandler(str(log_file), max_bytes=10, compression=None)
+    write(handler, "first")
+    write(handler, "a batch that does not fit", "in ten bytes")
+    handler.close()
+    assert [path.read_bytes() for path in list_segments(log_file)] == [b"first\n"]
+    assert log_file.read_bytes() == b"a batch that does not fit\nin ten bytes\n"
+
+
+def test_time_rotation(tmp_path, monkeypatch):
+    log_file = tmp_path / "app.log"
+    handler = RotatingBufferedFileHandler(str(log_file), rotate_interval=60, compression=None)
+    write(handler, "before")
+    monkeypatch.setattr(logging_config.time, "time", lambda: handler._next_rollover + 1)
+    write(handler, "after")
+    handler.close()
+    assert [path.read_bytes() for path in list_segments(log_file)] == [b"before\n"]
+    assert log_file.read_bytes() == b"after\n"
+
+
+def test_rotated_segments_are_compressed_and_pruned_in_the_background(tmp_path):
+    log_file = tmp_path / "app.log"
+    handler = RotatingBufferedFileHandler(str(log_file), max_bytes=20, backup_count=2)
+    for i in range(6):
+        write(handler, f"message {i} padded")
+    # close() waits for the archiver
+    handler.close()
+
+    segments = list_segments(log_file)
+    assert len(segments) == 2
+    assert all(segment.name.endswith(".gz") for segment in segments)
+    assert [gzip.decompress(segment.read_bytes()) for segment in segments] == [b"message 3 padded\n", b"message 4 padded\n"]
+    assert log_file.read_bytes() == b"message 5 padded\n"
+
+
+def test_uncompressed_segments_left_by_a_crash_are_compressed_on_startup(tmp_path):
+    log_file = tmp_path / "app.log"
+    leftover = tmp_path / "app.log.20260101-000000"
+    leftover.write_bytes(b"leftover\n")
+    RotatingBufferedFileHandler(str(log_file)).close()
+    assert list_segments(log_file) == [tmp_path / "app.log.20260101-000000.gz"]
+    assert not leftover.exists()
+
+
+def test_rotation_rejects_unknown_compression(tmp_path, monkeypatch):
+    with pytest.raises(ValueError, match="Unknown log compression"):
+        RotatingBufferedFileHandler(str(tmp_path / "app.log"), compression="bz2")
+    monkeypatch.setattr(logging_config, "zstandard", None)
+    with pytest.raises(ImportError, match="zstandard"):
+        RotatingBufferedFileHandler(str(tmp_path / "app.log"), compression="zstd")
+
+
+def log_record(msg="hello %s", args=("world",), exc_info=None, created=None, **attributes):
+    entry = logging.LogRecord("supermanus.test", logging.WARNING, __file__, 42, msg, args, exc_info, func="handler")
+    if created is not None:
+        entry.created = created
+    entry.__dict__.update(attributes)
+    return entry
+
+
+@pytest.mark.parametrize("fast", [True, False])
+def test_json_formatter_fields(fast):
+    line = json.loads(JsonFormatter(fast=fast).format(log_record(task_id="T1", extra={"attempt": 2})))
+    assert {key: line[key] for key in ("level", "logger", "message", "function", "line", "task_id", "extra")} == {
+        "level": "WARNING", "logger": "supermanus.test", "message": "hello world",
+        "function": "handler", "line": 42, "task_id": "T1", "extra": {"attempt": 2}
+    }
+    assert parse_timestamp(line["timestamp"]) is not None
+    assert "extra" not in json.loads(JsonFormatter(include_extra=False, fast=fast).format(log_record(extra={"a": 1})))
+
+
+def test_fast_and_slow_paths_agree_except_for_the_timestamp():
+    def formatted(fast):
+        line = json.loads(JsonFormatter(fast=fast).format(log_record(task_id="T1", extra={"nested": {"ok": [1, 2]}})))
+        del line["timestamp"]
+        return line
+
+    assert formatted(True) == formatted(False)
+
+
+def test_fast_timestamps_come_from_the_record():
+    formatter = JsonFormatter()
+    created = datetime(2026, 1, 2, 3, 4, 5, 678901, tzinfo=timezone.utc).timestamp()
+    assert json.loads(formatter.format(log_record(created=created)))["timestamp"] == "2026-01-02T03:04:05.678901Z"
+    # The cached second is replaced when the second changes
+    assert json.loads(formatter.format(log_record(created=created + 1)))["timestamp"] == "2026-01-02T03:04:06.678901Z"
+    assert json.loads(formatter.format(log_record(created=created)))["timestamp"] == "2026-01-02T03:04:05.678901Z"
+    # Microseconds that round up carry into the next second
+    almost = datetime(2026, 1, 2, 3, 4, 5, tzinfo=timezone.utc).timestamp() + 0.9999996
+    assert json.loads(formatter.format(log_record(created=almost)))["timestamp"] == "2026-01-02T03:04:06.000000Z"
+
+
+@pytest.mark.parametrize("fast", [True, False])
+def test_exceptions_are_rendered_once(fast):
+    try:
+        raise RuntimeError("boom")
+    except RuntimeError:
+        entry = log_record(exc_info=sys.exc_info())
+    line = json.loads(JsonFormatter(fast=fast).format(entry))
+    assert line["exception"].startswith("Traceback")
+    assert "RuntimeError: boom" in line["exception"]
+
+    # A record prepared for the queue carries only the rendered text
+    prepared = BoundedQueueHandler(queue.Queue()).prepare(entry)
+    assert prepared.exc_info is None
+    assert json.loads(JsonFormatter(fast=fast).format(prepared))["exception"] == prepared.exc_text
+
+
+@pytest.mark.parametrize("fast", [True, False])
+def test_extra_that_json_rejects_is_sanitized(fast):
+    circular = {"name": "loop"}
+    circular["self"] = circular
+    extra = {1: "int key", "object": object(), "huge": 2 ** 70, "tuple": (1, "a"), "circular": circular}
+    line = json.loads(JsonFormatter(fast=fast).format(log_record(extra=extra)))
+    assert line["extra"]["1"] == "int key"
+    assert line["extra"]["object"].startswith("<object object")
+    assert line["extra"]["huge"] == 2 ** 70
+    assert line["extra"]["tuple"] == [1, "a"]
+    assert line["extra"]["circular"] == {"name": "loop", "self": "<circular reference>"}
+
+
+def test_repeated_but_not_circular_values_are_kept():
+    shared = {"k": 1}
+    line = json.loads(JsonFormatter().format(log_record(extra={"a": shared, "b": [shared, shared], 1: None})))
+    assert line["extra"] == {"a": {"k": 1}, "b": [{"k": 1}, {"k": 1}], "1": None}
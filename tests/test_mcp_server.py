@@ -0,0 +1,117 @@
+# tests/test_mcp_server.py
+import json
+import re
+import time
+
+import pytest
+
+PLAN = {
+    "tasks": [
+        {"id": "T1", "description": "First", "phase": "build"},
+        {"id": "T2", "description": "Second", "phase": "build", "depends_on": ["T1"]},
+        {"id": "T3", "description": "Third", "phase": "test", "depends_on": ["T2"]},
+    ]
+}
+
+
+@pytest.fixture
+def project(client, tmp_path):
+    """Loads a fresh copy of PLAN through /project/init"""
+    plan_file = tmp_path / "plan.json"
+    plan_file.write_text(json.dumps(PLAN))
+    response = client.post("/project/init", json={"plan_file": str(plan_file)})
+    assert response.status_code == 200, response.text
+
+
+def report(client, task_id, status="completed"):
+    response = client.post("/task/report/batch", json={"reports": [{"task_id": task_id, "status": status}]})
+    assert response.status_code == 200, response.text
+
+
+@pytest.mark.parametrize("path", ["/project/status", "/tasks"])
+def test_if_none_match_returns_304_until_the_state_changes(client, project, path):
+    first = client.get(path)
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+    assert etag.startswith('W/"')
+
+    cached = client.get(path, headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.headers["etag"] == etag
+    assert client.get(path, headers={"If-None-Match": "*"}).status_code == 304
+
+    report(client, "T1")
+    changed = client.get(path, headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+
+
+def test_tasks_since_returns_only_the_changed_tasks(client, project):
+    listing = client.get("/tasks").json()
+    assert listing["full"] is True
+    assert [task["id"] for task in listing["tasks"]] == ["T1", "T2", "T3"]
+
+    report(client, "T1")
+    delta = client.get("/tasks", params={"since": listing["version"], "fields": "status"}).json()
+    assert delta["full"] is False
+    assert delta["tasks"] == [{"id": "T1", "status": "completed"}]
+    assert delta["total_count"] == 3
+
+    unchanged = client.get("/tasks", params={"since": delta["version"]}).json()
+    assert unchanged["tasks"] == []
+
+
+def test_tasks_since_an_unknown_version_returns_the_full_list(client, project):
+    listing = client.get("/tasks").json()
+    response = client.get("/tasks", params={"since": listing["version"] + 1000}).json()
+    assert response["full"] is True
+    assert len(response["tasks"]) == 3
+
+
+@pytest.mark.parametrize("params", [
+    {"status": "pending"}, {"phase": "build"}, {"id_prefix": "T"}, {"limit": 1}, {"cursor": "abc"},
+])
+def test_tasks_since_cannot_be_combined_with_filters(client, project, params):
+    version = client.get("/tasks").json()["version"]
+    response = client.get("/tasks", params={"since": version, **params})
+    assert response.status_code == 400
+    assert "since cannot be combined" in response.json()["detail"]
+
+
+def test_tasks_filters_and_pagination(client, project):
+    page = client.get("/tasks", params={"phase": "build", "limit": 1}).json()
+    assert [task["id"] for task in page["tasks"]] == ["T1"]
+    page = client.get("/tasks", params={"phase": "build", "limit": 1, "cursor": page["next_cursor"]}).json()
+    assert [task["id"] for task in page["tasks"]] == ["T2"]
+    assert client.get("/tasks", params={"cursor": "not-a-cursor"}).status_code == 400
+
+
+def wait_for_log_bytes(server, minimum):
+    """Waits for the queued log handler to write at least ``minimum`` bytes"""
+    deadline = time.monotonic() + 5
+    while server.log_reader.size() < minimum and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert server.log_reader.size() >= minimum
+
+
+def test_logs_byte_range_returns_206(client, server, project):
+    wait_for_log_bytes(server, 10)
+    response = client.get("/logs", headers={"Range": "bytes=0-9"})
+    assert response.status_code == 206
+    assert len(response.content) == 10
+    assert re.fullmatch(r"bytes 0-9/\d+", response.headers["content-range"])
+    assert response.headers["x-log-end-offset"] == "10"
+
+
+def test_logs_unsatisfiable_range_returns_416(client, server, project):
+    wait_for_log_bytes(server, 1)
+    response = client.get("/logs", headers={"Range": "bytes=1000000000-"})
+    assert response.status_code == 416
+    size = int(re.fullmatch(r"bytes \*/(\d+)", response.headers["content-range"]).group(1))
+    assert size >= 1
+
+
+def test_logs_malformed_range_returns_400(client, server, project):
+    wait_for_log_bytes(server, 1)
+    assert client.get("/logs", headers={"Range": "lines=0-9"}).status_code == 400
+    assert client.get("/logs", headers={"Range": "bytes=0-1,5-9"}).status_code == 400
@@ -0,0 +1,168 @@
+# tests/test_metrics_collector.py
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.supermanus import metrics_collector
+from src.supermanus.metrics_collector import SystemHealthCollector, TaskMetricsCollector, monitor_api_call
+
+
+class FakeClock:
+    """Stands in for the time module inside metrics_collector"""
+
+    def __init__(self, now):
+        self.now = now
+
+    def time(self):
+        return self.now
+
+    def perf_counter(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock(1_000_000.0)
+    monkeypatch.setattr(metrics_collector, "time", fake)
+    return fake
+
+
+def complete(collector, task_id, seconds, status="completed", agent_type="Coding Agent", risk_level=None):
+    start = datetime(2026, 1, 1)
+    collector.record_task_completion(task_id, agent_type, start, start + timedelta(seconds=seconds), status, risk_level)
+
+
+def test_completion_stats_by_status_agent_and_risk(clock):
+    collector = TaskMetricsCollector()
+    collector.record_task_start("T1", "Coding Agent", "high")
+    collector.record_task_start("T2", "Gatekeeper", "low")
+    complete(collector, "T1", 10)
+    complete(collector, "T2", 2, status="failed", agent_type="Gatekeeper")
+    complete(collector, "T3", 4, risk_level="low")
+
+    summary = collector.get_task_metrics_summary()
+    assert summary["total_tasks_by_status"] == {"completed": 2, "failed": 1}
+    completed = summary["task_completion_stats"]["completed"]
+    assert completed["count"] == 2
+    assert completed["total_duration"] == 14
+    assert (completed["min_duration"], completed["max_duration"]) == (4, 10)
+    assert completed["avg_duration"] == 7
+    assert completed["p50"] == pytest.approx(4, rel=0.01)
+    assert completed["p99"] == pytest.approx(10, rel=0.01)
+    assert set(summary["agent_latency"]) == {"Coding Agent", "Gatekeeper"}
+    # The risk level defaults to the one given at task start
+    assert {risk: stats["count"] for risk, stats in summary["risk_latency"].items()} == {"high": 1, "low": 2}
+    assert summary["system_stats"]["overall_success_rate"] == pytest.approx(2 / 3)
+    assert summary["agent_performance"]["Coding Agent"]["avg_completion_time"] == 7
+
+
+def test_completion_windows_slide(clock):
+    collector = TaskMetricsCollector()
+    complete(collector, "T1", 30)
+    clock.now += 120
+    complete(collector, "T2", 1)
+
+    windows = collector.get_task_metrics_summary()["task_completion_stats"]["completed"]["windows"]
+    assert set(windows) == {"1m", "5m", "1h"}
+    assert windows["1m"]["count"] == 1
+    assert windows["1m"]["max_duration"] == 1
+    assert windows["5m"]["count"] == 2
+    assert windows["5m"]["p99"] == pytest.approx(30, rel=0.01)
+
+    clock.now += 7200
+    summary = collector.get_task_metrics_summary()["task_completion_stats"]["completed"]
+    assert summary["count"] == 2
+    assert all(window["count"] == 0 for window in summary["windows"].values())
+    assert summary["windows"]["1h"]["p50"] is None
+
+
+def test_export_snapshot_copies_the_all_time_histograms(clock):
+    collector = TaskMetricsCollector()
+    complete(collector, "T1", 3, risk_level="medium")
+    snapshot = collector.get_export_snapshot()
+    complete(collector, "T2", 5, risk_level="medium")
+
+    assert snapshot["tasks_by_status"] == {"completed": 1}
+    assert snapshot["durations_by_status"]["completed"].count == 1
+    assert snapshot["durations_by_risk"]["medium"].sum == 3
+    assert collector.get_export_snapshot()["durations_by_agent"]["Coding Agent"].count == 2
+
+
+def test_api_requests_are_summarized_per_endpoint(clock):
+    collector = SystemHealthCollector(ewma_alpha=0.5)
+    for duration in (0.1, 0.3):
+        collector.record_api_request("/tasks", "GET", duration)
+    collector.record_api_request("/tasks", "GET", 0.5, success=False)
+    collector.record_api_request("/project/init", "POST", 1.0)
+
+    health = collector.get_health_metrics()
+    assert health["total_requests"] == 4
+    assert health["error_rate"] == 0.25
+    tasks = health["api_requests"]["GET:/tasks"]
+    assert (tasks["endpoint"], tasks["method"], tasks["count"], tasks["errors"]) == ("/tasks", "GET", 3, 1)
+    assert tasks["avg_duration"] == pytest.approx(0.35)
+    assert tasks["mean_duration"] == pytest.approx(0.3)
+    assert (tasks["min_duration"], tasks["max_duration"]) == (0.1, 0.5)
+    assert tasks["p50"] == pytest.approx(0.3, rel=0.01)
+    assert tasks["windows"]["1m"] == {
+        "requests": 3, "requests_per_second": 3 / 60, "errors": 1, "error_rate": pytest.approx(1 / 3),
+        **{key: value for key, value in tasks["windows"]["1m"].items() if key.startswith("p")}
+    }
+    assert tasks["windows"]["1m"]["p99"] == pytest.approx(0.5, rel=0.01)
+
+
+def test_api_request_windows_slide(clock):
+    collector = SystemHealthCollector()
+    collector.record_api_request("/tasks", "GET", 0.1, success=False)
+    clock.now += 120
+    collector.record_api_request("/tasks", "GET", 0.2)
+
+    windows = collector.get_health_metrics()["api_requests"]["GET:/tasks"]["windows"]
+    assert (windows["1m"]["requests"], windows["1m"]["errors"], windows["1m"]["error_rate"]) == (1, 0, 0)
+    assert (windows["5m"]["requests"], windows["5m"]["errors"]) == (2, 1)
+    assert windows["5m"]["requests_per_second"] == pytest.approx(2 / 300)
+
+
+def test_errors_are_counted_by_type(clock):
+    collector = SystemHealthCollector()
+    collector.record_error("api_error", "boom")
+    collector.record_error("api_error", "boom again")
+    collector.record_error("validation_error", "bad plan")
+    health = collector.get_health_metrics()
+    assert health["error_counts"] == {"api_error": 2, "validation_error": 1}
+    assert health["total_errors"] == 3
+    assert health["error_rate"] == 0
+
+
+def test_health_export_snapshot(clock):
+    collector = SystemHealthCollector(ewma_alpha=1)
+    collector.record_api_request("/health", "GET", 0.25)
+    snapshot = collector.get_export_snapshot()
+    collector.record_api_request("/health", "GET", 0.5)
+    endpoint, = snapshot["endpoints"]
+    assert (endpoint["endpoint"], endpoint["method"], endpoint["count"], endpoint["errors"]) == ("/health", "GET", 1, 0)
+    assert endpoint["ewma_duration"] == 0.25
+    assert endpoint["latency"].count == 1
+
+
+def test_monitor_api_call_records_sync_and_async_calls(clock, monkeypatch):
+    collector = SystemHealthCollector()
+    monkeypatch.setattr(metrics_collector, "_health_collector", collector)
+
+    @monitor_api_call(endpoint="/explicit", method="POST")
+    def explicit():
+        return "ok"
+
+    @monitor_api_call
+    async def failing():
+        raise RuntimeError("boom")
+
+    assert explicit() == "ok"
+    with pytest.raises(RuntimeError):
+        asyncio.run(failing())
+
+    health = collector.get_health_metrics()
+    assert health["api_requests"]["POST:/explicit"]["count"] == 1
+    assert health["api_requests"]["CALL:failing"]["errors"] == 1
+    assert health["error_counts"] == {"api_error": 1}
@@ -0,0 +1,80 @@
+# tests/test_prometheus_endpoints.py
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+# Runs in a fresh interpreter so hiding prometheus_client cannot leak into other tests
+WITHOUT_PROMETHEUS = """
+import sys
+sys.modules["prometheus_client"] = None
+sys.modules["prometheus_client.core"] = None
+from fastapi.testclient import TestClient
+import mcp_server.main as server
+client = TestClient(server.app)
+print(client.get("/metrics").status_code, client.get("/health/metrics").status_code)
+"""
+
+
+def test_metrics_endpoints_return_503_without_prometheus_client(tmp_path):
+    env = {**os.environ, "LOG_FILE": str(tmp_path / "mcp_server.log"), "SESSION_STATE_DIR": str(tmp_path)}
+    result = subprocess.run([sys.executable, "-c", WITHOUT_PROMETHEUS], cwd=PROJECT_ROOT, env=env,
+                            capture_output=True, text=True, timeout=120)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.split()[-2:] == ["503", "503"]
+    assert (tmp_path / "mcp_server.log").exists()
+
+
+def samples(text, name):
+    """label string -> value of every sample of a metric in an exposition"""
+    return {labels: float(value) for labels, value in re.findall(rf"^{name}\{{(.*?)\}} (\S+)$", text, re.MULTILINE)}
+
+
+def test_metrics_exposition_format(client):
+    pytest.importorskip("prometheus_client")
+    client.get("/health")
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "text/plain; version=0.0.4; charset=utf-8"
+    text = response.text
+    assert "# TYPE supermanus_http_requests_total counter" in text
+    assert "# TYPE supermanus_http_request_duration_seconds histogram" in text
+    assert "# TYPE supermanus_api_request_duration_seconds histogram" in text
+    assert "# TYPE process_cpu_seconds_total counter" in text
+    assert samples(text, "supermanus_http_requests_total")['method="GET",route="/health",status="200"'] >= 1
+    # The metrics endpoints do not record themselves
+    assert 'route="/metrics"' not in text
+
+
+def test_metrics_histogram_buckets(client, server):
+    pytest.importorskip("prometheus_client")
+    for _ in range(3):
+        client.get("/health")
+    text = client.get("/metrics").text
+
+    buckets = {
+        labels: value for labels, value in samples(text, "supermanus_http_request_duration_seconds_bucket").items()
+        if 'route="/health"' in labels
+    }
+    bounds = [re.search(r'le="([^"]+)"', labels).group(1) for labels in buckets]
+    assert bounds == [repr(float(bound)) for bound in server.prometheus_exporter.LATENCY_BUCKETS] + ["+Inf"]
+    counts = list(buckets.values())
+    assert counts == sorted(counts)
+    count = samples(text, "supermanus_http_request_duration_seconds_count")['method="GET",route="/health"']
+    assert counts[-1] == count >= 3
+    assert samples(text, "supermanus_http_request_duration_seconds_sum")['method="GET",route="/health"'] > 0
+
+
+def test_health_metrics_exports_only_the_health_collector(client):
+    pytest.importorskip("prometheus_client")
+    client.get("/health")
+    text = client.get("/health/metrics").text
+    assert samples(text, "supermanus_api_requests_total")['endpoint="/health",method="GET"'] >= 1
+    assert "supermanus_http_requests_total" not in text
+    assert "process_cpu_seconds_total" not in text
@@ -0,0 +1,56 @@
+# tests/test_prometheus_exporter.py
+import asyncio
+
+import pytest
+
+pytest.importorskip("prometheus_client")
+from prometheus_client import CollectorRegistry, generate_latest
+
+from mcp_server.metrics_middleware import MetricsMiddleware
+from src.supermanus.logging_config import MetricsCollector
+from src.supermanus.metrics_collector import RequestMetrics, SystemHealthCollector, TaskMetricsCollector
+from src.supermanus.prometheus_exporter import SupermanusCollector
+
+
+def render(sections, health, requests):
+    registry = CollectorRegistry()
+    registry.register(SupermanusCollector(sections, task_collector=TaskMetricsCollector(), health_collector=health,
+                                          app_collector=MetricsCollector(), request_metrics=requests))
+    return generate_latest(registry).decode()
+
+
+def test_health_section_merges_request_metrics_at_scrape_time():
+    health = SystemHealthCollector()
+    requests = RequestMetrics()
+    health.record_api_request("/tasks", "GET", 0.004)
+    requests.record("/tasks", "GET", 0.002, 200)
+    requests.record("/tasks", "GET", 0.02, 503)
+    requests.record("/status", "GET", 0.001, 200)
+
+    text = render(("health",), health, requests)
+    assert 'supermanus_api_requests_total{endpoint="/tasks",method="GET"} 3.0' in text
+    assert 'supermanus_api_request_errors_total{endpoint="/tasks",method="GET"} 1.0' in text
+    assert 'supermanus_api_requests_total{endpoint="/status",method="GET"} 1.0' in text
+    # Only endpoints recorded in the health collector itself have an EWMA
+    assert 'supermanus_api_request_duration_ewma_seconds{endpoint="/status"' not in text
+    assert 'supermanus_api_request_duration_seconds_count{endpoint="/tasks",method="GET"} 3.0' in text
+
+
+def test_middleware_records_only_request_metrics():
+    health = SystemHealthCollector()
+    requests = RequestMetrics()
+
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 201, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    async def send(message):
+        pass
+
+    middleware = MetricsMiddleware(app, metrics=requests, slow_request_seconds=0)
+    asyncio.run(middleware({"type": "http", "method": "POST", "path": "/x"}, None, send))
+
+    assert health.get_export_snapshot()["endpoints"] == []
+    routes = requests.get_export_snapshot()["routes"]
+    assert [(route["route"], route["method"], route["status_counts"]) for route in routes] == [("<unmatched>", "POST", {201: 1})]
+    assert 'supermanus_http_request_duration_seconds_count{method="POST",route="<unmatched>"} 1.0' in render(("requests",), health, requests)
@@ -0,0 +1,165 @@
+# tests/test_session_manager.py
+import json
+import threading
+import time
+
+from src.supermanus.session_manager import SessionManager
+from src.supermanus.state_storage import StateStorage, create_storage, set_change, task_change
+
+
+class RecordingStorage(StateStorage):
+    """Records every write; writes block while ``gate`` is cleared"""
+
+    def __init__(self):
+        self.writes = []
+        self.gate = threading.Event()
+        self.gate.set()
+        self.writing = threading.Event()
+
+    def load(self):
+        return {}
+
+    def prepare_save(self, state):
+        data = json.loads(json.dumps(state))
+        return lambda: self._write(("save", data))
+
+    def prepare_append(self, changes, state):
+        return lambda: self._write(("append", list(changes)))
+
+    def _write(self, entry):
+        self.writing.set()
+        self.gate.wait(5)
+        self.writes.append(entry)
+
+    def close(self):
+        pass
+
+
+def test_changes_are_coalesced_until_flush(tmp_path):
+    storage = RecordingStorage()
+    manager = SessionManager(str(tmp_path / "s.json"), storage=storage, flush_interval=60)
+    manager.record_changes([set_change("a", 1)])
+    manager.record_changes([set_change("b", 2)])
+    assert storage.writes == []
+    assert manager.flush()
+    assert storage.writes == [("append", [set_change("a", 1), set_change("b", 2)])]
+    assert not manager.flush()
+    manager.close()
+
+
+def test_max_pending_changes_forces_a_flush(tmp_path):
+    storage = RecordingStorage()
+    manager = SessionManager(str(tmp_path / "s.json"), storage=storage, flush_interval=60, max_pending_changes=2)
+    manager.record_changes([set_change("a", 1)])
+    assert storage.writes == []
+    manager.record_changes([set_change("b", 2)])
+    assert len(storage.writes) == 1
+    manager.close()
+
+
+def test_background_flusher_writes_within_the_interval(tmp_path):
+    storage = RecordingStorage()
+    manager = SessionManager(str(tmp_path / "s.json"), storage=storage, flush_interval=0.05)
+    manager.record_changes([set_change("a", 1)])
+    deadline = time.monotonic() + 5
+    while not storage.writes and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert storage.writes == [("append", [set_change("a", 1)])]
+    manager.close()
+
+
+def test_group_commit_writes_once(tmp_path):
+    storage = RecordingStorage()
+    manager = SessionManager(str(tmp_path / "s.json"), storage=storage)
+    with manager.group_commit():
+        with manager.group_commit():
+            manager.record_changes([set_change("a", 1)])
+        manager.record_changes([set_change("b", 2)])
+        assert storage.writes == []
+    assert storage.writes == [("append", [set_change("a", 1), set_change("b", 2)])]
+
+
+def test_waiting_flush_does_not_block_mutators(tmp_path):
+    storage = RecordingStorage()
+    manager = SessionManager(str(tmp_path / "s.json"), storage=storage, flush_interval=60)
+    manager.record_changes([set_change("a", 1)])
+    storage.gate.clear()
+    first = threading.Thread(target=manager.flush)
+    first.start()
+    assert storage.writing.wait(5)
+
+    # A second flush queues behind the blocked write without holding the state lock
+    manager.record_changes([set_change("b", 2)])
+    second = threading.Thread(target=manager.flush)
+    second.start()
+    time.sleep(0.05)
+    assert manager.lock.acquire(timeout=1)
+    manager.lock.release()
+    manager.record_changes([set_change("c", 3)])
+
+    storage.gate.set()
+    first.join(5)
+    second.join(5)
+    manager.flush()
+    assert [entry[1] for entry in storage.writes] == [
+        [set_change("a", 1)], [set_change("b", 2)], [set_change("c", 3)]
+    ]
+    manager.close()
+
+
+def test_write_superseded_by_a_newer_snapshot_is_skipped(tmp_path):
+    storage = RecordingStorage()
+    manager = SessionManager(str(tmp_path / "s.json"), storage=storage, flush_interval=60)
+    manager.record_changes([set_change("a", 1)])
+    storage.gate.clear()
+    first = threading.Thread(target=manager.flush)
+    first.start()
+    assert storage.writing.wait(5)
+
+    manager.record_changes([set_change("b", 2)])
+    stale = threading.Thread(target=manager.flush)
+    stale.start()
+    while manager._flush_seq < 2:
+        time.sleep(0.01)
+    checkpoint = threading.Thread(target=manager.checkpoint)
+    checkpoint.start()
+    while manager._flush_seq < 3:
+        time.sleep(0.01)
+
+    storage.gate.set()
+    for thread in (first, stale, checkpoint):
+        thread.join(5)
+    assert storage.writes == [("append", [set_change("a", 1)]), ("save", {"a": 1, "b": 2})]
+
+
+def test_failed_write_schedules_a_snapshot(tmp_path):
+    class FailingOnce(RecordingStorage):
+        failed = False
+
+        def prepare_append(self, changes, state):
+            if not self.failed:
+                self.failed = True
+                raise OSError("disk full")
+            return super().prepare_append(changes, state)
+
+    storage = FailingOnce()
+    manager = SessionManager(str(tmp_path / "s.json"), storage=storage, flush_interval=60)
+    manager.record_changes([set_change("a", 1)])
+    assert not manager.flush()
+    assert manager.dirty
+    assert manager.flush()
+    assert storage.writes == [("save", {"a": 1})]
+
+
+def test_state_round_trips_through_every_backend(tmp_path):
+    for backend in ("json", "wal", "sqlite"):
+        path = tmp_path / f"{backend}.json"
+        manager = SessionManager(str(path), storage=create_storage(backend, path), flush_interval=60)
+        manager.load_state()
+        manager.save_state({"project_tasks": [{"id": "T1", "status": "pending"}]})
+        manager.record_changes([task_change("T1", {"status": "completed"})])
+        manager.close()
+
+        reloaded = SessionManager(str(path), storage=create_storage(backend, path))
+        assert reloaded.load_state() == {"project_tasks": [{"id": "T1", "status": "completed"}]}
+        reloaded.close()
@@ -0,0 +1,199 @@
+# tests/test_state_storage.py
+import builtins
+
+import pytest
+
+from src.supermanus import state_storage
+from src.supermanus.state_storage import (
+    WriteAheadLogStorage, create_storage, migrate_state, set_change, task_change
+)
+
+BACKENDS = ["json", "wal", "sqlite"]
+
+
+def make_state():
+    return {
+        "overall_status": "in_progress",
+        "project_tasks": [
+            {"id": "T1", "status": "pending", "phase": "build"},
+            {"id": "T2", "status": "pending", "phase": "test", "dependencies": ["T1"]},
+        ],
+    }
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_save_and_load_round_trip(tmp_path, backend):
+    storage = create_storage(backend, tmp_path / "session_state.json")
+    storage.save(make_state())
+    storage.close()
+
+    reopened = create_storage(backend, tmp_path / "session_state.json")
+    assert reopened.load() == make_state()
+    reopened.close()
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_appended_changes_survive_reload(tmp_path, backend):
+    storage = create_storage(backend, tmp_path / "session_state.json")
+    state = make_state()
+    storage.save(state)
+    changes = [task_change("T1", {"status": "completed"}), set_change("current_task", {"id": "T2"})]
+    state_storage.apply_changes(state, changes)
+    storage.append(changes, state)
+    storage.close()
+
+    reopened = create_storage(backend, tmp_path / "session_state.json")
+    loaded = reopened.load()
+    reopened.close()
+    assert loaded["project_tasks"][0]["status"] == "completed"
+    assert loaded["current_task"] == {"id": "T2"}
+
+
+def test_migrate_state_between_backends(tmp_path):
+    source = create_storage("wal", tmp_path / "session_state.json")
+    source.save(make_state())
+    target = create_storage("sqlite", tmp_path / "other.json")
+    assert migrate_state(source, target) == make_state()
+    assert target.count_tasks_by_status() == {"pending": 2}
+    source.close()
+    target.close()
+
+
+def test_wal_compacts_into_a_snapshot(tmp_path):
+    storage = WriteAheadLogStorage(tmp_path / "s.json", compact_every=3)
+    state = make_state()
+    storage.save(state)
+    for status in ("in_progress", "failed", "pending", "completed"):
+        change = [task_change("T1", {"status": status})]
+        state_storage.apply_changes(state, change)
+        storage.append(change, state)
+    storage.close()
+
+    # The fourth change exceeded compact_every and was folded into a new snapshot
+    reopened = WriteAheadLogStorage(tmp_path / "s.json", compact_every=3)
+    assert reopened.load() == state
+    assert reopened._log_records == 0
+    reopened.close()
+
+
+def test_wal_discards_torn_trailing_record(tmp_path):
+    storage = WriteAheadLogStorage(tmp_path / "s.json")
+    state = make_state()
+    storage.save(state)
+    change = [task_change("T1", {"status": "completed"})]
+    state_storage.apply_changes(state, change)
+    storage.append(change, state)
+    storage.close()
+    with open(storage.log_file, "ab") as f:
+        f.write(b'{"op":"task","id":"T2","fie')
+
+    reopened = WriteAheadLogStorage(tmp_path / "s.json")
+    assert reopened.load() == state
+    reopened.close()
+
+
+def test_wal_skips_log_folded_into_snapshot_before_crash(tmp_path, monkeypatch):
+    storage = WriteAheadLogStorage(tmp_path / "s.json")
+    state = make_state()
+    storage.save(state)
+    for status in ("in_progress", "completed"):
+        change = [task_change("T1", {"status": status})]
+        state_storage.apply_changes(state, change)
+        storage.append(change, state)
+
+    # Crash after the new snapshot is in place but before the log is reset
+    def crashing_open(path, mode="r", *args, **kwargs):
+        if str(path) == str(storage.log_file) and mode == "wb":
+            raise OSError("simulated crash")
+        return builtins.open(path, mode, *args, **kwargs)
+
+    monkeypatch.setattr(state_storage, "open", crashing_open, raising=False)
+    with pytest.raises(OSError):
+        storage.save(state)
+    monkeypatch.undo()
+    assert storage.log_file.stat().st_size > 0
+
+    reopened = WriteAheadLogStorage(tmp_path / "s.json")
+    loaded = reopened.load()
+    assert loaded["project_tasks"][0]["status"] == "completed"
+    assert loaded == state
+
+    # The stale log was dropped and new changes start a log of the current generation
+    change = [task_change("T2", {"status": "in_progress"})]
+    state_storage.apply_changes(loaded, change)
+    reopened.append(change, loaded)
+    reopened.close()
+    again = WriteAheadLogStorage(tmp_path / "s.json")
+    assert again.load() == loaded
+    again.close()
+
+
+def test_wal_replays_log_written_before_generations(tmp_path):
+    (tmp_path / "s.json").write_text('{"project_tasks": [{"id": "T1", "status": "pending"}]}')
+    (tmp_path / "s.json.wal").write_text('{"op":"task","id":"T1","fields":{"status":"completed"}}\n')
+
+    storage = WriteAheadLogStorage(tmp_path / "s.json")
+    assert storage.load() == {"project_tasks": [{"id": "T1", "status": "completed"}]}
+    storage.close()
+
+
+def test_json_storage_ignores_wal_generation(tmp_path):
+    wal = WriteAheadLogStorage(tmp_path / "s.json")
+    wal.save(make_state())
+    wal.close()
+    assert create_storage("json", tmp_path / "s.json").load() == make_state()
+
+
+def test_msgpack_snapshot_without_msgpack_is_not_quarantined(tmp_path, monkeypatch):
+    path = tmp_path / "s.json"
+    path.write_bytes(b"\x81\xa1a\x01")
+    monkeypatch.setattr(state_storage, "msgpack", None)
+
+    with pytest.raises(ImportError):
+        create_storage("json", path).load()
+    assert path.read_bytes() == b"\x81\xa1a\x01"
+    assert list(tmp_path.iterdir()) == [path]
+
+
+def test_corrupt_snapshots_get_distinct_quarantine_names(tmp_path):
+    path = tmp_path / "s.json"
+    for contents in ("{not json", "{still not json"):
+        path.write_text(contents)
+        assert create_storage("json", path).load() == {}
+    quarantined = sorted(p.read_text() for p in tmp_path.glob("s.json.corrupt-*"))
+    assert quarantined == ["{not json", "{still not json"]
+    assert not path.exists()
+
+
+def test_sqlite_updates_task_rows_in_place(tmp_path):
+    storage = create_storage("sqlite", tmp_path / "s.json")
+    state = make_state()
+    storage.save(state)
+    changes = [task_change("T1", {"status": "completed", "result": {"files": ["a.py"], "ok": True}})]
+    state_storage.apply_changes(state, changes)
+    storage.append(changes, state)
+
+    assert storage.count_tasks_by_status() == {"completed": 1, "pending": 1}
+    assert [task["id"] for task in storage.query_tasks(status="pending")] == ["T2"]
+    assert storage.query_tasks(exclude_status="pending") == [state["project_tasks"][0]]
+    assert storage.load() == state
+    storage.close()
+
+
+def test_sqlite_replaces_tasks_when_the_plan_is_set(tmp_path):
+    storage = create_storage("sqlite", tmp_path / "s.json")
+    storage.save(make_state())
+    plan = [{"id": "N1", "status": "pending"}]
+    storage.append([set_change("project_tasks", plan), set_change("overall_status", "not_started")], {})
+
+    assert storage.load() == {"overall_status": "not_started", "project_tasks": plan}
+    assert storage.count_tasks_by_status() == {"pending": 1}
+    storage.close()
+
+
+def test_sqlite_imports_a_legacy_json_state_file(tmp_path):
+    create_storage("json", tmp_path / "s.json").save(make_state())
+    storage = create_storage("sqlite", tmp_path / "s.json")
+    assert storage.load() == make_state()
+    assert storage.count_tasks_by_status() == {"pending": 2}
+    storage.close()
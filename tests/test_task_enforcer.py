@@ -0,0 +1,207 @@
+# tests/test_task_enforcer.py
+import random
+
+import pytest
+
+from src.supermanus.session_manager import SessionManager
+from src.supermanus.task_enforcer import TaskEnforcer
+
+
+def make_enforcer(tmp_path, tasks):
+    enforcer = TaskEnforcer(SessionManager(str(tmp_path / "session_state.json")))
+    enforcer.load_project_plan({"tasks": tasks})
+    return enforcer
+
+
+def ready_ids(enforcer):
+    return [task["id"] for task in enforcer.get_ready_tasks()]
+
+
+def test_dependents_become_ready_when_dependencies_complete(tmp_path):
+    enforcer = make_enforcer(tmp_path, [
+        {"id": "A"},
+        {"id": "B", "depends_on": ["A"]},
+        {"id": "C", "depends_on": ["A", "B"]},
+        {"id": "D"},
+    ])
+    assert ready_ids(enforcer) == ["A", "D"]
+
+    assert [task["id"] for task in enforcer.assign_ready_tasks(limit=1)] == ["A"]
+    assert ready_ids(enforcer) == ["D"]
+    enforcer.mark_task_completed("A")
+    assert ready_ids(enforcer) == ["B", "D"]
+    enforcer.mark_task_failed("B", "boom")
+    assert ready_ids(enforcer) == ["D"]
+    enforcer.mark_task_completed("B")
+    assert ready_ids(enforcer) == ["C", "D"]
+
+
+def test_reopening_a_dependency_blocks_its_dependents(tmp_path):
+    enforcer = make_enforcer(tmp_path, [{"id": "A", "status": "completed"}, {"id": "B", "depends_on": "A"}])
+    assert ready_ids(enforcer) == ["B"]
+    enforcer._update_task(enforcer.get_task("A"), {"status": "pending"})
+    assert ready_ids(enforcer) == ["A"]
+
+
+def test_plan_with_cycle_or_unknown_dependency_is_rejected(tmp_path):
+    with pytest.raises(ValueError, match="cycle"):
+        make_enforcer(tmp_path, [{"id": "A", "depends_on": ["B"]}, {"id": "B", "depends_on": ["A"]}])
+    with pytest.raises(ValueError, match="unknown task"):
+        make_enforcer(tmp_path, [{"id": "A", "depends_on": ["Z"]}])
+
+
+def test_ready_set_matches_a_full_scan_under_random_updates(tmp_path):
+    rng = random.Random(7)
+    tasks = [{"id": f"T{i:03d}", "depends_on": [f"T{j:03d}" for j in rng.sample(range(i), min(i, rng.randint(0, 3)))]}
+             for i in range(60)]
+    enforcer = make_enforcer(tmp_path, tasks)
+
+    def expected():
+        return [
+            task["id"] for task in enforcer.project_tasks
+            if task.get("status") not in TaskEnforcer.NON_DISPATCHABLE_STATUSES
+            and all(enforcer.get_task(dependency).get("status") == "completed" for dependency in task["depends_on"])
+        ]
+
+    for _ in range(500):
+        task = rng.choice(enforcer.project_tasks)
+        enforcer._update_task(task, {"status": rng.choice(["pending", "in_progress", "completed", "failed"])})
+        assert ready_ids(enforcer) == expected()
+
+
+def test_load_state_restores_plan_and_ready_set(tmp_path):
+    enforcer = make_enforcer(tmp_path, [{"id": "A"}, {"id": "B", "depends_on": ["A"]}])
+    enforcer.mark_task_completed("A")
+    enforcer.session_manager.close()
+
+    restored = TaskEnforcer(SessionManager(str(tmp_path / "session_state.json")))
+    restored.load_state()
+    assert restored.get_task("A")["status"] == "completed"
+    assert ready_ids(restored) == ["B"]
+
+
+def page_through(enforcer, **filters):
+    pages, cursor = [], None
+    while True:
+        page = enforcer.query_tasks(cursor=cursor, **filters)
+        pages.append([task["id"] for task in page["tasks"]])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return pages
+
+
+@pytest.mark.parametrize("filters", [
+    {},
+    {"id_prefix": "api-"},
+    {"id_prefix": "api-1"},
+    {"phase": "build", "id_prefix": "api-"},
+    {"status": "completed", "id_prefix": "ui-"},
+    {"id_prefix": "nope"},
+])
+def test_query_pages_match_a_full_scan(tmp_path, filters):
+    tasks = [{"id": f"{'api' if i % 3 else 'ui'}-{i}", "phase": "build" if i % 2 else "test",
+              "status": "completed" if i % 5 == 0 else "pending"} for i in range(40)]
+    # Plan order differs from ID order so prefix matches must be re-sorted by position
+    tasks.reverse()
+    enforcer = make_enforcer(tmp_path, tasks)
+
+    expected = [
+        task["id"] for task in tasks
+        if task["id"].startswith(filters.get("id_prefix", ""))
+        and task["phase"] == filters.get("phase", task["phase"])
+        and task["status"] == filters.get("status", task["status"])
+    ]
+    pages = page_through(enforcer, limit=4, **filters)
+    assert [task_id for page in pages for task_id in page] == expected
+    assert all(len(page) == 4 for page in pages[:-1])
+
+
+def test_query_rejects_bad_cursors(tmp_path):
+    enforcer = make_enforcer(tmp_path, [{"id": "A"}, {"id": "B"}])
+    for cursor in ("garbage", "1:-1", "1:2:3"):
+        with pytest.raises(ValueError, match="Invalid cursor"):
+            enforcer.query_tasks(cursor=cursor)
+    cursor = enforcer.query_tasks(limit=1)["next_cursor"]
+    enforcer.load_project_plan({"tasks": [{"id": "A"}, {"id": "B"}]})
+    with pytest.raises(ValueError, match="previously loaded plan"):
+        enforcer.query_tasks(cursor=cursor)
+
+
+def test_changed_since_returns_only_newer_changes(tmp_path):
+    enforcer = make_enforcer(tmp_path, [{"id": "A"}, {"id": "B"}, {"id": "C"}])
+    version = enforcer.version
+    enforcer.mark_task_completed("C")
+    enforcer.mark_task_failed("A", "boom")
+    assert enforcer.get_tasks_changed_since(version, fields=["status"]) == [
+        {"id": "A", "status": "failed"}, {"id": "C", "status": "completed"}
+    ]
+    assert enforcer.get_tasks_changed_since(enforcer.version) == []
+    assert enforcer.get_tasks_changed_since(version - 1) is None
+
+
+def test_assign_next_task_follows_plan_order(tmp_path):
+    enforcer = make_enforcer(tmp_path, [
+        {"id": "A", "status": "completed"},
+        {"id": "B", "depends_on": ["C"]},
+        {"id": "C"},
+        {"id": "D"},
+    ])
+    assert enforcer.assign_next_task()["id"] == "C"
+    # Assigning does not change the status, so the same task stays next until it completes
+    assert enforcer.assign_next_task()["id"] == "C"
+    enforcer.mark_task_completed("C")
+    assert enforcer.assign_next_task()["id"] == "B"
+    enforcer.mark_task_completed("B")
+    enforcer.mark_task_completed("D")
+    assert enforcer.assign_next_task() is None
+    assert enforcer.current_task is None
+
+
+def test_task_lookup_and_unknown_ids(tmp_path):
+    enforcer = make_enforcer(tmp_path, [{"id": "A", "phase": "x"}, {"id": "A", "phase": "duplicate"}, {"id": "B"}])
+    assert enforcer.get_task("A")["phase"] == "x"
+    assert enforcer.get_task("missing") is None
+    version = enforcer.version
+    enforcer.mark_task_completed("missing")
+    enforcer.mark_task_failed("missing", "boom")
+    assert enforcer.version == version
+
+
+def test_status_changes_are_persisted_as_task_changes(tmp_path):
+    enforcer = make_enforcer(tmp_path, [{"id": "A"}, {"id": "B"}])
+    enforcer.mark_task_failed("B", "boom")
+    enforcer.session_manager.close()
+
+    state = SessionManager(str(tmp_path / "session_state.json")).load_state()
+    assert state["project_tasks"] == [{"id": "A"}, {"id": "B", "status": "failed", "error": "boom"}]
+
+
+def test_status_snapshot_is_reused_until_something_changes(tmp_path):
+    enforcer = make_enforcer(tmp_path, [{"id": "A"}, {"id": "B", "status": "in_progress"}])
+    first = enforcer.get_status()
+    second = enforcer.get_status()
+    assert second == first
+    assert second["pending_tasks"] is first["pending_tasks"]
+
+    enforcer.mark_task_completed("A")
+    third = enforcer.get_status()
+    assert third["version"] > first["version"]
+    assert [task["id"] for task in third["completed_tasks"]] == ["A"]
+    assert [task["id"] for task in third["pending_tasks"]] == ["B"]
+    assert third["task_counts"] == {"completed": 1, "in_progress": 1}
+
+    enforcer.session_manager.update_state({"overall_status": "in_progress"})
+    assert enforcer.get_status()["overall_status"] == "in_progress"
+
+
+def test_status_counts_match_the_full_status(tmp_path):
+    enforcer = make_enforcer(tmp_path, [{"id": "A"}, {"id": "B"}, {"id": "C", "status": "failed"}])
+    enforcer.assign_next_task()
+    enforcer.mark_task_completed("A")
+    counts = enforcer.get_status_counts()
+    status = enforcer.get_status()
+    assert counts["task_counts"] == status["task_counts"] == {"completed": 1, "pending": 1, "failed": 1}
+    assert counts["completed_count"] == len(status["completed_tasks"]) == 1
+    assert counts["pending_count"] == len(status["pending_tasks"]) == 2
+    assert counts["current_task_id"] == "A"
+    assert counts["version"] == status["version"]